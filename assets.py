@@ -0,0 +1,181 @@
+# central place to load images so each file is decoded/converted/scaled once
+
+import hashlib
+import os
+import struct
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import pygame
+
+ASSETS_DIR = os.path.join(os.path.dirname(__file__), "assets")
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".bmp", ".gif")
+DEFAULT_BUDGET_BYTES = 256 * 1024 * 1024
+
+# raw pixel cache file: magic, width, height, has_alpha
+_DISK_HEADER = struct.Struct("<4sIIB")
+_DISK_MAGIC = b"CQPX"
+
+AssetKey = Tuple[str, Optional[Tuple[int, int]], bool]
+
+
+class AssetManager:
+    """
+    Caches converted surfaces keyed by (path, size, alpha). Paths are relative to
+    the assets folder. Least recently used surfaces are evicted once the cache
+    goes over `budget_bytes`. If `disk_cache_dir` is set, decoded + scaled pixels
+    are also written there as raw bytes, so the next launch skips PNG decoding
+    and rescaling (entries are keyed on the source file's mtime and size, so an
+    edited image is picked up again).
+    """
+
+    def __init__(self, root: str = ASSETS_DIR, budget_bytes: int = DEFAULT_BUDGET_BYTES,
+                 disk_cache_dir: Optional[str] = None):
+        self.root = root
+        self.budget_bytes = budget_bytes
+        self.disk_cache_dir = disk_cache_dir
+        self._cache: "OrderedDict[AssetKey, pygame.Surface]" = OrderedDict()
+        self._bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.disk_hits = 0
+
+    @property
+    def used_bytes(self) -> int:
+        return self._bytes
+
+    def image(self, path: str, size: Optional[Tuple[int, int]] = None, alpha: bool = False) -> pygame.Surface:
+        """
+        Returns the image at `path`, optionally scaled to `size`. The same Surface
+        object is handed out to every caller, so don't draw onto it - copy() first.
+        """
+        key = (os.path.normpath(path), tuple(size) if size else None, alpha)
+        surface = self._cache.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self._load(key)
+        self._store(key, surface)
+        return surface
+
+    def preload(self) -> int:
+        """Loads every image under the assets folder at its native size. Returns how many."""
+        count = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in sorted(filenames):
+                if filename.lower().endswith(IMAGE_EXTENSIONS):
+                    rel = os.path.relpath(os.path.join(dirpath, filename), self.root)
+                    self.image(rel)
+                    count += 1
+        return count
+
+    def clear(self) -> None:
+        self._cache.clear()
+        self._bytes = 0
+
+    # --- internals ---
+
+    def _load(self, key: AssetKey) -> pygame.Surface:
+        path, size, alpha = key
+        full_path = os.path.join(self.root, path)
+
+        cache_file = self._disk_cache_path(key, full_path)
+        surface = _read_raw(cache_file) if cache_file else None
+        if surface is not None:
+            self.disk_hits += 1
+        else:
+            if size is not None:
+                # go through the cached native-size image so scaling one file to
+                # several sizes only decodes it once
+                surface = pygame.transform.scale(self.image(path, alpha=alpha), size)
+            else:
+                surface = pygame.image.load(full_path)
+            if cache_file:
+                _write_raw(cache_file, surface, alpha)
+
+        return _convert(surface, alpha)
+
+    def _store(self, key: AssetKey, surface: pygame.Surface) -> None:
+        old = self._cache.pop(key, None)
+        if old is not None:
+            self._bytes -= _surface_bytes(old)
+        self._cache[key] = surface
+        self._bytes += _surface_bytes(surface)
+
+        # always keep the newest entry, even if it alone is over budget
+        while self._bytes > self.budget_bytes and len(self._cache) > 1:
+            _, evicted = self._cache.popitem(last=False)
+            self._bytes -= _surface_bytes(evicted)
+            self.evictions += 1
+
+    def _disk_cache_path(self, key: AssetKey, full_path: str) -> Optional[str]:
+        if not self.disk_cache_dir:
+            return None
+        path, size, alpha = key
+        try:
+            st = os.stat(full_path)
+        except OSError:
+            return None
+        ident = f"{path}|{size}|{alpha}|{st.st_mtime_ns}|{st.st_size}"
+        return os.path.join(self.disk_cache_dir, hashlib.sha1(ident.encode()).hexdigest() + ".px")
+
+
+def _surface_bytes(surface: pygame.Surface) -> int:
+    return surface.get_pitch() * surface.get_height()
+
+
+def _convert(surface: pygame.Surface, alpha: bool) -> pygame.Surface:
+    # convert() needs a display mode; without one (tools, tests) keep the raw surface
+    if pygame.display.get_init() and pygame.display.get_surface() is not None:
+        return surface.convert_alpha() if alpha else surface.convert()
+    return surface
+
+
+def _read_raw(cache_file: str) -> Optional[pygame.Surface]:
+    try:
+        with open(cache_file, "rb") as f:
+            magic, width, height, has_alpha = _DISK_HEADER.unpack(f.read(_DISK_HEADER.size))
+            pixels = f.read()
+    except (OSError, struct.error):
+        return None
+    if magic != _DISK_MAGIC:
+        return None
+    fmt = "RGBA" if has_alpha else "RGB"
+    if len(pixels) != width * height * len(fmt):
+        return None
+    return pygame.image.frombytes(pixels, (width, height), fmt)
+
+
+def _write_raw(cache_file: str, surface: pygame.Surface, alpha: bool) -> None:
+    fmt = "RGBA" if alpha else "RGB"
+    width, height = surface.get_size()
+    tmp = cache_file + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        with open(tmp, "wb") as f:
+            f.write(_DISK_HEADER.pack(_DISK_MAGIC, width, height, int(alpha)))
+            f.write(pygame.image.tobytes(surface, fmt))
+        os.replace(tmp, cache_file)
+    except OSError:
+        pass  # the disk cache is only an optimization
+
+
+_default: Optional[AssetManager] = None
+
+
+def get_assets() -> AssetManager:
+    """Shared manager used by the game scenes."""
+    global _default
+    if _default is None:
+        _default = AssetManager()
+    return _default
+
+
+def set_assets(manager: AssetManager) -> None:
+    global _default
+    _default = manager
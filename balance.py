@@ -0,0 +1,213 @@
+# balance sweeps: evaluate compute_outcomes over whole parameter grids with numpy
+
+from __future__ import annotations
+
+import csv
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+
+from consumables import GENETICS, MEDIUMS, NUTRIENTS, Genetics, Medium, Nutrient
+from skills import SKILL_DEFS
+
+NO_NUTRIENT = "none"
+
+# Skill effects that feed into the grow outcomes in a sweep:
+#   skill -> (effect name, outcome column, how it's applied)
+# "mult" multiplies the column by the effect, "bonus" multiplies by (1 + effect).
+SKILL_MODIFIERS = {
+    "watering": ("growth_multiplier", "growth_multiplier", "mult"),
+    "trimming": ("quality_bonus", "quality_out_of_10", "bonus"),
+}
+
+
+@dataclass
+class SweepTable:
+    """
+    Column-oriented result of a sweep: one numpy array per column, all the same
+    length. medium/genetics/nutrient columns hold small int ids; the names are in
+    `categories` (and are what to_csv / to_pandas write out).
+    """
+    columns: Dict[str, np.ndarray]
+    categories: Dict[str, List[str]] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()))) if self.columns else 0
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    @property
+    def names(self) -> List[str]:
+        return list(self.columns)
+
+    def take(self, index) -> "SweepTable":
+        return SweepTable({k: v[index] for k, v in self.columns.items()}, self.categories)
+
+    def sort(self, by: str, descending: bool = False) -> "SweepTable":
+        order = np.argsort(self.columns[by], kind="stable")
+        if descending:
+            order = order[::-1]
+        return self.take(order)
+
+    def filter(self, mask: Optional[np.ndarray] = None, **equals) -> "SweepTable":
+        """filter(table["fail_chance"] < 0.05, genetics="breeder_cuts")"""
+        keep = np.ones(len(self), dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+        for name, value in equals.items():
+            if name in self.categories:
+                value = self.categories[name].index(value)
+            keep &= self.columns[name] == value
+        return self.take(np.flatnonzero(keep))
+
+    def head(self, n: int = 10) -> List[Dict[str, object]]:
+        return self.rows(stop=n)
+
+    def rows(self, start: int = 0, stop: Optional[int] = None) -> List[Dict[str, object]]:
+        stop = len(self) if stop is None else min(stop, len(self))
+        out = []
+        for i in range(start, stop):
+            row = {}
+            for name, column in self.columns.items():
+                value = column[i].item()
+                row[name] = self.categories[name][value] if name in self.categories else value
+            out.append(row)
+        return out
+
+    def labelled(self, name: str) -> np.ndarray:
+        """A category column as its names instead of ids."""
+        return np.asarray(self.categories[name], dtype=object)[self.columns[name]]
+
+    def to_csv(self, path: str) -> None:
+        names = self.names
+        cols = [self.labelled(n) if n in self.categories else self.columns[n].tolist() for n in names]
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(names)
+            writer.writerows(zip(*cols))
+
+    def to_pandas(self):
+        import pandas as pd
+
+        data = {}
+        for name, column in self.columns.items():
+            if name in self.categories:
+                data[name] = pd.Categorical.from_codes(column, self.categories[name])
+            else:
+                data[name] = column
+        return pd.DataFrame(data)
+
+    def to_parquet(self, path: str) -> None:
+        """Needs pandas + pyarrow (or fastparquet)."""
+        self.to_pandas().to_parquet(path, index=False)
+
+
+def sweep_outcomes(mediums: Optional[Sequence[str]] = None,
+                   genetics: Optional[Sequence[str]] = None,
+                   nutrients: Optional[Sequence[str]] = None,
+                   include_no_nutrient: bool = True,
+                   skill_levels: Optional[Mapping[str, Sequence[int]]] = None,
+                   round_results: bool = True) -> SweepTable:
+    """
+    compute_outcomes for every combination of mediums x genetics x nutrients
+    (x each skill's levels, see SKILL_MODIFIERS) in one vectorized pass.
+    Defaults to everything in MEDIUMS / GENETICS / NUTRIENTS, plus a "none"
+    nutrient. With round_results the numbers are rounded the same way
+    compute_outcomes rounds them.
+    """
+    medium_keys = list(mediums or MEDIUMS)
+    genetic_keys = list(genetics or GENETICS)
+    nutrient_keys = list(nutrients or NUTRIENTS)
+    if include_no_nutrient:
+        nutrient_keys = [NO_NUTRIENT] + [k for k in nutrient_keys if k != NO_NUTRIENT]
+    skill_levels = dict(skill_levels or {})
+    for skill in skill_levels:
+        if skill not in SKILL_MODIFIERS:
+            raise KeyError(f"skill {skill!r} has no effect on grow outcomes "
+                           f"(known: {sorted(SKILL_MODIFIERS)})")
+
+    m = _medium_arrays([MEDIUMS[k] for k in medium_keys])
+    g = _genetics_arrays([GENETICS[k] for k in genetic_keys])
+    n = _nutrient_arrays([None if k == NO_NUTRIENT else NUTRIENTS[k] for k in nutrient_keys])
+
+    level_axes = [np.asarray(levels, dtype=np.int64) for levels in skill_levels.values()]
+    shape = (len(medium_keys), len(genetic_keys), len(nutrient_keys)) + tuple(len(a) for a in level_axes)
+    grid = np.indices(shape, dtype=np.int32).reshape(len(shape), -1)
+    mi, gi, ni = grid[0], grid[1], grid[2]
+
+    growth = m["growth_speed_mult"][mi] * (1.0 + n["growth_speed_bonus"][ni])
+    yield_mult = m["yield_mult"][mi] * g["yield_mult"][gi] * (1.0 + n["yield_bonus"][ni])
+    quality = m["quality_base"][mi] * g["quality_mult"][gi] * (1.0 + n["quality_bonus"][ni])
+    fail = m["fail_chance"][mi] * g["fail_chance_mult"][gi]
+
+    outcomes = {"growth_multiplier": growth, "quality_out_of_10": quality}
+    columns: Dict[str, np.ndarray] = {
+        "medium": mi.astype(np.int16),
+        "genetics": gi.astype(np.int16),
+        "nutrient": ni.astype(np.int16),
+    }
+    for axis, (skill, levels) in enumerate(zip(skill_levels, level_axes), start=3):
+        level = levels[grid[axis]]
+        columns[f"{skill}_level"] = level
+        effect_name, target, how = SKILL_MODIFIERS[skill]
+        effect = SKILL_DEFS[skill].effect_table().values(effect_name, level)
+        outcomes[target] = outcomes[target] * (effect if how == "mult" else 1.0 + effect)
+
+    growth = outcomes["growth_multiplier"]
+    quality = np.clip(outcomes["quality_out_of_10"], 0.0, 10.0)
+    fail = np.clip(fail, 0.0, 0.99)
+    if round_results:
+        growth, yield_mult, quality, fail = (_round(growth, 3), _round(yield_mult, 3),
+                                             _round(quality, 2), _round(fail, 3))
+
+    columns.update({
+        "growth_multiplier": growth,
+        "yield_multiplier": yield_mult,
+        "quality_out_of_10": quality,
+        "fail_chance": fail,
+        "runs_before_replace": m["runs_before_replace"][mi],
+        "water_need_mult": m["water_need_mult"][mi],
+        "irrigation_required": m["irrigation_required"][mi],
+    })
+    categories = {"medium": medium_keys, "genetics": genetic_keys, "nutrient": nutrient_keys}
+    return SweepTable(columns, categories)
+
+
+def _round(values: np.ndarray, digits: int) -> np.ndarray:
+    # np.round scales by 10**digits first, which disagrees with python's round() on
+    # ties like 6.325. Sweeps only produce a few thousand distinct values, so round
+    # those with the builtin and scatter them back.
+    unique, inverse = np.unique(values, return_inverse=True)
+    rounded = np.array([round(v, digits) for v in unique.tolist()], dtype=np.float64)
+    return rounded[inverse.reshape(values.shape)]
+
+
+# --- definition -> array lookups (index = position in the key list) ---
+
+def _medium_arrays(items: Sequence[Medium]) -> Dict[str, np.ndarray]:
+    return {
+        "growth_speed_mult": np.array([x.growth_speed_mult for x in items], dtype=np.float64),
+        "fail_chance": np.array([x.fail_chance for x in items], dtype=np.float64),
+        "runs_before_replace": np.array([x.runs_before_replace for x in items], dtype=np.int32),
+        "yield_mult": np.array([x.yield_mult for x in items], dtype=np.float64),
+        "quality_base": np.array([x.quality_base for x in items], dtype=np.float64),
+        "water_need_mult": np.array([x.water_need_mult for x in items], dtype=np.float64),
+        "irrigation_required": np.array([x.irrigation_required for x in items], dtype=bool),
+    }
+
+
+def _genetics_arrays(items: Sequence[Genetics]) -> Dict[str, np.ndarray]:
+    return {
+        "quality_mult": np.array([x.quality_mult for x in items], dtype=np.float64),
+        "fail_chance_mult": np.array([x.fail_chance_mult for x in items], dtype=np.float64),
+        "yield_mult": np.array([x.yield_mult for x in items], dtype=np.float64),
+    }
+
+
+def _nutrient_arrays(items: Sequence[Optional[Nutrient]]) -> Dict[str, np.ndarray]:
+    # a missing nutrient is all-zero bonuses, which is the same as compute_outcomes skipping it
+    return {
+        "growth_speed_bonus": np.array([x.growth_speed_bonus if x else 0.0 for x in items], dtype=np.float64),
+        "yield_bonus": np.array([x.yield_bonus if x else 0.0 for x in items], dtype=np.float64),
+        "quality_bonus": np.array([x.quality_bonus if x else 0.0 for x in items], dtype=np.float64),
+    }
@@ -0,0 +1,281 @@
+# benchmarks for the hot paths, with a stored baseline to catch slowdowns
+#
+#   python bench.py                      run everything, write bench_results.json,
+#                                        compare with bench_baseline.json if there is one
+#   python bench.py --save-baseline      ...and make this run the new baseline
+#   python bench.py -k skill             only benchmarks whose name contains "skill"
+#
+# Each benchmark is timed as `rounds` rounds of `number` calls; the best round
+# is what gets compared (the least disturbed by whatever else the machine was
+# doing). Exits with status 1 when any benchmark got slower than the baseline
+# by more than --threshold. Baselines only mean something on the machine they
+# were recorded on.
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")  # the frame loop benchmark renders off-screen
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+RESULTS_PATH = os.path.join(HERE, "bench_results.json")
+BASELINE_PATH = os.path.join(HERE, "bench_baseline.json")
+DEFAULT_THRESHOLD = 0.25   # fail when a benchmark is more than 25% slower than the baseline
+DEFAULT_ROUNDS = 7
+
+
+@dataclass
+class Benchmark:
+    name: str
+    setup: Callable[[], Callable[[], object]]  # returns the function to time
+    number: int = 100                           # calls per round
+    unit: str = "call"                          # what one call is, for the report
+
+
+@dataclass
+class Result:
+    name: str
+    best_ms: float     # per call
+    median_ms: float   # per call
+    number: int
+    rounds: int
+    unit: str
+
+
+BENCHMARKS: Dict[str, Benchmark] = {}
+
+
+def benchmark(name: str, number: int = 100, unit: str = "call"):
+    """Registers setup() -> fn; fn is what gets timed."""
+    def register(setup):
+        BENCHMARKS[name] = Benchmark(name, setup, number, unit)
+        return setup
+    return register
+
+
+# --- benchmarks ---
+
+@benchmark("compute_outcomes_all_setups", number=200, unit="every medium x genetics x nutrient")
+def _compute_outcomes():
+    from consumables import GENETICS, MEDIUMS, NUTRIENTS, GrowSetup, compute_outcomes
+
+    setups = [GrowSetup(m, g, n) for m in MEDIUMS.values() for g in GENETICS.values()
+              for n in [None, *NUTRIENTS.values()]]
+
+    def run():
+        for setup in setups:
+            compute_outcomes(setup)
+    return run
+
+
+@benchmark("skill_add_xp_large", number=2000, unit="10M xp grant to a fresh skill")
+def _add_xp():
+    from skills import SKILL_DEFS, Skill
+
+    skill = Skill(SKILL_DEFS["watering"])
+
+    def run():
+        skill.level, skill.xp = 1, 0
+        skill.add_xp(10_000_000)
+    return run
+
+
+@benchmark("skill_add_xp_small", number=20000, unit="25 xp grant")
+def _add_xp_small():
+    from skills import SKILL_DEFS, Skill
+
+    skill = Skill(SKILL_DEFS["sales"])
+
+    def run():
+        # same starting point every call, or later rounds time a high-level skill
+        skill.level, skill.xp = 1, 0
+        skill.add_xp(25)
+    return run
+
+
+@benchmark("skill_effects_all_defs", number=20, unit="effects() for every skill at levels 1-99")
+def _effects():
+    from skills import SKILL_DEFS, Skill
+
+    skills = [Skill(defn, level) for defn in SKILL_DEFS.values() for level in range(1, 100)]
+
+    def run():
+        for skill in skills:
+            skill.effects()
+    return run
+
+
+_cleanups: List[Callable[[], None]] = []  # undo module patches made by a benchmark's setup
+
+
+def _logger_in_tempdir(**overrides):
+    """
+    logger writes to the working directory; keep that out of the repo. The
+    module settings in `overrides` (plus _MAX_SECONDS=None) are put back once
+    the benchmark is done (see run_benchmark).
+    """
+    import logger
+
+    os.chdir(tempfile.mkdtemp(prefix="bench_logs_"))
+    overrides.setdefault("_MAX_SECONDS", None)
+    saved = {name: getattr(logger, name) for name in overrides}
+    for name, value in overrides.items():
+        setattr(logger, name, value)
+
+    def restore():
+        for name, value in saved.items():
+            setattr(logger, name, value)
+    _cleanups.append(restore)
+    return logger
+
+
+@benchmark("log_state_snapshot", number=500, unit="snapshot of a frame with 2 sprite groups")
+def _log_state():
+    import pygame
+    from sprites import Sprite, SpriteGroup, build_default_atlas
+
+    logger = _logger_in_tempdir(_FPS=1)  # snapshot on every call instead of once a second
+    pygame.display.init()
+    screen = pygame.display.set_mode((320, 240))
+    atlas = build_default_atlas()
+    npcs = SpriteGroup(atlas)
+    for i in range(40):
+        Sprite(atlas, atlas.names[1], (i * 10, i * 5), (3, -2), i * 9, npcs)
+    player = SpriteGroup(atlas, None, 1, Sprite(atlas, "player", (100, 100)))
+
+    def run(screen=screen, npcs=npcs, player=player):  # log_state reads these from the caller's locals
+        logger.log_state()
+    return run
+
+
+@benchmark("log_event", number=5000, unit="event")
+def _log_event():
+    logger = _logger_in_tempdir()
+
+    def run():
+        logger.log_event("sale", tier="loud", grams=3.5, price=42.0)
+    return run
+
+
+@benchmark("headless_frame_loop", number=1, unit="600 ticks, 50 npcs/archetype, rendered")
+def _frame_loop():
+    from game_play import ScriptedInput, random_walk_script, run_headless
+
+    def run():
+        run_headless(600, ScriptedInput(random_walk_script(0, 600)), render=True, npcs=50, seed=0)
+    return run
+
+
+# --- running / comparing ---
+
+def run_benchmark(bench: Benchmark, rounds: int = DEFAULT_ROUNDS) -> Result:
+    try:
+        fn = bench.setup()
+        fn()  # warm-up: caches, lazy tables, first-call imports
+        times = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            for _ in range(bench.number):
+                fn()
+            times.append((time.perf_counter() - start) * 1000.0 / bench.number)
+    finally:
+        while _cleanups:
+            _cleanups.pop()()
+    return Result(bench.name, min(times), statistics.median(times), bench.number, rounds, bench.unit)
+
+
+def run_all(pattern: Optional[str] = None, rounds: int = DEFAULT_ROUNDS) -> List[Result]:
+    cwd = os.getcwd()
+    results = []
+    try:
+        for name, bench in BENCHMARKS.items():
+            if pattern and pattern not in name:
+                continue
+            results.append(run_benchmark(bench, rounds))
+            print(f"{name:<30} {results[-1].best_ms:10.4f} ms  ({bench.unit})", flush=True)
+    finally:
+        os.chdir(cwd)
+    return results
+
+
+def to_json(results: List[Result]) -> dict:
+    import numpy
+    import pygame
+
+    return {
+        "meta": {
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.node(),
+            "pygame": pygame.version.ver,
+            "numpy": numpy.__version__,
+        },
+        "results": {r.name: asdict(r) for r in results},
+    }
+
+
+def compare(current: dict, baseline: dict, threshold: float = DEFAULT_THRESHOLD) -> List[str]:
+    """Prints current vs baseline; returns the names that regressed beyond `threshold`."""
+    regressed = []
+    base = baseline.get("results", {})
+    print(f"\n{'benchmark':<30} {'baseline':>12} {'current':>12} {'change':>8}")
+    for name, result in current["results"].items():
+        old = base.get(name)
+        if old is None:
+            print(f"{name:<30} {'-':>12} {result['best_ms']:10.4f}ms {'new':>8}")
+            continue
+        change = result["best_ms"] / old["best_ms"] - 1.0 if old["best_ms"] > 0 else 0.0
+        flag = ""
+        if change > threshold:
+            regressed.append(name)
+            flag = "  REGRESSED"
+        print(f"{name:<30} {old['best_ms']:10.4f}ms {result['best_ms']:10.4f}ms {change:+8.1%}{flag}")
+    return regressed
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="CultQuest benchmarks")
+    parser.add_argument("-k", dest="pattern", help="only run benchmarks whose name contains this")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS)
+    parser.add_argument("--out", default=RESULTS_PATH, help="where to write this run's JSON results")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="allowed slowdown as a fraction (0.25 = 25%%)")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, HERE)
+    current = to_json(run_all(args.pattern, args.rounds))
+    with open(args.out, "w") as f:
+        json.dump(current, f, indent=2)
+
+    regressed = []
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressed = compare(current, json.load(f), args.threshold)
+    else:
+        print(f"\nno baseline at {args.baseline} (run with --save-baseline to record one)")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"baseline saved to {args.baseline}")
+
+    if regressed:
+        print(f"\n{len(regressed)} benchmark(s) regressed more than {args.threshold:.0%}: "
+              f"{', '.join(regressed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,224 @@
+# compact binary encoding (a msgpack subset) shared by telemetry, saves, replays etc.
+#
+# Output is valid msgpack, so files can be inspected with any msgpack tool. If the
+# `msgpack` package is installed we use it for speed, otherwise the pure python
+# fallback below does the same job.
+
+import struct
+from typing import Any, BinaryIO, Iterator
+
+try:
+    import msgpack as _msgpack
+except ImportError:  # optional speedup
+    _msgpack = None
+
+
+class FormatError(ValueError):
+    pass
+
+
+def packb(obj: Any) -> bytes:
+    if _msgpack is not None:
+        return _msgpack.packb(obj, use_bin_type=True)
+    out = bytearray()
+    _pack(obj, out)
+    return bytes(out)
+
+
+def unpackb(data: bytes) -> Any:
+    if _msgpack is not None:
+        return _msgpack.unpackb(data, raw=False, strict_map_key=False)
+    obj, pos = _unpack(data, 0)
+    if pos != len(data):
+        raise FormatError(f"{len(data) - pos} trailing bytes")
+    return obj
+
+
+def iter_unpack(f: BinaryIO) -> Iterator[Any]:
+    """Yields every object from a stream of concatenated packb() records."""
+    data = f.read()
+    if _msgpack is not None:
+        yield from _iter_msgpack(data)
+        return
+    pos = 0
+    while pos < len(data):
+        obj, pos = _unpack(data, pos)
+        yield obj
+
+
+def _iter_msgpack(data: bytes) -> Iterator[Any]:
+    unpacker = _msgpack.Unpacker(raw=False, strict_map_key=False, max_buffer_size=max(len(data), 1))
+    unpacker.feed(data)
+    yield from unpacker
+
+
+# --- pure python encoder ---
+
+def _pack(obj: Any, out: bytearray) -> None:
+    if obj is None:
+        out.append(0xC0)
+    elif obj is True:
+        out.append(0xC3)
+    elif obj is False:
+        out.append(0xC2)
+    elif isinstance(obj, int):
+        _pack_int(obj, out)
+    elif isinstance(obj, float):
+        out.append(0xCB)
+        out += struct.pack(">d", obj)
+    elif isinstance(obj, str):
+        raw = obj.encode("utf-8")
+        n = len(raw)
+        if n < 32:
+            out.append(0xA0 | n)
+        elif n < 0x100:
+            out += struct.pack(">BB", 0xD9, n)
+        elif n < 0x10000:
+            out += struct.pack(">BH", 0xDA, n)
+        else:
+            out += struct.pack(">BI", 0xDB, n)
+        out += raw
+    elif isinstance(obj, (bytes, bytearray, memoryview)):
+        raw = bytes(obj)
+        n = len(raw)
+        if n < 0x100:
+            out += struct.pack(">BB", 0xC4, n)
+        elif n < 0x10000:
+            out += struct.pack(">BH", 0xC5, n)
+        else:
+            out += struct.pack(">BI", 0xC6, n)
+        out += raw
+    elif isinstance(obj, (list, tuple)):
+        n = len(obj)
+        if n < 16:
+            out.append(0x90 | n)
+        elif n < 0x10000:
+            out += struct.pack(">BH", 0xDC, n)
+        else:
+            out += struct.pack(">BI", 0xDD, n)
+        for item in obj:
+            _pack(item, out)
+    elif isinstance(obj, dict):
+        n = len(obj)
+        if n < 16:
+            out.append(0x80 | n)
+        elif n < 0x10000:
+            out += struct.pack(">BH", 0xDE, n)
+        else:
+            out += struct.pack(">BI", 0xDF, n)
+        for key, value in obj.items():
+            _pack(key, out)
+            _pack(value, out)
+    else:
+        raise TypeError(f"can't pack {type(obj).__name__}")
+
+
+def _pack_int(n: int, out: bytearray) -> None:
+    if 0 <= n < 0x80:
+        out.append(n)
+    elif -32 <= n < 0:
+        out.append(n & 0xFF)
+    elif 0 <= n < 0x100:
+        out += struct.pack(">BB", 0xCC, n)
+    elif 0 <= n < 0x10000:
+        out += struct.pack(">BH", 0xCD, n)
+    elif 0 <= n < 0x100000000:
+        out += struct.pack(">BI", 0xCE, n)
+    elif 0 <= n < 0x10000000000000000:
+        out += struct.pack(">BQ", 0xCF, n)
+    elif -0x80 <= n < 0:
+        out += struct.pack(">Bb", 0xD0, n)
+    elif -0x8000 <= n < 0:
+        out += struct.pack(">Bh", 0xD1, n)
+    elif -0x80000000 <= n < 0:
+        out += struct.pack(">Bi", 0xD2, n)
+    elif -0x8000000000000000 <= n < 0:
+        out += struct.pack(">Bq", 0xD3, n)
+    else:
+        raise OverflowError("int too large to pack")
+
+
+# --- pure python decoder ---
+
+_FIXED = {
+    0xCC: ">B", 0xCD: ">H", 0xCE: ">I", 0xCF: ">Q",
+    0xD0: ">b", 0xD1: ">h", 0xD2: ">i", 0xD3: ">q",
+    0xCA: ">f", 0xCB: ">d",
+}
+_STR_LEN = {0xD9: ">B", 0xDA: ">H", 0xDB: ">I"}
+_BIN_LEN = {0xC4: ">B", 0xC5: ">H", 0xC6: ">I"}
+_ARRAY_LEN = {0xDC: ">H", 0xDD: ">I"}
+_MAP_LEN = {0xDE: ">H", 0xDF: ">I"}
+
+
+def _read(fmt: str, data: bytes, pos: int):
+    size = struct.calcsize(fmt)
+    if pos + size > len(data):
+        raise FormatError("truncated data")
+    return struct.unpack_from(fmt, data, pos)[0], pos + size
+
+
+def _unpack(data: bytes, pos: int):
+    if pos >= len(data):
+        raise FormatError("truncated data")
+    tag = data[pos]
+    pos += 1
+
+    if tag < 0x80:
+        return tag, pos
+    if tag >= 0xE0:
+        return tag - 0x100, pos
+    if 0xA0 <= tag <= 0xBF:
+        return _take_str(data, pos, tag & 0x1F)
+    if 0x90 <= tag <= 0x9F:
+        return _take_array(data, pos, tag & 0x0F)
+    if 0x80 <= tag <= 0x8F:
+        return _take_map(data, pos, tag & 0x0F)
+    if tag == 0xC0:
+        return None, pos
+    if tag == 0xC2:
+        return False, pos
+    if tag == 0xC3:
+        return True, pos
+    if tag in _FIXED:
+        return _read(_FIXED[tag], data, pos)
+    if tag in _STR_LEN:
+        n, pos = _read(_STR_LEN[tag], data, pos)
+        return _take_str(data, pos, n)
+    if tag in _BIN_LEN:
+        n, pos = _read(_BIN_LEN[tag], data, pos)
+        if pos + n > len(data):
+            raise FormatError("truncated data")
+        return data[pos:pos + n], pos + n
+    if tag in _ARRAY_LEN:
+        n, pos = _read(_ARRAY_LEN[tag], data, pos)
+        return _take_array(data, pos, n)
+    if tag in _MAP_LEN:
+        n, pos = _read(_MAP_LEN[tag], data, pos)
+        return _take_map(data, pos, n)
+    raise FormatError(f"unsupported type tag 0x{tag:02x}")
+
+
+def _take_str(data: bytes, pos: int, n: int):
+    if pos + n > len(data):
+        raise FormatError("truncated data")
+    return data[pos:pos + n].decode("utf-8"), pos + n
+
+
+def _take_array(data: bytes, pos: int, n: int):
+    items = []
+    for _ in range(n):
+        item, pos = _unpack(data, pos)
+        items.append(item)
+    return items, pos
+
+
+def _take_map(data: bytes, pos: int, n: int):
+    result = {}
+    for _ in range(n):
+        key, pos = _unpack(data, pos)
+        value, pos = _unpack(data, pos)
+        if isinstance(key, list):
+            key = tuple(key)
+        result[key] = value
+    return result, pos
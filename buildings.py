@@ -1 +1,74 @@
-#Living arrangements, dispos, cult sites, 
\ No newline at end of file
+#Living arrangements, dispos, cult sites,
+# buildings are placed in world pixels; their walls (with a door gap) and furniture
+# like grow tents are registered as static colliders in a collision.CollisionWorld
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+
+import pygame
+
+from world import HOME_ORIGIN, HOME_TILES, TILE_SIZE
+
+WALL_THICKNESS = 16
+DOOR_WIDTH = 128
+
+
+@dataclass
+class GrowTent:
+    key: str
+    rect: pygame.Rect  # world px, the whole tent is solid
+
+
+@dataclass
+class Building:
+    key: str
+    name: str
+    kind: str               # "house", "dispo", "cult_site", ...
+    rect: pygame.Rect       # outer wall bounds, world px
+    door_side: Optional[str] = "bottom"  # top/bottom/left/right, None = sealed
+    tents: List[GrowTent] = field(default_factory=list)
+    collider_ids: List[int] = field(default_factory=list)
+
+    def wall_rects(self) -> List[pygame.Rect]:
+        """Four walls, with a DOOR_WIDTH gap in the middle of the door side."""
+        r, t = self.rect, WALL_THICKNESS
+        walls = {
+            "top": pygame.Rect(r.left, r.top, r.width, t),
+            "bottom": pygame.Rect(r.left, r.bottom - t, r.width, t),
+            "left": pygame.Rect(r.left, r.top, t, r.height),
+            "right": pygame.Rect(r.right - t, r.top, t, r.height),
+        }
+        rects = []
+        for side, wall in walls.items():
+            if side != self.door_side:
+                rects.append(wall)
+            elif side in ("top", "bottom"):
+                gap = (wall.width - DOOR_WIDTH) // 2
+                rects.append(pygame.Rect(wall.left, wall.top, gap, t))
+                rects.append(pygame.Rect(wall.right - gap, wall.top, gap, t))
+            else:
+                gap = (wall.height - DOOR_WIDTH) // 2
+                rects.append(pygame.Rect(wall.left, wall.top, t, gap))
+                rects.append(pygame.Rect(wall.left, wall.bottom - gap, t, gap))
+        return rects
+
+    def add_colliders(self, collision) -> List[int]:
+        for wall in self.wall_rects():
+            self.collider_ids.append(collision.add_static(wall, "wall", self))
+        for tent in self.tents:
+            self.collider_ids.append(collision.add_static(tent.rect, "grow_tent", tent))
+        return self.collider_ids
+
+    def remove_colliders(self, collision) -> None:
+        for collider_id in self.collider_ids:
+            collision.remove_static(collider_id)
+        self.collider_ids.clear()
+
+
+def home_buildings() -> List[Building]:
+    """The player's house (door facing the street) with a starter tent in the corner."""
+    hx, hy = HOME_ORIGIN
+    hw, hh = HOME_TILES
+    rect = pygame.Rect(hx * TILE_SIZE, hy * TILE_SIZE, hw * TILE_SIZE, hh * TILE_SIZE)
+    tent = GrowTent("starter_tent", pygame.Rect(rect.left + 48, rect.top + 48, 128, 128))
+    return [Building("home", "Home", "house", rect, tents=[tent])]
@@ -0,0 +1,278 @@
+# idle progression: grow rooms, automated irrigation and passive xp keep going while the player is away
+#
+# Between events every plant in plantsim.PlantSim changes at a constant rate:
+# water drains (or refills from the room's reservoir) linearly, health drops or
+# recovers linearly, growth is linear and quality chases a linear target. So
+# instead of replaying a week frame by frame, catch_up() jumps each plant from
+# one event to the next (pot dry/full, health 0/1, harvest ready, reservoir
+# empty) and solves quality exactly in between. Skill effects are re-read every
+# SKILL_STEP_DAYS so levels gained while away feed back into growth.
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from typing import List, Tuple
+
+import numpy as np
+
+from npc import GAME_MINUTES_PER_SECOND
+from plantsim import DROUGHT_DAMAGE, POT_LITERS, QUALITY_RATE, RECOVERY, STAGE_STARTS, PlantSim
+from skills import LevelUp
+
+WATERING_XP_PER_LITER = 5.0  # xp for every liter automated irrigation delivers
+SKILL_STEP_DAYS = 1.0        # catch_up() re-reads skill levels this often
+MAX_OFFLINE_DAYS = 60.0      # offline time past this is dropped
+FRAME_TOLERANCE = 0.01       # max per-column difference vs a frame-by-frame run (compare_with_frames)
+MAX_PHASES = 32              # safety net: no plant has anywhere near this many events per step
+EPS = 1e-9
+
+
+def game_days(real_seconds: float) -> float:
+    """Real seconds -> game days, at the same clock the neighborhood runs on."""
+    return real_seconds * GAME_MINUTES_PER_SECOND / (24.0 * 60.0)
+
+
+@dataclass
+class CatchUpReport:
+    days: float = 0.0
+    steps: int = 0             # skill steps taken
+    liters: float = 0.0        # water delivered by automated irrigation
+    xp: int = 0                # watering xp granted
+    level_ups: List[LevelUp] = field(default_factory=list)
+    ready: int = 0             # plants that became harvestable
+    died: int = 0              # plants that died of drought
+    ms: float = 0.0
+
+
+class Progression:
+    """
+    Passive progress for one player: ticks the plant sim with the player's
+    watering bonuses and turns automated watering into watering xp (boosted by
+    managing's passive_xp_bonus). tick() is the live per-frame path,
+    catch_up() the analytic one for time spent away; both follow the same rules.
+    """
+
+    def __init__(self, plants: PlantSim, skills):
+        self.plants = plants
+        self.skills = skills      # player.SkillSet
+        self.xp_carry = 0.0       # fractional xp not granted yet
+
+    def bonuses(self) -> Tuple[float, float, float]:
+        """(growth multiplier, automation bonus, xp multiplier) from the current skill levels."""
+        watering = self.skills["watering"]
+        return (watering.effect("growth_multiplier"),
+                watering.effect("automation_bonus"),
+                1.0 + self.skills["managing"].effect("passive_xp_bonus"))
+
+    # --- live ---
+
+    def tick(self, dt_days: float) -> List[LevelUp]:
+        growth, automation, xp_mult = self.bonuses()
+        plants = self.plants
+        finite = np.isfinite(plants.room_reservoir)
+        before = float(plants.room_reservoir[finite].sum())
+        plants.tick(dt_days, growth, automation)
+        liters = before - float(plants.room_reservoir[finite].sum())
+        return self._grant(liters, xp_mult)[1]
+
+    # --- offline ---
+
+    def catch_up(self, days: float) -> CatchUpReport:
+        start = time.perf_counter()
+        days = min(max(0.0, days), MAX_OFFLINE_DAYS)
+        report = CatchUpReport(days=days)
+        plants = self.plants
+        was_ready = int((plants.alive & (plants.growth >= 1.0)).sum())
+        was_alive = int(plants.alive.sum())
+
+        batch = _Batch(plants)
+        left = days
+        while left > EPS and batch.size:
+            step = min(left, SKILL_STEP_DAYS)
+            growth, automation, xp_mult = self.bonuses()
+            liters = batch.advance(step, growth, automation)
+            xp, level_ups = self._grant(liters, xp_mult)
+            report.liters += liters
+            report.xp += xp
+            report.level_ups.extend(level_ups)
+            report.steps += 1
+            left -= step
+        batch.store()
+
+        if days > 0.0:
+            plants.dirty = True
+        report.ready = int((plants.alive & (plants.growth >= 1.0)).sum()) - was_ready
+        report.died = was_alive - int(plants.alive.sum())
+        report.ms = (time.perf_counter() - start) * 1000.0
+        return report
+
+    def _grant(self, liters: float, xp_mult: float) -> Tuple[int, List[LevelUp]]:
+        self.xp_carry += liters * WATERING_XP_PER_LITER * xp_mult
+        xp = int(self.xp_carry)
+        if xp <= 0:
+            return 0, []
+        self.xp_carry -= xp
+        return xp, self.skills.add_xp_batch([("watering", xp)], owner=self)
+
+
+class _Batch:
+    """Float64 working copy of every growing plant, written back once at the end of a catch-up."""
+
+    def __init__(self, sim: PlantSim):
+        self.sim = sim
+        n = sim.end
+        self.idx = idx = np.flatnonzero(sim.alive[:n] & (sim.growth[:n] < 1.0))
+        self.size = idx.size
+        self.rooms = sim.room_id[idx]
+        self.drink = sim.drink_rate[idx].astype(np.float64)
+        self.grow = sim.grow_rate[idx].astype(np.float64)
+        self.target = sim.quality_target[idx].astype(np.float64)
+        self.state = {
+            "water": sim.water[idx].astype(np.float64),
+            "health": sim.health[idx].astype(np.float64),
+            "growth": sim.growth[idx].astype(np.float64),
+            "quality": sim.quality[idx].astype(np.float64),
+            "alive": np.ones(idx.size, dtype=bool),
+        }
+        self.reservoir = sim.room_reservoir.astype(np.float64)
+        self.finite = np.isfinite(self.reservoir)
+
+    def advance(self, days: float, growth_bonus: float, automation_bonus: float) -> float:
+        """Moves every growing plant `days` ahead; returns liters drawn from reservoirs."""
+        state, rooms, drink = self.state, self.rooms, self.drink
+        reservoir, finite = self.reservoir, self.finite
+        grow = self.grow * growth_bonus
+        refill = self.sim.room_refill_per_day.astype(np.float64) * (1.0 + automation_bonus)
+        used = 0.0
+
+        # each room runs on its own clock, split at the moment its reservoir runs
+        # dry; a room only drinks slower as its pots fill up and its plants
+        # finish, so reservoir / current drain is never past the real empty time
+        left = np.full(reservoir.size, days)
+        while (left > EPS).any():
+            r = np.where(reservoir > EPS, refill, 0.0)[rooms]
+            growing = state["alive"] & (state["growth"] < 1.0)
+            drain = np.bincount(rooms, weights=_supply(r, drink, state["water"]) * growing * POT_LITERS,
+                                minlength=reservoir.size)
+            step = left.copy()
+            draining = finite & (drain > 0.0)
+            step[draining] = np.minimum(step[draining], reservoir[draining] / drain[draining])
+            delivered = _phases(step[rooms], r, drink, grow, self.target, state)
+            room_used = np.bincount(rooms, weights=delivered * POT_LITERS, minlength=reservoir.size)
+            room_used[~finite] = 0.0
+            reservoir -= room_used
+            reservoir[finite & (reservoir < 1e-6)] = 0.0
+            used += float(room_used.sum())
+            left -= step
+        return used
+
+    def store(self) -> None:
+        sim, idx, state = self.sim, self.idx, self.state
+        if not idx.size:
+            return
+        sim.water[idx] = state["water"]
+        sim.health[idx] = state["health"]
+        sim.growth[idx] = state["growth"]
+        sim.quality[idx] = state["quality"]
+        sim.alive[idx] = state["alive"]
+        sim.stage[idx] = np.searchsorted(STAGE_STARTS, sim.growth[idx], side="right") - 1
+        sim.room_reservoir[self.finite] = self.reservoir[self.finite]
+
+
+def compare_with_frames(plants: PlantSim, skills, days: float, dt_days: float = 1e-3) -> dict:
+    """
+    Runs catch_up() and a tick() loop of dt_days steps on copies of the same
+    state and reports the largest per-plant difference in each column. The
+    originals aren't touched. ok is False if anything is off by more than
+    FRAME_TOLERANCE (health, water, growth are 0..1, quality 0..10).
+    """
+    from player import SkillSet
+
+    def copy():
+        sim = PlantSim()
+        sim.load_state(plants.save_state())
+        skill_set = SkillSet()
+        skill_set.load_state(skills.save_state())
+        return Progression(sim, skill_set)
+
+    fast, slow = copy(), copy()
+    report = fast.catch_up(days)
+    start = time.perf_counter()
+    for _ in range(int(round(days / dt_days))):
+        slow.tick(dt_days)
+    frames_ms = (time.perf_counter() - start) * 1000.0
+
+    used = slow.plants.used
+    errors = {}
+    for name in ("water", "health", "growth", "quality"):
+        diff = getattr(fast.plants, name)[used] - getattr(slow.plants, name)[used]
+        errors[name] = float(np.abs(diff).max(initial=0.0))
+    alive_mismatch = int((fast.plants.alive != slow.plants.alive)[used].sum())
+    return {
+        "errors": errors,
+        "alive_mismatch": alive_mismatch,
+        "watering_xp": (fast.skills["watering"].total_xp, slow.skills["watering"].total_xp),
+        "catch_up_ms": report.ms,
+        "frames_ms": frames_ms,
+        "ok": alive_mismatch == 0 and max(errors.values()) <= FRAME_TOLERANCE,
+    }
+
+
+def _supply(r: np.ndarray, drink: np.ndarray, water: np.ndarray) -> np.ndarray:
+    """Pots of water per day irrigation puts into each plant right now."""
+    topped_up = (water >= 1.0) & (r >= drink)
+    return np.where(topped_up, drink, r)
+
+
+def _phases(days: np.ndarray, r, drink, grow, target, state) -> np.ndarray:
+    """
+    Advances each plant through its own events for its `days`, with fixed
+    refill rates `r`. Updates `state` in place and returns pots delivered per plant.
+    """
+    count = r.size
+    left = np.where(state["alive"] & (state["growth"] < 1.0), days, 0.0)
+    delivered = np.zeros(count)
+    k = QUALITY_RATE
+
+    for _ in range(MAX_PHASES):
+        i = np.flatnonzero(left > EPS)
+        if not i.size:
+            break
+        w, h, g, q = (state[name][i] for name in ("water", "health", "growth", "quality"))
+        ri, di = r[i], drink[i]
+        auto = ri > 0.0
+        dry = ~auto & (w <= 0.0)
+
+        # rates for this phase
+        supply = np.where(auto, _supply(ri, di, w), 0.0)
+        w_rate = supply - di
+        w_rate[(w >= 1.0) & (w_rate > 0.0)] = 0.0
+        w_rate[(w <= 0.0) & (w_rate < 0.0)] = 0.0     # dry pot, or irrigation just keeping it damp
+        h_rate = np.where(dry, -DROUGHT_DAMAGE, np.where(h >= 1.0, 0.0, RECOVERY))
+        g_rate = np.where(dry, 0.0, grow[i])
+
+        # time until the next thing changes
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t_w = np.where(w_rate < 0.0, w / -w_rate, np.where(w_rate > 0.0, (1.0 - w) / w_rate, np.inf))
+            t_h = np.where(h_rate < 0.0, h / -h_rate, np.where(h_rate > 0.0, (1.0 - h) / h_rate, np.inf))
+            t_g = np.where(g_rate > 0.0, (1.0 - g) / g_rate, np.inf)
+        dt = np.minimum(np.minimum(left[i], t_w), np.minimum(t_h, t_g))
+
+        # quality chases target * health; health is linear here, so solve exactly
+        a = target[i] * h
+        b = target[i] * h_rate
+        q = a + b * dt - b / k + (q - a + b / k) * np.exp(-k * dt)
+
+        w = np.where(dt >= t_w, np.where(w_rate < 0.0, 0.0, 1.0), np.clip(w + w_rate * dt, 0.0, 1.0))
+        h = np.where(dt >= t_h, np.where(h_rate < 0.0, 0.0, 1.0), np.clip(h + h_rate * dt, 0.0, 1.0))
+        g = np.where(dt >= t_g, 1.0, np.minimum(1.0, g + g_rate * dt))
+
+        state["water"][i], state["health"][i], state["growth"][i], state["quality"][i] = w, h, g, q
+        delivered[i] += supply * dt
+        left[i] -= dt
+
+        died = h <= EPS
+        state["alive"][i[died]] = False
+        left[i[died | (g >= 1.0)]] = 0.0
+    return delivered
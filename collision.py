@@ -0,0 +1,332 @@
+# collision: uniform-grid spatial hash broadphase + swept AABB movement
+
+from __future__ import annotations
+
+import itertools
+import math
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+import pygame
+
+CELL_SIZE = 128  # px per spatial hash cell, a couple of characters wide
+
+Cell = Tuple[int, int]
+
+
+class SpatialHash:
+    """Maps ids to the grid cells their rect overlaps. Queries only look at nearby cells."""
+
+    def __init__(self, cell_size: int = CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells: Dict[Cell, Set[int]] = {}
+        self._cells_of: Dict[int, Tuple[int, int, int, int]] = {}  # id -> cell range it's filed under
+
+    def _range(self, rect) -> Tuple[int, int, int, int]:
+        x, y, w, h = rect
+        cs = self.cell_size
+        return (math.floor(x / cs), math.floor(y / cs),
+                math.floor((x + max(w, 1) - 1e-6) / cs), math.floor((y + max(h, 1) - 1e-6) / cs))
+
+    def insert(self, item_id: int, rect) -> None:
+        cr = self._range(rect)
+        self._cells_of[item_id] = cr
+        x0, y0, x1, y1 = cr
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                self.cells.setdefault((cx, cy), set()).add(item_id)
+
+    def remove(self, item_id: int) -> None:
+        cr = self._cells_of.pop(item_id, None)
+        if cr is None:
+            return
+        x0, y0, x1, y1 = cr
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                bucket = self.cells.get((cx, cy))
+                if bucket is not None:
+                    bucket.discard(item_id)
+                    if not bucket:
+                        del self.cells[(cx, cy)]
+
+    def update(self, item_id: int, rect) -> None:
+        """Re-files an item only if it crossed into different cells."""
+        if self._cells_of.get(item_id) == self._range(rect):
+            return
+        self.remove(item_id)
+        self.insert(item_id, rect)
+
+    def query(self, rect) -> Set[int]:
+        x0, y0, x1, y1 = self._range(rect)
+        found: Set[int] = set()
+        cells = self.cells
+        if (x1 - x0 + 1) * (y1 - y0 + 1) > len(cells):
+            # big query over a sparse hash: walk the occupied cells instead
+            for (cx, cy), bucket in cells.items():
+                if x0 <= cx <= x1 and y0 <= cy <= y1:
+                    found |= bucket
+            return found
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                bucket = cells.get((cx, cy))
+                if bucket:
+                    found |= bucket
+        return found
+
+
+class Collider:
+    """Static box: walls, buildings, grow tents..."""
+    __slots__ = ("id", "rect", "tag", "owner")
+
+    def __init__(self, collider_id: int, rect: pygame.Rect, tag: Optional[str] = None, owner: Any = None):
+        self.id = collider_id
+        self.rect = rect
+        self.tag = tag
+        self.owner = owner
+
+
+class Body:
+    """Moving box (player, NPCs) with a float position."""
+    __slots__ = ("id", "x", "y", "w", "h", "owner", "solid")
+
+    def __init__(self, body_id: int, x: float, y: float, w: float, h: float,
+                 owner: Any = None, solid: bool = True):
+        self.id = body_id
+        self.x, self.y, self.w, self.h = x, y, w, h
+        self.owner = owner
+        self.solid = solid  # other bodies can't walk through it
+
+    @property
+    def box(self) -> Tuple[float, float, float, float]:
+        return self.x, self.y, self.w, self.h
+
+    @property
+    def rect(self) -> pygame.Rect:
+        return pygame.Rect(round(self.x), round(self.y), round(self.w), round(self.h))
+
+
+class CollisionWorld:
+    """
+    Static colliders and dynamic bodies, each in their own spatial hash, plus the
+    solid tiles of an optional world.World (the tile grid is already a uniform
+    grid, so tiles are looked up directly instead of being hashed). Everything
+    outside the tile map counts as solid, which keeps bodies on the map.
+    """
+
+    def __init__(self, tile_world=None, cell_size: int = CELL_SIZE):
+        self.tile_world = tile_world
+        self.static: Dict[int, Collider] = {}
+        self.bodies: Dict[int, Body] = {}
+        self._static_hash = SpatialHash(cell_size)
+        self._body_hash = SpatialHash(cell_size)
+        self._ids = itertools.count(1)
+        # called with the rect of each added/removed static collider
+        self.on_static_changed: List[Callable[[pygame.Rect], None]] = []
+
+    # --- registration ---
+
+    def add_static(self, rect, tag: Optional[str] = None, owner: Any = None) -> int:
+        collider = Collider(next(self._ids), pygame.Rect(rect), tag, owner)
+        self.static[collider.id] = collider
+        self._static_hash.insert(collider.id, collider.rect)
+        for callback in self.on_static_changed:
+            callback(collider.rect)
+        return collider.id
+
+    def remove_static(self, collider_id: int) -> None:
+        collider = self.static.pop(collider_id, None)
+        if collider is not None:
+            self._static_hash.remove(collider_id)
+            for callback in self.on_static_changed:
+                callback(collider.rect)
+
+    def add_body(self, rect, owner: Any = None, solid: bool = True) -> int:
+        x, y, w, h = rect
+        body = Body(next(self._ids), float(x), float(y), float(w), float(h), owner, solid)
+        self.bodies[body.id] = body
+        self._body_hash.insert(body.id, body.box)
+        return body.id
+
+    def remove_body(self, body_id: int) -> None:
+        if self.bodies.pop(body_id, None) is not None:
+            self._body_hash.remove(body_id)
+
+    def teleport(self, body_id: int, x: float, y: float) -> None:
+        body = self.bodies[body_id]
+        body.x, body.y = x, y
+        self._body_hash.update(body_id, body.box)
+
+    # --- queries ---
+
+    def query_rect(self, rect, static: bool = True, bodies: bool = True) -> List[Any]:
+        """Colliders and bodies overlapping `rect` (x, y, w, h in world px)."""
+        x, y, w, h = rect
+        hits: List[Any] = []
+        if static:
+            for cid in self._static_hash.query(rect):
+                c = self.static[cid]
+                if _overlaps((x, y, w, h), c.rect):
+                    hits.append(c)
+        if bodies:
+            for bid in self._body_hash.query(rect):
+                b = self.bodies[bid]
+                if _overlaps((x, y, w, h), b.box):
+                    hits.append(b)
+        return hits
+
+    def query_radius(self, center: Tuple[float, float], radius: float) -> List[Body]:
+        """Bodies whose center is within `radius` of `center`."""
+        cx, cy = center
+        r2 = radius * radius
+        found = []
+        for bid in self._body_hash.query((cx - radius, cy - radius, radius * 2, radius * 2)):
+            b = self.bodies[bid]
+            dx = b.x + b.w / 2 - cx
+            dy = b.y + b.h / 2 - cy
+            if dx * dx + dy * dy <= r2:
+                found.append(b)
+        return found
+
+    def solid_tiles(self, rect) -> Iterable[Tuple[int, int, int, int]]:
+        world = self.tile_world
+        if world is None or not world.may_be_solid(rect):
+            return []
+        from world import TILE_SIZE
+
+        x, y, w, h = rect
+        tx0, ty0 = math.floor(x / TILE_SIZE), math.floor(y / TILE_SIZE)
+        tx1, ty1 = math.floor((x + w - 1e-6) / TILE_SIZE), math.floor((y + h - 1e-6) / TILE_SIZE)
+        return [(tx * TILE_SIZE, ty * TILE_SIZE, TILE_SIZE, TILE_SIZE)
+                for ty in range(ty0, ty1 + 1) for tx in range(tx0, tx1 + 1) if world.is_solid(tx, ty)]
+
+    # --- movement ---
+
+    def move(self, body_id: int, dx: float, dy: float, bodies: bool = True) -> Tuple[float, float]:
+        """
+        Moves a body by (dx, dy) as far as sweep() allows and returns the
+        distance actually moved.
+        """
+        body = self.bodies[body_id]
+        moved_x, moved_y = self.sweep(body.box, dx, dy, ignore=body_id, bodies=bodies)
+        body.x += moved_x
+        body.y += moved_y
+        self._body_hash.update(body_id, body.box)
+        return moved_x, moved_y
+
+    def sweep(self, box, dx: float, dy: float, ignore: Optional[int] = None,
+              bodies: bool = True) -> Tuple[float, float]:
+        """
+        How far a box (x, y, w, h) can move by (dx, dy), stopping at the first
+        thing it would hit on each axis (x first, then y, so it slides along
+        walls). The swept area is checked, not just the end position, so fast
+        movers can't tunnel through thin walls. bodies=False only collides with
+        the static world; `ignore` is the mover's own body id.
+        """
+        x, y, w, h = box
+
+        # broadphase: everything overlapping the whole swept box
+        swept = (min(x, x + dx), min(y, y + dy), w + abs(dx), h + abs(dy))
+        blockers = [c.rect for c in self.query_rect(swept, bodies=False)]
+        blockers.extend(self.solid_tiles(swept))
+        if bodies:
+            for other in self.query_rect(swept, static=False):
+                if other.id != ignore and other.solid:
+                    blockers.append(other.box)
+
+        moved_x = _sweep_axis(x, y, w, h, dx, blockers, axis=0)
+        moved_y = _sweep_axis(x + moved_x, y, w, h, dy, blockers, axis=1)
+        return moved_x, moved_y
+
+    def sweep_many(self, x: np.ndarray, y: np.ndarray, size: float, dx: np.ndarray, dy: np.ndarray):
+        """
+        sweep() for many same-sized boxes at once against the static world (no
+        bodies), for crowds. Colliders are resolved in one vectorized pass; only
+        boxes that could touch a solid tile or the map edge fall back to sweep().
+        Returns arrays of the distances actually moved.
+        """
+        x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+        dx, dy = np.asarray(dx, dtype=np.float64), np.asarray(dy, dtype=np.float64)
+        if not x.size:
+            return dx.copy(), dy.copy()
+        left, top = x + np.minimum(dx, 0), y + np.minimum(dy, 0)
+        right, bottom = x + size + np.maximum(dx, 0), y + size + np.maximum(dy, 0)
+        x0, y0 = float(left.min()), float(top.min())
+        union = (x0, y0, float(right.max()) - x0, float(bottom.max()) - y0)
+
+        statics = [tuple(c.rect) for c in self.query_rect(union, bodies=False)]
+        statics = np.array(statics, dtype=np.float64).reshape(-1, 4)
+        moved_x = _sweep_axis_many(x, y, size, dx, statics, axis=0)
+        moved_y = _sweep_axis_many(x + moved_x, y, size, dy, statics, axis=1)
+
+        world = self.tile_world
+        if world is not None:
+            bounds = world.pixel_rect
+            tricky = ((left < bounds.left) | (top < bounds.top)
+                      | (right > bounds.right) | (bottom > bounds.bottom))
+            for r in world.solid_chunk_rects(union):
+                tricky |= (left < r.right) & (r.left < right) & (top < r.bottom) & (r.top < bottom)
+            for i in np.flatnonzero(tricky).tolist():
+                moved_x[i], moved_y[i] = self.sweep((x[i], y[i], size, size), dx[i], dy[i], bodies=False)
+        return moved_x, moved_y
+
+    def blocker_regions(self, rect) -> List[pygame.Rect]:
+        """
+        Coarse rects covering everything static that could block movement inside
+        `rect`: colliders as they are, solid tiles as whole chunks. Lets callers
+        moving many boxes at once skip sweep() for the ones that can't hit anything.
+        """
+        regions = [c.rect for c in self.query_rect(rect, bodies=False)]
+        if self.tile_world is not None:
+            regions.extend(self.tile_world.solid_chunk_rects(rect))
+        return regions
+
+
+def _overlaps(a, b) -> bool:
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    return ax < bx + bw and bx < ax + aw and ay < by + bh and by < ay + ah
+
+
+def _sweep_axis(x: float, y: float, w: float, h: float, delta: float, blockers, axis: int) -> float:
+    """How far a box can move along one axis before touching a blocker."""
+    if delta == 0:
+        return 0.0
+    allowed = delta
+    for bx, by, bw, bh in blockers:
+        if axis == 0:
+            if not (y < by + bh and by < y + h):
+                continue  # not in our lane
+            if delta > 0 and bx >= x + w - 1e-9:
+                allowed = min(allowed, bx - (x + w))
+            elif delta < 0 and bx + bw <= x + 1e-9:
+                allowed = max(allowed, (bx + bw) - x)
+        else:
+            if not (x < bx + bw and bx < x + w):
+                continue
+            if delta > 0 and by >= y + h - 1e-9:
+                allowed = min(allowed, by - (y + h))
+            elif delta < 0 and by + bh <= y + 1e-9:
+                allowed = max(allowed, (by + bh) - y)
+    return allowed
+
+
+def _sweep_axis_many(x: np.ndarray, y: np.ndarray, size: float, delta: np.ndarray,
+                     blockers: np.ndarray, axis: int) -> np.ndarray:
+    """_sweep_axis for n boxes against m blocker rects, as (n, m) arrays."""
+    if not blockers.size:
+        return delta.copy()
+    bx, by, bw, bh = (blockers[:, k][None, :] for k in range(4))
+    x, y, delta = x[:, None], y[:, None], delta[:, None]
+    if axis == 0:
+        lane = (y < by + bh) & (by < y + size)
+        ahead = np.where(delta > 0, bx >= x + size - 1e-9, bx + bw <= x + 1e-9)
+        limit = np.where(delta > 0, bx - (x + size), (bx + bw) - x)
+    else:
+        lane = (x < bx + bw) & (bx < x + size)
+        ahead = np.where(delta > 0, by >= y + size - 1e-9, by + bh <= y + 1e-9)
+        limit = np.where(delta > 0, by - (y + size), (by + bh) - y)
+    hit = lane & ahead & (delta != 0)
+    forward = np.where(hit, np.where(delta > 0, limit, np.inf), np.inf).min(axis=1)
+    backward = np.where(hit, np.where(delta < 0, limit, -np.inf), -np.inf).max(axis=1)
+    delta = delta[:, 0]
+    return np.where(delta > 0, np.minimum(delta, forward), np.maximum(delta, backward))
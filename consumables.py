@@ -6,6 +6,8 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Literal, Optional
 
+import content
+
 MediumType = Literal["soil", "organic_soil", "no_till", "peat_coco", "coco_rockwool"]
 GeneticType = Literal["autoflower", "rando_cuts", "breeder_cuts"]
 NutrientType = Literal["worms", "cover_crop", "synthetics", "secret_sauce",
@@ -47,96 +49,29 @@ class Genetics:
 
 
 # --------- Definitions (your notes -> real numbers) ---------
+# The numbers live in data/consumables.json (see content.py). These dicts are
+# filled from it at import and updated in place on a hot reload, so modules
+# that imported them keep seeing the current values.
+
+def _definitions(entries, cls):
+    return {key: cls(key=key, **fields) for key, fields in entries.items()}
+
+
+MEDIUMS: dict[MediumType, Medium] = _definitions(content.get()["mediums"], Medium)
+NUTRIENTS: dict[NutrientType, Nutrient] = _definitions(content.get()["nutrients"], Nutrient)
+GENETICS: dict[GeneticType, Genetics] = _definitions(content.get()["genetics"], Genetics)
+
+_TABLES = (("mediums", MEDIUMS, Medium), ("nutrients", NUTRIENTS, Nutrient), ("genetics", GENETICS, Genetics))
+
+
+def _reload(data, changed) -> None:
+    for kind, table, cls in _TABLES:
+        if kind in changed:
+            table.clear()
+            table.update(_definitions(data[kind], cls))
+
 
-MEDIUMS: dict[MediumType, Medium] = {
-    "soil": Medium(
-        key="soil",
-        display_name="Soil",
-        growth_speed_mult=0.90,     # "slow growing"
-        fail_chance=0.20,
-        runs_before_replace=1,
-        yield_mult=0.10,
-        quality_base=5,
-    ),
-    "organic_soil": Medium(
-        key="organic_soil",
-        display_name="Organic Soil",
-        growth_speed_mult=1.00,     # 10% faster than soil (soil=0.90 => ~1.0)
-        fail_chance=0.10,
-        runs_before_replace=2,
-        yield_mult=0.25,
-        quality_base=6,
-    ),
-    "no_till": Medium(
-        key="no_till",
-        display_name="No-Till",
-        growth_speed_mult=1.10,     # 20% faster than soil (0.90*1.2=1.08-ish)
-        fail_chance=0.00,
-        runs_before_replace=4,
-        yield_mult=0.50,
-        quality_base=7,
-    ),
-    "peat_coco": Medium(
-        key="peat_coco",
-        display_name="Peat/Coco Blend",
-        growth_speed_mult=1.125,    # 25% faster than soil (0.90*1.25=1.125)
-        fail_chance=0.10,
-        runs_before_replace=1,
-        yield_mult=0.75,
-        quality_base=6,
-        water_need_mult=1.25,
-    ),
-    "coco_rockwool": Medium(
-        key="coco_rockwool",
-        display_name="Coco/Rockwool",
-        growth_speed_mult=1.17,     # 30% faster than soil (0.90*1.3=1.17)
-        fail_chance=0.10,
-        runs_before_replace=1,
-        yield_mult=1.00,
-        quality_base=6,
-        irrigation_required=True,
-        water_need_mult=1.35,
-    ),
-}
-
-NUTRIENTS: dict[NutrientType, Nutrient] = {
-    # Soil additives
-    "worms": Nutrient("worms", "Worm Castings", target="soil", growth_speed_bonus=0.05),
-    "cover_crop": Nutrient("cover_crop", "Cover Crop", target="soil", yield_bonus=0.05),
-    "synthetics": Nutrient("synthetics", "Synthetics", target="soil", growth_speed_bonus=0.10),
-    "secret_sauce": Nutrient("secret_sauce", "Secret Sauce", target="soil", quality_bonus=0.10),
-
-    # Hydro nutrients
-    "salts": Nutrient("salts", "Ya Boy's Salts", target="hydro", growth_speed_bonus=0.08, yield_bonus=0.08),
-    "pro_blend": Nutrient("pro_blend", "Pro Blend", target="hydro", growth_speed_bonus=0.06, quality_bonus=0.06),
-
-    # Cloning
-    "cloning_gel": Nutrient("cloning_gel", "Cloning Gel", target="cloning", clone_success_bonus=0.15),
-}
-
-GENETICS: dict[GeneticType, Genetics] = {
-    "autoflower": Genetics(
-        key="autoflower",
-        display_name="Autoflower",
-        quality_mult=0.85,
-        fail_chance_mult=1.25,
-        yield_mult=0.80,
-    ),
-    "rando_cuts": Genetics(
-        key="rando_cuts",
-        display_name="Random Cuts",
-        quality_mult=1.00,
-        fail_chance_mult=1.00,
-        yield_mult=1.00,
-    ),
-    "breeder_cuts": Genetics(
-        key="breeder_cuts",
-        display_name="Breeder Cuts",
-        quality_mult=1.15,
-        fail_chance_mult=0.70,
-        yield_mult=1.20,
-    ),
-}
+content.on_reload.append(_reload)
 
 
 # --------- Simple calculator helpers (so you can test balance) ---------
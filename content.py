@@ -0,0 +1,406 @@
+# content pipeline: game definitions (mediums, nutrients, genetics, skills) live in data/*.json
+#
+#   python content.py       validate data/ and rebuild the compiled cache (exit 1 on errors)
+#
+# load() reads every data/*.json, validates each entry against SCHEMAS and
+# returns plain dicts, which consumables.py and skills.py turn into their
+# definition objects at import. The validated result is compiled into
+# .content_cache/content.bin (binfmt) together with the mtime/size of every
+# source, so later launches skip parsing and validation until a file changes.
+#
+# While the game runs a ContentWatcher polls data/. A changed file is loaded
+# and validated on the watcher thread; poll() (once per frame, main thread)
+# applies it between ticks: the definition dicts are updated in place, so every
+# module holding a reference sees the new numbers, and the on_reload hooks
+# refresh anything derived from them (effect tables, plantsim rate tables...).
+
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+import binfmt
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(HERE, "data")
+CACHE_PATH = os.path.join(HERE, ".content_cache", "content.bin")
+CACHE_VERSION = 1        # bump when validation/normalization changes what gets compiled
+WATCH_INTERVAL = 0.25    # seconds between checks of data/ while the game runs
+
+Content = Dict[str, Dict[str, Dict[str, Any]]]   # kind -> key -> fields
+
+
+class ContentError(ValueError):
+    """Data files that don't parse or validate. str() lists every problem, one per line."""
+
+    def __init__(self, problems: List[str]):
+        super().__init__("\n".join(problems))
+        self.problems = problems
+
+
+# ---------- Schemas ----------
+
+@dataclass(frozen=True)
+class Field:
+    kind: type                  # float accepts ints too; bools are never numbers
+    required: bool = True
+    low: Optional[float] = None
+    high: Optional[float] = None
+    choices: Tuple[str, ...] = ()
+
+
+SCHEMAS: Dict[str, Dict[str, Field]] = {
+    "mediums": {
+        "display_name": Field(str),
+        "growth_speed_mult": Field(float, low=0.0),
+        "fail_chance": Field(float, low=0.0, high=1.0),
+        "runs_before_replace": Field(int, low=1),
+        "yield_mult": Field(float, low=0.0),
+        "quality_base": Field(int, low=0, high=10),
+        "water_need_mult": Field(float, required=False, low=0.0),
+        "irrigation_required": Field(bool, required=False),
+    },
+    "nutrients": {
+        "display_name": Field(str),
+        "target": Field(str, choices=("soil", "hydro", "cloning")),
+        "growth_speed_bonus": Field(float, required=False),
+        "yield_bonus": Field(float, required=False),
+        "quality_bonus": Field(float, required=False),
+        "clone_success_bonus": Field(float, required=False),
+    },
+    "genetics": {
+        "display_name": Field(str),
+        "quality_mult": Field(float, low=0.0),
+        "fail_chance_mult": Field(float, low=0.0),
+        "yield_mult": Field(float, low=0.0),
+    },
+    "skills": {
+        "display_name": Field(str),
+        "category": Field(str, choices=("cultivation", "business", "combat")),
+        "effects": Field(dict, required=False),
+    },
+}
+
+# one skill effect: value = base + per_level * (level - 1), plus `amount` for every
+# "level": amount step reached, then clamped to [min, max]
+EFFECT_SCHEMA: Dict[str, Field] = {
+    "base": Field(float, required=False),
+    "per_level": Field(float, required=False),
+    "min": Field(float, required=False),
+    "max": Field(float, required=False),
+    "steps": Field(dict, required=False),
+}
+
+NOTES_FIELD = "notes"  # free text for designers, allowed on any entry and dropped when compiling
+
+
+def _type_ok(value: Any, kind: type) -> bool:
+    if isinstance(value, bool):
+        return kind is bool
+    if kind is float:
+        return isinstance(value, (int, float))
+    return isinstance(value, kind)
+
+
+_TYPE_NAMES = {str: "a string", float: "a number", int: "an integer", bool: "true/false", dict: "an object"}
+
+
+def _check_fields(where: str, entry: Any, schema: Dict[str, Field], problems: List[str]) -> Dict[str, Any]:
+    if not isinstance(entry, dict):
+        problems.append(f"{where}: expected an object, got {entry!r}")
+        return {}
+    out = {}
+    for name, value in entry.items():
+        if name == NOTES_FIELD:
+            continue
+        spec = schema.get(name)
+        if spec is None:
+            problems.append(f"{where}.{name}: unknown field (expected one of {', '.join(schema)})")
+        elif not _type_ok(value, spec.kind):
+            problems.append(f"{where}.{name}: expected {_TYPE_NAMES[spec.kind]}, got {value!r}")
+        elif spec.low is not None and value < spec.low:
+            problems.append(f"{where}.{name}: {value!r} is below the minimum {spec.low}")
+        elif spec.high is not None and value > spec.high:
+            problems.append(f"{where}.{name}: {value!r} is above the maximum {spec.high}")
+        elif spec.choices and value not in spec.choices:
+            problems.append(f"{where}.{name}: {value!r} is not one of {', '.join(spec.choices)}")
+        else:
+            out[name] = float(value) if spec.kind is float else value
+    for name, spec in schema.items():
+        if spec.required and name not in entry:
+            problems.append(f"{where}: missing {name}")
+    return out
+
+
+def _check_effect(where: str, entry: Any, problems: List[str]) -> Dict[str, Any]:
+    fields = _check_fields(where, entry, EFFECT_SCHEMA, problems)
+    steps = []
+    for level, amount in fields.get("steps", {}).items():
+        if not level.isdigit() or int(level) < 1:
+            problems.append(f"{where}.steps: level {level!r} isn't a positive whole number")
+        elif not _type_ok(amount, float):
+            problems.append(f"{where}.steps.{level}: expected a number, got {amount!r}")
+        else:
+            steps.append([int(level), float(amount)])
+    low, high = fields.get("min"), fields.get("max")
+    if low is not None and high is not None and low > high:
+        problems.append(f"{where}: min {low} is above max {high}")
+    return {"base": fields.get("base", 0.0), "per_level": fields.get("per_level", 0.0),
+            "min": low, "max": high, "steps": sorted(steps)}
+
+
+def validate(sources: Dict[str, Any]) -> Content:
+    """
+    {file name: parsed json} -> {kind: {key: fields}}. Fields are type/range
+    checked and normalized (ints where floats are expected become floats,
+    skill effects get every key filled in); raises ContentError listing every
+    problem at once.
+    """
+    problems: List[str] = []
+    content: Content = {}
+    seen: Dict[str, str] = {}
+    for name in sorted(sources):
+        data = sources[name]
+        if not isinstance(data, dict):
+            problems.append(f"{name}: expected an object of {', '.join(SCHEMAS)}")
+            continue
+        for kind, entries in data.items():
+            where = f"{name}: {kind}"
+            if kind not in SCHEMAS:
+                problems.append(f"{where}: unknown section (expected one of {', '.join(SCHEMAS)})")
+                continue
+            if kind in seen:
+                problems.append(f"{where}: already defined in {seen[kind]}")
+                continue
+            seen[kind] = name
+            if not isinstance(entries, dict) or not entries:
+                problems.append(f"{where}: expected an object with at least one entry")
+                continue
+            table = content[kind] = {}
+            for key, entry in entries.items():
+                fields = _check_fields(f"{where}.{key}", entry, SCHEMAS[kind], problems)
+                if kind == "skills":
+                    effects = fields.get("effects", {})
+                    fields["effects"] = {
+                        effect: _check_effect(f"{where}.{key}.effects.{effect}", spec, problems)
+                        for effect, spec in effects.items()}
+                table[key] = fields
+    for kind in SCHEMAS:
+        if kind not in seen:
+            problems.append(f"no data file defines {kind}")
+    if problems:
+        raise ContentError(problems)
+    return content
+
+
+# ---------- Loading / compiled cache ----------
+
+def source_stamps(data_dir: str = DATA_DIR) -> Dict[str, List[int]]:
+    """{file name: [mtime_ns, size]} of every .json in data_dir."""
+    stamps = {}
+    with os.scandir(data_dir) as it:
+        for entry in it:
+            if entry.name.endswith(".json") and entry.is_file():
+                st = entry.stat()
+                stamps[entry.name] = [st.st_mtime_ns, st.st_size]
+    return stamps
+
+
+def compile_sources(data_dir: str = DATA_DIR) -> Content:
+    """Parses and validates data_dir, no cache involved."""
+    sources, problems = {}, []
+    for name in sorted(source_stamps(data_dir)):
+        try:
+            with open(os.path.join(data_dir, name), encoding="utf-8") as f:
+                sources[name] = json.load(f)
+        except ValueError as e:
+            problems.append(f"{name}: {e}")
+    if problems:
+        raise ContentError(problems)
+    return validate(sources)
+
+
+def _read_cache(cache_path: str, stamps: Dict[str, List[int]]) -> Optional[Content]:
+    try:
+        with open(cache_path, "rb") as f:
+            cached = binfmt.unpackb(f.read())
+    except (OSError, binfmt.FormatError):
+        return None
+    if (not isinstance(cached, dict) or cached.get("version") != CACHE_VERSION
+            or cached.get("sources") != stamps):
+        return None
+    return cached["content"]
+
+
+def _write_cache(cache_path: str, stamps: Dict[str, List[int]], content: Content) -> None:
+    tmp = cache_path + ".tmp"
+    try:
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        with open(tmp, "wb") as f:
+            f.write(binfmt.packb({"version": CACHE_VERSION, "sources": stamps, "content": content}))
+        os.replace(tmp, cache_path)
+    except OSError:
+        pass  # the cache is only an optimization
+
+
+def load(data_dir: str = DATA_DIR, cache_path: Optional[str] = CACHE_PATH) -> Content:
+    """
+    The validated content of data_dir: straight from the compiled cache when
+    no source changed since it was written, otherwise compiled (and cached) again.
+    """
+    stamps = source_stamps(data_dir)
+    if cache_path:
+        content = _read_cache(cache_path, stamps)
+        if content is not None:
+            return content
+    content = compile_sources(data_dir)
+    if cache_path and source_stamps(data_dir) == stamps:  # don't cache a file that changed while we read it
+        _write_cache(cache_path, stamps, content)
+    return content
+
+
+_current: Optional[Content] = None
+_lock = threading.Lock()  # consumables/skills can be first imported from a loader thread
+
+
+def get() -> Content:
+    """The content the game is running with (loaded on first use)."""
+    global _current
+    with _lock:
+        if _current is None:
+            _current = load()
+        return _current
+
+
+# ---------- Hot reload ----------
+
+# hook(content, changed kinds), called in registration order after a reload was
+# applied; modules register theirs at import (consumables before plantsim, etc.)
+on_reload: List[Callable[[Content, Set[str]], None]] = []
+
+
+def apply(content: Content) -> Set[str]:
+    """
+    Makes `content` current and runs the on_reload hooks for the kinds that
+    changed. Definitions can be added or edited, but not removed: saves and
+    plant id tables may still refer to them (restart to drop one).
+    """
+    global _current
+    old = get()
+    removed = [f"{kind}.{key}: can't be removed while the game is running (restart to drop it)"
+               for kind, table in old.items() for key in table if key not in content.get(kind, {})]
+    if removed:
+        raise ContentError(removed)
+    changed = {kind for kind in content if content[kind] != old.get(kind)}
+    with _lock:
+        _current = content
+    for hook in list(on_reload):
+        hook(content, changed)
+    return changed
+
+
+class ContentWatcher:
+    """
+    Watches data/ from a background thread. Changes are compiled there and
+    handed over; poll() applies them on the caller's thread, so call it
+    between ticks (GameScene does it once per frame).
+    """
+
+    def __init__(self, data_dir: str = DATA_DIR, cache_path: Optional[str] = CACHE_PATH,
+                 interval: float = WATCH_INTERVAL):
+        self.data_dir = data_dir
+        self.cache_path = cache_path
+        self.interval = interval
+        self.reloads = 0
+        self.last_error: Optional[ContentError] = None
+        self._stamps = source_stamps(data_dir)            # what the current content was built from
+        self._settling: Optional[Dict[str, List[int]]] = None
+        self._pending: Optional[Tuple[Content, float]] = None   # (content, compile ms)
+        self._pending_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "ContentWatcher":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="content-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def check(self) -> bool:
+        """
+        Compiles data/ once a change has settled (same stamps on two checks in
+        a row, so a half-written file isn't picked up); True when there's
+        something for poll().
+        """
+        try:
+            stamps = source_stamps(self.data_dir)
+        except OSError:
+            return False
+        if stamps == self._stamps:
+            self._settling = None
+            return False
+        if stamps != self._settling:
+            self._settling = stamps
+            return False
+        self._stamps, self._settling = stamps, None
+        start = time.perf_counter()
+        try:
+            content = load(self.data_dir, self.cache_path)
+        except ContentError as e:
+            self._report(e)  # keep running on the old definitions until the file is fixed
+            return False
+        with self._pending_lock:
+            self._pending = (content, (time.perf_counter() - start) * 1000.0)
+        return True
+
+    def poll(self) -> Set[str]:
+        """Applies a finished reload, if any. Returns the kinds that changed."""
+        with self._pending_lock:
+            pending, self._pending = self._pending, None
+        if pending is None:
+            return set()
+        content, ms = pending
+        try:
+            changed = apply(content)
+        except ContentError as e:
+            self._report(e)
+            return set()
+        self.last_error = None
+        self.reloads += 1
+        if changed:
+            print(f"content: reloaded {', '.join(sorted(changed))} ({ms:.1f} ms)")
+        return changed
+
+    def _report(self, error: ContentError) -> None:
+        self.last_error = error
+        print("content: reload failed, keeping the current definitions:\n  " + "\n  ".join(error.problems))
+
+
+def main() -> int:
+    start = time.perf_counter()
+    try:
+        content = compile_sources()
+    except ContentError as e:
+        print("\n".join(e.problems))
+        return 1
+    _write_cache(CACHE_PATH, source_stamps(), content)
+    counts = ", ".join(f"{len(table)} {kind}" for kind, table in content.items())
+    print(f"compiled {counts} in {(time.perf_counter() - start) * 1000.0:.1f} ms -> {CACHE_PATH}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,28 @@
 #equipment stats and wearables go here
 
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+
+@dataclass(frozen=True)
+class Irrigation:
+    key: str
+    display_name: str
+    refill_per_day: float             # fraction of a pot's water it can top up per day (1.0 = full pot)
+    reservoir_liters: Optional[float] # None = no reservoir, you water by hand
+    automated: bool = False
+
+
+IRRIGATION: Dict[str, Irrigation] = {
+    "pitcher": Irrigation("pitcher", "Pitcher", refill_per_day=0.0, reservoir_liters=None),
+    "hose": Irrigation("hose", "Hose", refill_per_day=0.0, reservoir_liters=None),
+    # smaller rez, more filling
+    "drip": Irrigation("drip", "Drip Irrigation", refill_per_day=1.5, reservoir_liters=60.0, automated=True),
+    # huge rez, fastest xp gain in class
+    "dwc": Irrigation("dwc", "DWC", refill_per_day=3.0, reservoir_liters=400.0, automated=True),
+}
+
+
 class Grow:
     #Lights
         #T5
@@ -1,69 +1,630 @@
 # game loop goes here to be called in main.py
 
+import hashlib
 import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 import pygame
 
+import binfmt
+import content
+import profiler
+from buildings import home_buildings
+from catchup import game_days
+from collision import CollisionWorld
+from npc import ARCHETYPE_KEYS, Crowd
+from pathfinding import TICK_SLICES, PathService
+from plantsim import STAGES
+from renderer import DirtyRenderer
+from savegame import GameState
+from scenes import QUIT, Scene
+from sprites import Sprite, SpriteBatch, SpriteGroup, build_default_atlas
+from ui import Hud
+from world import HOME_ORIGIN, HOME_TILES, TILE_SIZE, Camera, World, build_home_world, home_center
+
 PLAYER_SIZE = 64
 PLAYER_SPEED = 260  # pixels per second
+PLAYER_COLOR = (50, 180, 255)
+PLANT_SPACING = 40  # px between plants drawn in a grow tent
 
 DEBUG_DRAW_COLLIDERS = False
+COLLIDER_COLORS = {"wall": (255, 60, 60), "grow_tent": (60, 255, 120),
+                   "body": (255, 220, 40), "tile": (255, 60, 200)}
+
+SAVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "saves", "slot1")
+AUTOSAVE_SECONDS = 60.0  # only dirty sections get written, on a background thread
+
+RENDER_FPS = 60
+LOGIC_HZ = 120
+LOGIC_DT = 1.0 / LOGIC_HZ
+MAX_CATCHUP_STEPS = 8  # after a stall, run at most this many updates per frame and drop the rest
+
+NPCS_PER_ARCHETYPE = 400  # 3200 customers around the neighborhood
+CROWD_EVERY = LOGIC_HZ // RENDER_FPS  # the crowd is ticked once per rendered frame, not every logic step
 
+HEADLESS_DT = LOGIC_DT  # run_headless ticks are the same fixed logic steps
 
 
-def run_game(screen, clock):
-    
-    bg_path = os.path.join(os.path.dirname(__file__), "assets", "home_bg.png")
-    background = pygame.image.load(bg_path).convert()  # use convert_alpha() if it has transparency
-    background = pygame.transform.scale(background, screen.get_size())
+# --- input ---
 
-    # --- world setup ---
-    player_rect = pygame.Rect(0,0, PLAYER_SIZE, PLAYER_SIZE)
-    player_rect.center = screen.get_rect().center
+@dataclass(frozen=True)
+class FrameInput:
+    """Everything the update step needs to know about input for one tick."""
+    left: bool = False
+    right: bool = False
+    up: bool = False
+    down: bool = False
+    quit: bool = False
+    back: bool = False
 
 
-    
+NO_INPUT = FrameInput()
 
-    while True:
-        dt = clock.tick(60) / 1000.0  # seconds since last frame
 
-        # --- events ---
-        for event in pygame.event.get():
+class KeyboardInput:
+    """Live input from the pygame event queue + held keys (normal windowed game)."""
+
+    def poll(self, tick: int, events=None) -> FrameInput:
+        """`events` are this frame's events if someone else already pulled them off the queue."""
+        quit_requested = False
+        back = False
+        for event in pygame.event.get() if events is None else events:
+            if profiler.handle_debug_key(event):
+                continue
             if event.type == pygame.QUIT:
-                return "QUIT"
+                quit_requested = True
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE:
-                    return "MENU"  # or return "QUIT" if you prefer
+                    back = True
 
-        # --- input (continuous) ---
         keys = pygame.key.get_pressed()
-        vx = vy = 0.0
+        return FrameInput(
+            left=bool(keys[pygame.K_a]),
+            right=bool(keys[pygame.K_d]),
+            up=bool(keys[pygame.K_w]),
+            down=bool(keys[pygame.K_s]),
+            quit=quit_requested,
+            back=back,
+        )
+
+
+class ScriptedInput:
+    """
+    Plays back a script of (tick, FrameInput) change points for headless runs.
+    The input at a change point is held until the next one. With loop=True the
+    script repeats (the first entry should then be at tick 0).
+    """
+
+    def __init__(self, script: Sequence[Tuple[int, FrameInput]], loop: bool = False):
+        self.script = sorted(script, key=lambda entry: entry[0])
+        self.loop = loop
+        self._length = self.script[-1][0] + 1 if self.script else 0
+        self._index = 0
+        self._current = NO_INPUT
+
+    def poll(self, tick: int) -> FrameInput:
+        if not self.script:
+            return NO_INPUT
+        if self.loop:
+            tick %= self._length
+            if tick == 0:
+                self._index = 0
+        while self._index < len(self.script) and self.script[self._index][0] <= tick:
+            self._current = self.script[self._index][1]
+            self._index += 1
+        return self._current
+
+
+def random_walk_script(seed: int, ticks: int, min_hold: int = 15,
+                       max_hold: int = 120) -> List[Tuple[int, FrameInput]]:
+    """Deterministic wandering script (same seed -> same run), handy for soak tests."""
+    rng = random.Random(seed)
+    script = []
+    tick = 0
+    while tick < ticks:
+        script.append((tick, FrameInput(
+            left=rng.random() < 0.3,
+            right=rng.random() < 0.3,
+            up=rng.random() < 0.3,
+            down=rng.random() < 0.3,
+        )))
+        tick += rng.randint(min_hold, max_hold)
+    return script
+
+
+def move_velocity(inp: FrameInput) -> Tuple[float, float]:
+    vx = vy = 0.0
+
+    if inp.left:
+        vx = -PLAYER_SPEED
+    if inp.right:
+        vx = PLAYER_SPEED
+    if inp.up:
+        vy = -PLAYER_SPEED
+    if inp.down:
+        vy = PLAYER_SPEED
+
+    # prevent faster diagonal movement
+    if vx != 0 and vy != 0:
+        vx *= 0.7071
+        vy *= 0.7071
+    return vx, vy
+
+
+# --- fixed timestep ---
+
+class FixedTimestep:
+    """
+    Accumulator for running game logic at a fixed rate, independent of the
+    render frame rate. Call advance() once per rendered frame with the real
+    frame time; it returns how many logic steps to run, and `alpha` is how far
+    we are between the last step and the next one (for render interpolation).
+    """
+
+    def __init__(self, step: float = LOGIC_DT, max_steps: int = MAX_CATCHUP_STEPS):
+        self.step = step
+        self.max_steps = max_steps
+        self.accumulator = 0.0
+        self.dropped_time = 0.0  # game time skipped because of catch-up limits
+
+    def advance(self, frame_dt: float) -> int:
+        self.accumulator += frame_dt
+        steps = int(self.accumulator / self.step)
+        if steps > self.max_steps:
+            # spiral-of-death guard: don't try to catch up on the whole stall
+            self.dropped_time += (steps - self.max_steps) * self.step
+            steps = self.max_steps
+            self.accumulator = self.accumulator % self.step
+        else:
+            self.accumulator -= steps * self.step
+        return steps
+
+    @property
+    def alpha(self) -> float:
+        return self.accumulator / self.step
+
+
+# --- update / draw (shared by the real game and headless runs) ---
+
+class PlayerMotion:
+    """Player position kept in floats so small per-step moves don't get truncated away."""
+
+    def __init__(self, center: Tuple[float, float], size: int = PLAYER_SIZE,
+                 collision: Optional[CollisionWorld] = None):
+        self.size = size
+        self.x = float(center[0]) - size / 2
+        self.y = float(center[1]) - size / 2
+        self.prev_x = self.x
+        self.prev_y = self.y
+        self.collision = collision
+        self.body_id = collision.add_body((self.x, self.y, size, size), owner=self) if collision else None
+
+    def step(self, inp: FrameInput, dt: float) -> None:
+        vx, vy = move_velocity(inp)
+        self.prev_x = self.x
+        self.prev_y = self.y
+        if self.collision is None:
+            self.x += vx * dt
+            self.y += vy * dt
+        elif vx or vy:
+            self.collision.move(self.body_id, vx * dt, vy * dt)
+            body = self.collision.bodies[self.body_id]
+            self.x, self.y = body.x, body.y
+
+    def rect(self, alpha: float = 1.0) -> pygame.Rect:
+        """Rect to draw at, interpolated between the previous and current logic step."""
+        x = self.prev_x + (self.x - self.prev_x) * alpha
+        y = self.prev_y + (self.y - self.prev_y) * alpha
+        return pygame.Rect(round(x), round(y), self.size, self.size)
+
+
+class Simulation:
+    """
+    Everything that advances with logic ticks: the player's movement, the crowd
+    and, in the real game, the economy. The same start state, input per tick
+    and seed always lead to the same state: the crowd's LOD view follows the
+    player's logic position rather than the interpolated camera, path work
+    runs on crowd ticks with a fixed work (not wall time) budget, and each
+    crowd tick reseeds the crowd/market RNGs from (seed, tick). replay.py
+    records and replays sessions on top of this.
+
+    `sections` are extra objects to checkpoint (the save sections in the game),
+    each with save_state()/load_state() or, for a complete picture of
+    in-between state, snapshot()/restore().
+    """
+
+    def __init__(self, player: PlayerMotion, crowd: Optional[Crowd] = None,
+                 paths: Optional[PathService] = None, view_size: Tuple[int, int] = (1280, 720),
+                 seed: int = 0, market=None, progression=None,
+                 sections: Optional[Dict[str, object]] = None, dt: float = LOGIC_DT):
+        self.player = player
+        self.crowd = crowd
+        self.paths = paths
+        self.view_size = view_size
+        self.seed = seed
+        self.market = market
+        self.progression = progression
+        self.sections = sections if sections is not None else {}
+        self.dt = dt
+        self.tick = 0
+
+    def step(self, inp: FrameInput) -> None:
+        dt = self.dt
+        self.player.step(inp, dt)
+        crowd = self.crowd
+        if crowd is not None and self.tick % CROWD_EVERY == 0:
+            rng = np.random.default_rng((self.seed, self.tick))
+            crowd.rng = rng
+            crowd.tick(dt * CROWD_EVERY, view_around(self.player.rect().center, self.view_size))
+            if self.paths is not None:
+                # a work budget, not wall time: same progress on any machine
+                self.paths.update(slices=TICK_SLICES)
+            if self.progression is not None:
+                self.progression.tick(game_days(dt * CROWD_EVERY))
+            if self.market is not None:
+                self.market.rng = rng
+                self.market.update(crowd.minutes)
+        self.tick += 1
+
+    def _parts(self) -> Dict[str, object]:
+        parts = dict(self.sections)
+        if self.crowd is not None:
+            parts["crowd"] = self.crowd
+        if self.market is not None:
+            parts["market"] = self.market
+        return parts
+
+    def snapshot(self) -> Dict[str, object]:
+        """Checkpoint of everything step() advances. Read-only: taking one never changes the game."""
+        p = self.player
+        data = {"tick": self.tick, "motion": [p.x, p.y, p.prev_x, p.prev_y]}
+        if self.progression is not None:
+            data["xp_carry"] = self.progression.xp_carry
+        for name, part in self._parts().items():
+            data[name] = part.snapshot() if hasattr(part, "snapshot") else part.save_state()
+        owner = data.get("player")
+        if isinstance(owner, dict):
+            # the Player section's position is a copy of "motion" that only GameScene.save() updates;
+            # leave it out so the hash doesn't depend on when the last (auto)save happened
+            owner.pop("pos", None)
+        return data
+
+    def restore(self, data: Dict[str, object]) -> None:
+        self.tick = int(data["tick"])
+        p = self.player
+        p.x, p.y, p.prev_x, p.prev_y = (float(v) for v in data["motion"])
+        if p.collision is not None:
+            p.collision.teleport(p.body_id, p.x, p.y)
+        if self.progression is not None:
+            self.progression.xp_carry = float(data["xp_carry"])
+        for name, part in self._parts().items():
+            if hasattr(part, "restore"):
+                part.restore(data[name])
+            else:
+                part.load_state(data[name])
+
+    def state_hash(self) -> str:
+        """Short digest of snapshot(), to compare runs tick for tick."""
+        return hashlib.blake2b(binfmt.packb(self.snapshot()), digest_size=8).hexdigest()
+
+
+def build_home_collision(world: World) -> CollisionWorld:
+    collision = CollisionWorld(world)
+    for building in home_buildings():
+        building.add_colliders(collision)
+    return collision
+
+
+def build_home_crowd(world: World, collision: Optional[CollisionWorld], seed: Optional[int] = None,
+                     per_archetype: int = NPCS_PER_ARCHETYPE, paths: Optional[PathService] = None) -> Crowd:
+    crowd = Crowd(world.pixel_rect, capacity=per_archetype * len(ARCHETYPE_KEYS), seed=seed,
+                  collision=collision, paths=paths)
+    buildings = [b.rect for b in home_buildings()]
+    for key in ARCHETYPE_KEYS:
+        crowd.spawn(key, per_archetype, avoid=buildings)
+    # customers come to the front door to buy
+    hx, hy = HOME_ORIGIN
+    hw, hh = HOME_TILES
+    crowd.add_destination("shop", ((hx + hw / 2) * TILE_SIZE, (hy + hh + 1) * TILE_SIZE))
+    # and otherwise hang around the corners of the block
+    for x in (hx - 7, hx + hw + 9):
+        for y in (hy - 5, hy + hh + 5):
+            crowd.add_destination("property", (x * TILE_SIZE, y * TILE_SIZE))
+    return crowd
+
+
+def grow_room_rects(properties) -> Dict[int, pygame.Rect]:
+    """PlantSim room id -> world rect of the tent its plants are drawn in (tents match rooms by key)."""
+    tents = {tent.key: tent.rect for building in home_buildings() for tent in building.tents}
+    return {room.sim_room: tents[room.key] for prop in properties for room in prop.rooms
+            if room.sim_room is not None and room.key in tents}
+
+
+def view_around(center: Tuple[float, float], size: Tuple[int, int]) -> pygame.Rect:
+    """Camera-sized world rect around a point, for runs without a GameView."""
+    rect = pygame.Rect(0, 0, *size)
+    rect.center = (round(center[0]), round(center[1]))
+    return rect
+
+
+class GameView:
+    """World map + camera following the player + dirty-rect renderer with sprite layers."""
+
+    # renderer layers, back to front
+    PLANT_LAYER, NPC_LAYER, PLAYER_LAYER = 0, 1, 2
+
+    def __init__(self, screen: pygame.Surface, world: World, collision: Optional[CollisionWorld] = None,
+                 crowd: Optional[Crowd] = None, hud: Optional[Hud] = None):
+        self.world = world
+        self.collision = collision
+        self.crowd = crowd
+        self.hud = hud
+        self.camera = camera = Camera(screen.get_size(), world.pixel_rect)
+        # background under moved objects is repainted straight from the cached chunks
+        self.renderer = DirtyRenderer(screen, world.background_painter(camera))
+
+        self.atlas = atlas = build_default_atlas(PLAYER_COLOR, PLAYER_SIZE)
+        self._npc_frames = np.array([atlas.frame_id(f"npc_{k}") for k in ARCHETYPE_KEYS], dtype=np.int32)
+        plant_frames = [atlas.frame_id(f"plant_{s}") for s in STAGES] + [atlas.frame_id("plant_dead")]
+        self._plant_frames = np.array(plant_frames, dtype=np.int32)
+        self.npcs = SpriteBatch(atlas, camera, self.NPC_LAYER)
+        self.plant_sprites = SpriteBatch(atlas, camera, self.PLANT_LAYER)
+        self.player = Sprite(atlas, "player", (0, 0))
+        self.characters = SpriteGroup(atlas, camera, self.PLAYER_LAYER, self.player)
+        for layer in (self.plant_sprites, self.npcs, self.characters):
+            self.renderer.add_layer(layer)
+
+        self.plants = None                          # plantsim.PlantSim, see show_plants()
+        self._room_rects: Dict[int, pygame.Rect] = {}
+
+    def show_plants(self, plants, room_rects: Dict[int, pygame.Rect]) -> None:
+        """Draws the plants of each PlantSim room (room id -> world rect of its tent) in a grid."""
+        self.plants = plants
+        self._room_rects = dict(room_rects)
+
+    def draw(self, player_rect: pygame.Rect) -> None:
+        camera = self.camera
+        camera.center_on(player_rect.center)
+        if camera.moved:
+            self.renderer.invalidate()  # scrolling touches every pixel anyway
+        self.world.stream(camera)
+
+        if self.plants is not None:
+            self._update_plants()
+        if self.crowd is not None:
+            self._update_crowd()
+        self._update_player(player_rect)
+        if DEBUG_DRAW_COLLIDERS and self.collision is not None:
+            self._draw_colliders()
+        if self.hud is not None:
+            self.hud.draw(self.renderer)
+        profiler.draw_overlay(self.renderer)
+        self.renderer.present()
+
+    def _update_player(self, player_rect: pygame.Rect) -> None:
+        sprite = self.player
+        center = pygame.Vector2(player_rect.center)
+        step = center - sprite.position
+        if 0 < step.length() < PLAYER_SIZE:  # face where we're heading (but not after a teleport/load)
+            sprite.rotation = pygame.Vector2(0, -1).angle_to(step)
+        sprite.position = center
+
+    def _update_crowd(self) -> None:
+        crowd = self.crowd
+        ids = crowd.visible()
+        self.npcs.set(crowd.x[ids], crowd.y[ids], self._npc_frames[crowd.archetype_id[ids]], ids)
+
+    def _update_plants(self) -> None:
+        plants, xs, ys, frames, keys = self.plants, [], [], [], []
+        for room, rect in self._room_rects.items():
+            ids = plants.in_room(room)
+            if not ids.size:
+                continue
+            cols = max(1, rect.w // PLANT_SPACING)
+            slot = np.arange(ids.size)
+            xs.append(rect.left + PLANT_SPACING / 2 + (slot % cols) * PLANT_SPACING)
+            ys.append(rect.top + PLANT_SPACING / 2 + (slot // cols) * PLANT_SPACING)
+            stage_frames = self._plant_frames[plants.stage[ids]]
+            frames.append(np.where(plants.alive[ids], stage_frames, self._plant_frames[-1]))
+            keys.append(ids)
+        if keys:
+            self.plant_sprites.set(np.concatenate(xs), np.concatenate(ys),
+                                   np.concatenate(frames), np.concatenate(keys))
+        else:
+            self.plant_sprites.set((), (), ())
+
+    def _draw_colliders(self) -> None:
+        # only what the camera can see, straight out of the spatial hash
+        camera, view = self.camera, self.camera.view_rect()
+        for hit in self.collision.query_rect(view):
+            color = COLLIDER_COLORS.get(getattr(hit, "tag", None) or "body", COLLIDER_COLORS["wall"])
+            self.renderer.draw_rect(("collider", hit.id), color, camera.world_to_screen(hit.rect), 2)
+        for i, tile in enumerate(self.collision.solid_tiles(view)):
+            self.renderer.draw_rect(("solid_tile", i), COLLIDER_COLORS["tile"],
+                                    camera.world_to_screen(pygame.Rect(tile)), 1)
+
+
+def build_hud(state: GameState, crowd: Crowd) -> Hud:
+    player, market, skills = state.player, state.market, state.player.skills
+    hud = Hud()
+    hud.extend((
+        ("Money $", lambda: player.money, "{:,.0f}"),
+        ("Day", lambda: int(crowd.minutes // (24 * 60)) + 1, "{}"),
+        ("Time", lambda: "%02d:%02d" % divmod(int(crowd.minutes) % (24 * 60), 60), "{}"),
+        ("Sales today", lambda: market.today["sales"], "{:,}"),
+        ("Stock g", lambda: market.stock.sum(), "{:,.0f}"),
+        ("Watering Lv", lambda: skills["watering"].level, "{}"),
+        ("Sales Lv", lambda: skills["sales"].level, "{}"),
+    ))
+    return hud
+
+
+class GameScene(Scene):
+    """
+    The game itself. Everything is built once in load() (normally preloaded
+    while the menu is up); going back to the menu suspends it with a
+    background save, and coming back resumes right where the player left off.
+    """
+
+    fps = RENDER_FPS
+    record_path: Optional[str] = None  # set before load() to record the session (see replay.py)
+    hot_reload = True                  # pick up edits to data/*.json while playing (see content.py)
+
+    def load(self):
+        # --- world setup ---
+        world = build_home_world()
+        self.collision = collision = build_home_collision(world)
+        self.paths = PathService(world, collision)
+        self.crowd = crowd = build_home_crowd(world, collision, paths=self.paths)
+        self.view = GameView(self.screen, world, collision, crowd)
+
+        self.state = state = GameState(SAVE_DIR)
+        spawn = home_center() if state.is_new else (state.player.x, state.player.y)
+        self.player = PlayerMotion(spawn, collision=collision)
+        state.catch_up()  # grow rooms and automation kept going while the game was closed
+        self.progression = state.progression
+        self.market = state.market
+        self.market.attach(crowd)
+        self.view.hud = build_hud(state, crowd)
+        self.view.show_plants(state.plants, grow_room_rects(state.properties))
+        # crowd flow fields are ready before the first tick (we're usually off-thread here)
+        self.paths.finish()
+
+        self.sim = Simulation(self.player, crowd, self.paths, self.screen.get_size(), random.getrandbits(32),
+                              self.market, self.progression, state.saves.sections)
+        self.recorder = None
+        if self.record_path:
+            from replay import Recorder
+
+            meta = {"npcs": NPCS_PER_ARCHETYPE, "economy": True}
+            self.recorder = Recorder(self.record_path, self.sim, meta)
+        # not while recording: a replay has no way to know the definitions changed mid-session
+        self.content_watcher = None
+        if self.hot_reload and self.recorder is None:
+            self.content_watcher = content.ContentWatcher().start()
+
+        self.controls = KeyboardInput()
+        self.timestep = FixedTimestep()
+        self.next_autosave = AUTOSAVE_SECONDS
+
+    def save(self, wait: bool = False) -> None:
+        self.state.player.move_to(*self.player.rect().center)
+        self.state.save()
+        if wait:
+            self.state.saves.wait()  # leaving the game: make sure it's on disk before the next load
+
+    def resume(self):
+        self.timestep = FixedTimestep()  # don't try to catch up on the time spent in the menu
+        self.view.renderer.invalidate()
+
+    def suspend(self):
+        self.save()
+        if self.recorder is not None:
+            self.recorder.flush()
+
+    def close(self):
+        if self.content_watcher is not None:
+            self.content_watcher.stop()
+        if self.recorder is not None:
+            self.recorder.close()
+        self.save(wait=True)
+        self.state.close()
+
+    def frame(self, events, frame_dt):
+        prof = profiler.get_profiler()
+        prof.begin_frame()
+        sim, view, timestep = self.sim, self.view, self.timestep
+        step = self.recorder.step if self.recorder is not None else sim.step
+
+        # --- events / input ---
+        with profiler.scope("events"):
+            inp = self.controls.poll(sim.tick, events)
+        if inp.quit:
+            prof.end_frame()
+            return QUIT
+        if inp.back:
+            prof.end_frame()
+            return "MENU"
+        if self.content_watcher is not None:
+            self.content_watcher.poll()  # between ticks, so a tick never sees half-swapped definitions
+
+        # --- fixed-rate logic ---
+        with profiler.scope("update"):
+            for _ in range(timestep.advance(frame_dt)):
+                step(inp)
+        if sim.tick * LOGIC_DT >= self.next_autosave:
+            with profiler.scope("autosave"):
+                self.save()
+            self.next_autosave += AUTOSAVE_SECONDS
 
-        if keys[pygame.K_a] or keys[pygame.K_a]:
-            vx = -PLAYER_SPEED
-        if keys[pygame.K_d] or keys[pygame.K_d]:
-            vx = PLAYER_SPEED
-        if keys[pygame.K_w] or keys[pygame.K_w]:
-            vy = -PLAYER_SPEED
-        if keys[pygame.K_s] or keys[pygame.K_s]:
-            vy = PLAYER_SPEED
+        # --- draw (interpolated between logic steps) ---
+        with profiler.scope("draw"):
+            view.draw(self.player.rect(timestep.alpha))
+        prof.end_frame()
+        return None
 
-        # prevent faster diagonal movement
-        if vx != 0 and vy != 0:
-            vx *= 0.7071
-            vy *= 0.7071
 
-# --- APPLY MOVEMENT HERE ---
-        player_rect.x += int(vx * dt)
-        player_rect.y += int(vy * dt)
-        # --- draw ---
-        screen.blit(background, (0,0))
+def run_headless(ticks: int, controls=None, dt: float = HEADLESS_DT, render: bool = False,
+                 screen_size: Optional[Tuple[int, int]] = None, npcs: int = 0, seed: Optional[int] = None,
+                 record: Optional[str] = None) -> dict:
+    """
+    Runs the game update `ticks` times with a fixed timestep and no frame pacing,
+    so hours of game time go by in seconds. Uses SDL's dummy video driver, so it
+    works on machines without a display. `controls` is anything with a
+    poll(tick) -> FrameInput method (ScriptedInput for soak/balance runs, or a
+    replay.Replay); render=True also draws every frame to the off-screen
+    surface. npcs > 0 adds that many customers per archetype. `record` is a
+    path to write a replay.Recorder log of the run to.
+    """
+    os.environ["SDL_VIDEODRIVER"] = "dummy"
+    pygame.display.init()
 
-        
+    if screen_size is None:
+        from constants import SCREEN_WIDTH, SCREEN_HEIGHT
+        screen_size = (SCREEN_WIDTH, SCREEN_HEIGHT)
+    screen = pygame.display.set_mode(screen_size)
+    world = build_home_world()
+    collision = build_home_collision(world)
+    paths = PathService(world, collision) if npcs else None
+    crowd = build_home_crowd(world, collision, seed, npcs, paths) if npcs else None
+    if paths is not None:
+        paths.finish()
+    view = GameView(screen, world, collision, crowd) if render else None
 
+    if controls is None:
+        controls = ScriptedInput([])
 
+    player = PlayerMotion(home_center(), collision=collision)
+    sim = Simulation(player, crowd, paths, screen_size, seed or 0, dt=dt)
+    recorder = None
+    if record is not None:
+        from replay import Recorder
 
-        # draw player
-        pygame.draw.rect(screen, (50, 180, 255), player_rect)
+        recorder = Recorder(record, sim, {"npcs": npcs, "economy": False})
+    step = recorder.step if recorder is not None else sim.step
 
-        pygame.display.flip()
+    start = time.perf_counter()
+    while sim.tick < ticks:
+        inp = controls.poll(sim.tick)
+        if inp.quit or inp.back:
+            break
+        step(inp)
+        if render:
+            view.draw(player.rect())
+    elapsed = time.perf_counter() - start
+    if recorder is not None:
+        recorder.close()
+    tick = sim.tick
 
+    return {
+        "ticks": tick,
+        "game_seconds": tick * dt,
+        "wall_seconds": elapsed,
+        "fps": tick / elapsed if elapsed > 0 else float("inf"),
+        "player_pos": (player.x, player.y),
+        "npc_purchases": crowd.purchases if crowd is not None else 0,
+    }
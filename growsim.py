@@ -0,0 +1,163 @@
+# Monte Carlo grow cycles: actually roll failures, yields, water and medium wear many times over
+
+from __future__ import annotations
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from consumables import GENETICS, MEDIUMS, NUTRIENTS, GrowSetup, compute_outcomes
+
+# Tuning knobs for the simulation (placeholders until the economy has real numbers)
+BASE_CYCLE_DAYS = 60.0        # days per grow at growth_multiplier 1.0
+BASE_YIELD = 100.0            # grams per harvest at yield_multiplier 1.0
+YIELD_SIGMA = 0.15            # lognormal spread of a harvest around its expected yield
+BASE_WATER_PER_DAY = 2.0      # liters per day at water_need_mult 1.0
+WATER_SIGMA = 0.10            # day-to-day spread of water use per cycle
+FAILURE_SPOILS_MEDIUM = True  # a failed crop means the medium gets replaced early
+
+# cost to refill a grow with each medium
+MEDIUM_COST: Dict[str, float] = {
+    "soil": 5.0,
+    "organic_soil": 12.0,
+    "no_till": 40.0,
+    "peat_coco": 15.0,
+    "coco_rockwool": 25.0,
+}
+
+
+@dataclass(frozen=True)
+class SimSetup:
+    """Setup by key, so it can be sent to worker processes cheaply."""
+    medium: str
+    genetics: str
+    nutrient: Optional[str] = None
+
+    def grow_setup(self) -> GrowSetup:
+        return GrowSetup(
+            medium=MEDIUMS[self.medium],
+            genetics=GENETICS[self.genetics],
+            nutrient=NUTRIENTS[self.nutrient] if self.nutrient else None,
+        )
+
+
+@dataclass
+class GrowSimResult:
+    setup: SimSetup
+    cycles: int
+    failures: int
+    fail_rate: float
+    longest_failure_streak: int
+    mean_failure_streak: float
+    total_yield: float
+    yield_per_cycle_mean: float   # failures count as 0
+    harvest_yield_mean: float     # successful harvests only
+    harvest_yield_p5: float
+    harvest_yield_p50: float
+    harvest_yield_p95: float
+    total_days: float
+    water_used: float
+    medium_replacements: int
+    medium_cost: float
+
+    def to_row(self) -> Dict[str, object]:
+        row = asdict(self)
+        row.update(row.pop("setup"))
+        return row
+
+
+def all_setups(include_no_nutrient: bool = True) -> List[SimSetup]:
+    nutrients: List[Optional[str]] = list(NUTRIENTS)
+    if include_no_nutrient:
+        nutrients = [None] + nutrients
+    return [SimSetup(m, g, n) for m, g, n in itertools.product(MEDIUMS, GENETICS, nutrients)]
+
+
+def simulate_setup(setup: SimSetup, cycles: int, seed) -> GrowSimResult:
+    """
+    Runs `cycles` grow cycles of one setup. `seed` is an int or a
+    numpy SeedSequence; the same seed always gives the same result.
+    """
+    rng = np.random.default_rng(seed)
+    out = compute_outcomes(setup.grow_setup())
+    medium = MEDIUMS[setup.medium]
+
+    failed = rng.random(cycles) < out["fail_chance"]
+    noise = rng.lognormal(-0.5 * YIELD_SIGMA ** 2, YIELD_SIGMA, cycles)  # mean 1.0
+    harvest = BASE_YIELD * out["yield_multiplier"] * noise
+    yields = np.where(failed, 0.0, harvest)
+
+    cycle_days = BASE_CYCLE_DAYS / out["growth_multiplier"]
+    water = BASE_WATER_PER_DAY * out["water_need_mult"] * cycle_days
+    water_used = float(np.clip(rng.normal(1.0, WATER_SIGMA, cycles), 0.0, None).sum() * water)
+
+    streaks = _failure_streaks(failed)
+    replacements = _medium_replacements(failed, medium.runs_before_replace)
+    good = harvest[~failed]
+    p5, p50, p95 = np.percentile(good, [5, 50, 95]) if good.size else (0.0, 0.0, 0.0)
+
+    return GrowSimResult(
+        setup=setup,
+        cycles=cycles,
+        failures=int(failed.sum()),
+        fail_rate=float(failed.mean()) if cycles else 0.0,
+        longest_failure_streak=int(streaks.max()) if streaks.size else 0,
+        mean_failure_streak=float(streaks.mean()) if streaks.size else 0.0,
+        total_yield=float(yields.sum()),
+        yield_per_cycle_mean=float(yields.mean()) if cycles else 0.0,
+        harvest_yield_mean=float(good.mean()) if good.size else 0.0,
+        harvest_yield_p5=float(p5),
+        harvest_yield_p50=float(p50),
+        harvest_yield_p95=float(p95),
+        total_days=cycle_days * cycles,
+        water_used=water_used,
+        medium_replacements=replacements,
+        medium_cost=replacements * MEDIUM_COST.get(setup.medium, 0.0),
+    )
+
+
+def simulate_many(setups: Sequence[SimSetup], cycles: int, seed: int = 0,
+                  workers: Optional[int] = None) -> List[GrowSimResult]:
+    """
+    Simulates every setup with its own random stream spawned from `seed`, so
+    results don't depend on the number of workers or on scheduling. Independent
+    setups are spread over a process pool; workers=1 runs in this process.
+    """
+    seeds = np.random.SeedSequence(seed).spawn(len(setups))
+    if workers is None:
+        workers = min(len(setups), os.cpu_count() or 1)
+    if workers <= 1 or len(setups) <= 1:
+        return [simulate_setup(s, cycles, ss) for s, ss in zip(setups, seeds)]
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(simulate_setup, setups, itertools.repeat(cycles), seeds))
+
+
+def _failure_streaks(failed: np.ndarray) -> np.ndarray:
+    """Lengths of every run of consecutive failures."""
+    if not failed.size:
+        return np.zeros(0, dtype=np.int64)
+    padded = np.concatenate(([False], failed, [False])).astype(np.int8)
+    edges = np.diff(padded)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    return ends - starts
+
+
+def _medium_replacements(failed: np.ndarray, runs_before_replace: int) -> int:
+    """
+    Medium is replaced after `runs_before_replace` runs, or right after a failed
+    run when FAILURE_SPOILS_MEDIUM. Counted per block of successes: a block of k
+    good runs uses k // runs fills, and the failure closing it one more.
+    """
+    runs = max(1, runs_before_replace)
+    if not FAILURE_SPOILS_MEDIUM:
+        return failed.size // runs
+    fail_idx = np.flatnonzero(failed)
+    bounds = np.concatenate(([-1], fail_idx, [failed.size]))
+    good_runs = np.diff(bounds) - 1  # successes before each failure, plus the tail
+    return int((good_runs // runs).sum() + fail_idx.size)
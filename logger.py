@@ -1,25 +1,31 @@
 import inspect
-import json
 import math
 from datetime import datetime
 
-__all__ = ["log_state", "log_event"]
+from telemetry import TelemetryWriter
+
+__all__ = ["log_state", "log_event", "flush_logs"]
+
+# For new code prefer telemetry.Telemetry, which samples explicitly registered
+# values instead of copying the caller's locals every snapshot. Both functions
+# here write through a buffered TelemetryWriter, so the game thread never waits
+# on file IO.
 
 _FPS = 60
-_MAX_SECONDS = 16
+_MAX_SECONDS = 16  # None = no cutoff (the writer rotates files by size instead)
 _SPRITE_SAMPLE_LIMIT = 10  # Maximum number of sprites to log per group
 
 _frame_count = 0
-_state_log_initialized = False
-_event_log_initialized = False
+_state_writer = None
+_event_writer = None
 _start_time = datetime.now()
 
 
 def log_state():
-    global _frame_count, _state_log_initialized
+    global _frame_count, _state_writer
 
     # Stop logging after `_MAX_SECONDS` seconds
-    if _frame_count > _FPS * _MAX_SECONDS:
+    if _MAX_SECONDS is not None and _frame_count > _FPS * _MAX_SECONDS:
         return
 
     # Take a snapshot approx. once per second
@@ -108,15 +114,13 @@ def log_state():
     }
 
     # New log file on each run
-    mode = "w" if not _state_log_initialized else "a"
-    with open("game_state.jsonl", mode) as f:
-        f.write(json.dumps(entry) + "\n")
-
-    _state_log_initialized = True
+    if _state_writer is None:
+        _state_writer = TelemetryWriter("game_state.jsonl")
+    _state_writer.write(entry)
 
 
 def log_event(event_type, **details):
-    global _event_log_initialized
+    global _event_writer
 
     now = datetime.now()
 
@@ -128,8 +132,13 @@ def log_event(event_type, **details):
         **details,
     }
 
-    mode = "w" if not _event_log_initialized else "a"
-    with open("game_events.jsonl", mode) as f:
-        f.write(json.dumps(event) + "\n")
+    if _event_writer is None:
+        _event_writer = TelemetryWriter("game_events.jsonl")
+    _event_writer.write(event)
+
 
-    _event_log_initialized = True
\ No newline at end of file
+def flush_logs():
+    """Blocks until everything logged so far is on disk."""
+    for writer in (_state_writer, _event_writer):
+        if writer is not None:
+            writer.flush()
\ No newline at end of file
@@ -1,33 +1,102 @@
+import time
+_START = time.perf_counter()  # the startup report counts from here, imports included
+
+import argparse
+import os
 import pygame
-from constants import *
-from menu import *
-from game_play import *
-from options import *
-
-def main():
-    pygame.init()
-    clock = pygame.time.Clock()
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    pygame.display.set_caption("CultQuest")
-    print("Attempting to run menu")
-
-
-    current_game_state = run_menu(screen, clock)
-    print("Starting CultQuest with pygame version: 3.12")
-    print("Screen width: 1280")
-    print("Screen height: 720")
-    while True:
-        if current_game_state == "PLAYING":
-            current_game_state = run_game(screen, clock)
-        elif current_game_state == "QUIT":
-            pygame.quit()
-            return
-        elif current_game_state == "OPTIONS":
-            current_game_state = run_options(screen, clock)
-
-            
-    
-    
+from assets import AssetManager, set_assets
+from constants import SCREEN_WIDTH, SCREEN_HEIGHT
+from scenes import SceneManager, lazy_scene
+from startup import StartupTimer, init_pygame
+
+ASSET_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".asset_cache")
+
+
+def game_scene_factory(assets: AssetManager, timer: StartupTimer, record=None):
+    """The game scene's heavy imports and asset decoding happen on the preload thread, behind the menu."""
+    def factory(manager):
+        with timer.phase("preload assets"):
+            assets.preload()
+        with timer.phase("import game modules"):
+            from game_play import GameScene
+        scene = GameScene(manager)
+        scene.record_path = record
+        return scene
+    return factory
+
+
+def main(startup_report=False, record=None):
+    timer = StartupTimer(_START)
+    timer.record("python + pygame imports", (time.perf_counter() - _START) * 1000.0)
+
+    with timer.phase("init pygame (display, font)"):
+        init_pygame()
+        clock = pygame.time.Clock()
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("CultQuest")
+
+    # images are decoded lazily (or by the game's preload); the menu doesn't need any
+    assets = AssetManager(disk_cache_dir=ASSET_CACHE_DIR)
+    set_assets(assets)
+
+    # scenes are built once and then suspended/resumed; the game preloads behind the menu
+    scenes = SceneManager(screen, clock)
+    scenes.register("MENU", lazy_scene("menu", "MenuScene"))
+    scenes.register("PLAYING", game_scene_factory(assets, timer, record))
+    scenes.register("OPTIONS", lazy_scene("options", "OptionsScene"))
+    scenes.run("MENU", on_first_frame=lambda: timer.mark("menu on screen"))
+
+    if startup_report:
+        for name, ms in scenes.load_ms.items():
+            timer.record(f"{name} scene build + load", ms, thread=f"preload-{name}" if name != "MENU" else "")
+        print(timer.report())
+    pygame.quit()
+
+
+def run_headless_cli(argv=None):
+    parser = argparse.ArgumentParser(description="CultQuest")
+    parser.add_argument("--headless", type=int, metavar="TICKS",
+                        help="run TICKS fixed-timestep updates with no window and exit")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the scripted input (headless only)")
+    parser.add_argument("--render", action="store_true",
+                        help="also draw each frame off-screen (headless only)")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="print how long each startup phase took on exit")
+    parser.add_argument("--record", metavar="FILE", help="record the session's input to FILE (see replay.py)")
+    parser.add_argument("--replay", metavar="FILE",
+                        help="replay a recording headless, as fast as possible, and exit")
+    parser.add_argument("--seek", type=int, default=0, metavar="TICK", help="start the replay at TICK")
+    args = parser.parse_args(argv)
+    if args.replay is not None:
+        run_replay(args.replay, args.seek)
+        return True, args
+    if args.headless is None:
+        return False, args
+
+    from game_play import ScriptedInput, random_walk_script, run_headless
+
+    controls = ScriptedInput(random_walk_script(args.seed, args.headless))
+    stats = run_headless(args.headless, controls, render=args.render, record=args.record)
+    print(f"ticks simulated: {stats['ticks']} ({stats['game_seconds']:.1f}s of game time)")
+    print(f"wall time: {stats['wall_seconds']:.3f}s  ->  {stats['fps']:.0f} fps")
+    return True, args
+
+
+def run_replay(path, seek=0):
+    from replay import Replay
+
+    replay = Replay(path)
+    sim = replay.build()
+    if seek:
+        replay.seek(sim, seek)
+    result = replay.run(sim)
+    print(f"replayed ticks {result.start_tick}-{result.end_tick} in {result.wall_seconds:.3f}s"
+          f"  ->  {result.ticks_per_second:.0f} ticks/s, {result.checked} checkpoints checked")
+    for desync in result.desyncs:
+        print(f"DESYNC at tick {desync.tick}: expected {desync.expected}, got {desync.actual}")
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    handled, args = run_headless_cli()
+    if not handled:
+        main(startup_report=args.startup_report, record=args.record)
@@ -0,0 +1,308 @@
+# market: prices, demand and sale rolls for everything the crowd buys, resolved in batches
+#
+# Customers who reach a shop (npc.Crowd.on_purchase) are queued with the cash
+# they brought. Once per economic tick every queued buyer is resolved at once
+# with numpy: pick a quality tier (taste vs price, logit-style), roll the sale,
+# and split each tier's stock between the winners. Supply, demand and price
+# indices are running averages updated once per tick, so the cost depends on
+# the buyers in this tick, never on the history.
+
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from npc import ARCHETYPE_KEYS
+
+TIERS = ("schwag", "mids", "loud", "exotic")
+TIER_MIN_QUALITY = np.array([0.0, 4.0, 6.0, 8.0])     # quality_out_of_10 where each tier starts
+BASE_PRICE = np.array([4.0, 8.0, 12.0, 18.0])          # $ per gram at price index 1.0
+
+ECON_TICK_MINUTES = 15.0     # game minutes between resolves
+BASE_SALE_CHANCE = 0.6       # chance a buyer at the counter goes through with it, before skills
+MAX_SALE_CHANCE = 0.98
+MIN_GRAMS = 1.0              # buyers who can't afford this much of a tier don't consider it
+INDEX_RATE = 0.2             # weight of the latest tick in the supply/demand averages
+PRICE_STEP = 0.05            # how far the price index moves per tick at full shortage/glut
+PRICE_INDEX_RANGE = (0.5, 2.5)
+WHOLESALE_FRACTION = 0.6     # vendors sell at this fraction of the going retail price
+AD_DOLLARS_PER_HYPE = 500.0  # ad spend for +100% demand, before ad_efficiency
+HYPE_HALF_LIFE_HOURS = 24.0
+SALES_XP_PER_SALE = 3
+
+# how much each archetype likes each tier (TIERS order), and how much price puts them off
+TASTES: Dict[str, tuple] = {
+    "dealer": (0.5, 3.0, 1.5, 0.5),
+    "gertrude": (0.5, 2.0, 1.0, 0.2),
+    "tweaker": (3.0, 1.0, 0.3, 0.1),
+    "soccer_mom": (0.2, 1.5, 2.0, 0.8),
+    "meathead": (1.0, 2.0, 1.5, 0.5),
+    "nerd": (0.3, 1.0, 2.0, 1.5),
+    "hottie": (0.1, 0.8, 2.0, 2.5),
+    "business_chad": (0.05, 0.3, 1.5, 3.0),
+}
+PRICE_SENSITIVITY: Dict[str, float] = {
+    "dealer": 1.5, "gertrude": 2.0, "tweaker": 2.5, "soccer_mom": 0.8,
+    "meathead": 1.2, "nerd": 1.0, "hottie": 0.6, "business_chad": 0.3,
+}
+
+
+def quality_tier(quality):
+    """Tier index for a quality (0..10), or an array of them."""
+    return np.searchsorted(TIER_MIN_QUALITY, quality, side="right") - 1
+
+
+class Market:
+    """
+    The player's shop. Stock is grams on hand per tier. Buyers queue up via
+    enqueue() (or attach() to a Crowd) and are resolved by update() once per
+    ECON_TICK_MINUTES of game time. With a player, sales pay into their money
+    and skills: sales (sale_chance_bonus, price_bonus), marketing
+    (demand_multiplier, ad_efficiency) and networking (wholesale_discount).
+    """
+
+    def __init__(self, player=None, seed: Optional[int] = None):
+        self.player = player
+        self.rng = np.random.default_rng(seed)
+        self.crowd = None
+        self.taste = np.array([TASTES[k] for k in ARCHETYPE_KEYS], dtype=np.float64)
+        self.log_taste = np.log(self.taste)
+        self.price_sensitivity = np.array([PRICE_SENSITIVITY[k] for k in ARCHETYPE_KEYS], dtype=np.float64)
+
+        tiers = len(TIERS)
+        self.stock = np.zeros(tiers)
+        self.price_index = np.ones(tiers)
+        self.supply_avg = np.zeros(tiers)   # running average of grams on the shelf
+        self.demand_avg = np.zeros(tiers)   # running average of grams asked for per tick
+        self.hype = 0.0                     # ad boost, +1.0 = double the buyers
+        self.next_tick = None               # game minute of the next resolve
+        self.dirty = True
+
+        self._ids: List[np.ndarray] = []
+        self._arch: List[np.ndarray] = []
+        self._budget: List[np.ndarray] = []
+
+        # running totals
+        self.sales = 0
+        self.sold = np.zeros(tiers)         # grams
+        self.revenue = np.zeros(tiers)
+        self.unmet = np.zeros(tiers)        # grams asked for that weren't in stock
+        self.buyers = 0
+        self.day = 0
+        self.today = {"sales": 0, "grams": 0.0, "revenue": 0.0}
+        self.last_resolve_ms = 0.0
+
+    # --- buyers ---
+
+    def attach(self, crowd) -> None:
+        """Customers in `crowd` who reach a shop become buyers here; unspent cash goes back to them."""
+        self.crowd = crowd
+        crowd.on_purchase.append(self.enqueue)
+
+    def enqueue(self, ids: np.ndarray, archetype_ids: np.ndarray, budgets: np.ndarray) -> None:
+        self._ids.append(np.asarray(ids))
+        self._arch.append(np.asarray(archetype_ids))
+        self._budget.append(np.asarray(budgets, dtype=np.float64))
+
+    @property
+    def waiting(self) -> int:
+        return sum(a.size for a in self._ids)
+
+    # --- prices ---
+
+    def _effects(self) -> Dict[str, float]:
+        if self.player is None:
+            return {"sale_chance_bonus": 0.0, "price_bonus": 0.0, "demand_multiplier": 1.0,
+                    "ad_efficiency": 0.0, "wholesale_discount": 0.0}
+        skills = self.player.skills
+        effects = {}
+        for key in ("sales", "marketing", "networking"):
+            effects.update(skills[key].effects())
+        return effects
+
+    def prices(self) -> np.ndarray:
+        """Retail $ per gram for each tier right now."""
+        return BASE_PRICE * self.price_index * (1.0 + self._effects()["price_bonus"])
+
+    def wholesale_price(self, tier: int) -> float:
+        return float(BASE_PRICE[tier] * self.price_index[tier] * WHOLESALE_FRACTION
+                     * (1.0 - self._effects()["wholesale_discount"]))
+
+    # --- stock ---
+
+    def add_stock(self, grams: float, quality: float) -> int:
+        """Puts product on the shelf in the tier its quality falls in; returns the tier."""
+        tier = int(quality_tier(quality))
+        self.stock[tier] += max(0.0, grams)
+        self.dirty = True
+        return tier
+
+    def add_harvest(self, result: Dict[str, float]) -> int:
+        """Stocks a plantsim.PlantSim.harvest() result."""
+        return self.add_stock(result["yield"], result["avg_quality"])
+
+    def buy_wholesale(self, tier: int, grams: float) -> Optional[float]:
+        """Buys stock from a vendor with the player's money; returns the cost, None if they can't pay."""
+        cost = grams * self.wholesale_price(tier)
+        if self.player is not None and not self.player.spend(cost):
+            return None
+        self.stock[tier] += grams
+        self.dirty = True
+        return cost
+
+    def run_ads(self, dollars: float) -> bool:
+        if self.player is not None and not self.player.spend(dollars):
+            return False
+        self.hype += dollars / AD_DOLLARS_PER_HYPE * (1.0 + self._effects()["ad_efficiency"])
+        if self.player is not None:
+            self.player.skills.add_xp("marketing", int(dollars // 10))
+        self.dirty = True
+        return True
+
+    # --- economic tick ---
+
+    def update(self, minutes: float) -> int:
+        """
+        Call with the game clock (minutes since the start, e.g. Crowd.minutes).
+        Resolves the queue once per ECON_TICK_MINUTES; returns the number of sales made.
+        """
+        if self.next_tick is None:
+            self.next_tick = minutes + ECON_TICK_MINUTES
+            return 0
+        if minutes < self.next_tick:
+            return 0
+        ticks = int((minutes - self.next_tick) // ECON_TICK_MINUTES) + 1
+        self.next_tick += ticks * ECON_TICK_MINUTES
+        day = int(minutes // (24 * 60))
+        if day != self.day:
+            self.day = day
+            self.today = {"sales": 0, "grams": 0.0, "revenue": 0.0}
+        self.hype *= 0.5 ** (ticks * ECON_TICK_MINUTES / 60.0 / HYPE_HALF_LIFE_HOURS)
+        return self.resolve()
+
+    def resolve(self) -> int:
+        """Resolves every queued buyer at once and updates the running indices."""
+        start = time.perf_counter()
+        effects = self._effects()
+        demand = np.zeros(len(TIERS))
+        sales = 0
+        if self._ids:
+            ids = np.concatenate(self._ids)
+            arch = np.concatenate(self._arch).astype(np.intp)
+            budget = np.concatenate(self._budget)
+            self._ids, self._arch, self._budget = [], [], []
+            sales, demand, refund = self._sell(ids, arch, budget, effects)
+            if self.crowd is not None and refund.any():
+                self.crowd.cash[ids] += refund.astype(np.float32)
+
+        # running averages; price follows the shortage (or glut) between them
+        self.demand_avg += INDEX_RATE * (demand - self.demand_avg)
+        self.supply_avg += INDEX_RATE * (self.stock - self.supply_avg)
+        pressure = np.clip(np.log((self.demand_avg + 1.0) / (self.supply_avg + 1.0)), -1.0, 1.0)
+        self.price_index = np.clip(self.price_index * np.exp(PRICE_STEP * pressure), *PRICE_INDEX_RANGE)
+        self.dirty = True
+        self.last_resolve_ms = (time.perf_counter() - start) * 1000.0
+        return sales
+
+    def _sell(self, ids, arch, budget, effects):
+        n = ids.size
+        self.buyers += n
+        price = BASE_PRICE * self.price_index * (1.0 + effects["price_bonus"])
+
+        # tier choice: taste minus price, plus gumbel noise = a logit choice per buyer
+        utility = (self.log_taste[arch]
+                   - self.price_sensitivity[arch, None] * np.log(price / BASE_PRICE[1])
+                   + self.rng.gumbel(size=(n, len(TIERS))))
+        utility[budget[:, None] < price * MIN_GRAMS] = -np.inf
+        wanted_tier = np.argmax(utility, axis=1)
+        can_afford = np.isfinite(utility[np.arange(n), wanted_tier])
+        grams_wanted = np.where(can_afford, budget / price[wanted_tier], 0.0)
+        demand = np.bincount(wanted_tier, weights=grams_wanted, minlength=len(TIERS))
+
+        # what they settle for given what's on the shelf
+        utility[:, self.stock <= 0.0] = -np.inf
+        tier = np.argmax(utility, axis=1)
+        available = np.isfinite(utility[np.arange(n), tier])
+        missed = ~available
+        self.unmet += np.bincount(wanted_tier[missed], weights=grams_wanted[missed], minlength=len(TIERS))
+
+        # sale roll: skills and ads help, paying over the base price hurts
+        chance = ((BASE_SALE_CHANCE + effects["sale_chance_bonus"]) * effects["demand_multiplier"]
+                  * (1.0 + self.hype) * (BASE_PRICE[tier] / price[tier]) ** self.price_sensitivity[arch])
+        buys = available & (self.rng.random(n) < np.minimum(chance, MAX_SALE_CHANCE))
+        grams = np.where(buys, budget / price[tier], 0.0)
+
+        # split each tier's stock between its buyers in random order
+        for t in np.flatnonzero(np.bincount(tier[buys], minlength=len(TIERS))):
+            who = np.flatnonzero(buys & (tier == t))
+            who = who[self.rng.permutation(who.size)]
+            before = np.cumsum(grams[who]) - grams[who]
+            grams[who] = np.clip(self.stock[t] - before, 0.0, grams[who])
+            self.stock[t] -= grams[who].sum()
+        self.stock[self.stock < 1e-9] = 0.0
+
+        spent = grams * price[tier]
+        made = grams > 0.0
+        sales = int(made.sum())
+        sold = np.bincount(tier, weights=grams, minlength=len(TIERS))
+        revenue = np.bincount(tier, weights=spent, minlength=len(TIERS))
+        self.sales += sales
+        self.sold += sold
+        self.revenue += revenue
+        self.today["sales"] += sales
+        self.today["grams"] += float(sold.sum())
+        self.today["revenue"] += float(revenue.sum())
+        if self.player is not None and sales:
+            self.player.add_money(float(revenue.sum()))
+            self.player.skills.add_xp("sales", sales * SALES_XP_PER_SALE)
+        return sales, demand, budget - spent
+
+    # --- saving ---
+
+    def save_state(self) -> Dict[str, Any]:
+        return {
+            "stock": self.stock.tolist(),
+            "price_index": self.price_index.tolist(),
+            "supply_avg": self.supply_avg.tolist(),
+            "demand_avg": self.demand_avg.tolist(),
+            "hype": self.hype,
+            "sales": self.sales,
+            "sold": self.sold.tolist(),
+            "revenue": self.revenue.tolist(),
+        }
+
+    def load_state(self, data: Dict[str, Any]) -> None:
+        for name in ("stock", "price_index", "supply_avg", "demand_avg", "sold", "revenue"):
+            if name in data:
+                setattr(self, name, np.array(data[name], dtype=np.float64))
+        self.hype = float(data.get("hype", 0.0))
+        self.sales = int(data.get("sales", 0))
+        self.dirty = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        """save_state() plus what a save can drop but a replay checkpoint can't:
+        queued buyers, clocks and today's totals."""
+        data = self.save_state()
+        data.update(
+            next_tick=self.next_tick,
+            day=self.day,
+            today=dict(self.today),
+            unmet=self.unmet.tolist(),
+            buyers=self.buyers,
+            queue=[np.concatenate(q).tolist() if q else [] for q in (self._ids, self._arch, self._budget)],
+        )
+        return data
+
+    def restore(self, data: Dict[str, Any]) -> None:
+        self.load_state(data)
+        self.next_tick = data["next_tick"]
+        self.day = int(data["day"])
+        self.today = dict(data["today"])
+        self.unmet = np.array(data["unmet"], dtype=np.float64)
+        self.buyers = int(data["buyers"])
+        ids, arch, budget = data["queue"]
+        self._ids, self._arch, self._budget = [], [], []
+        if ids:
+            self.enqueue(np.array(ids, dtype=np.intp), np.array(arch, dtype=np.int8), np.array(budget))
@@ -2,39 +2,69 @@
 
 import pygame
 
-def run_menu(screen, clock):
+import profiler
+from renderer import DirtyRenderer
+from scenes import QUIT, Scene
+from ui import render_text
+
+
+class MenuScene(Scene):
     BUTTON_WIDTH = 200
     BUTTON_HEIGHT = 50
 
-    #Button
-    start_button_rect = pygame.Rect(0, 0, BUTTON_WIDTH, BUTTON_HEIGHT)
-    start_button_rect.center = screen.get_rect().center
-
-    # Title text
-    title_font = pygame.font.Font(None, 96)
-    title_surface = title_font.render("CULT QUEST", True, (255,255,255))
-    title_rect = title_surface.get_rect(center=(screen.get_width() // 2, start_button_rect.top - 60))
-    
-    #Button Text
-    font = pygame.font.Font(None, 40)
-    text_surface = font.render("START", True, (255,255,255))
-    text_rect = text_surface.get_rect(center=start_button_rect.center)
-    
-
-    menu_running = True
-    while menu_running:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                return "QUIT"
-            if event.type == pygame.MOUSEBUTTONDOWN:
-                if start_button_rect.collidepoint(event.pos):
-                    return "PLAYING"
-        
-        screen.fill((50, 50, 50))
-        pygame.draw.rect(screen, (0,200,0), start_button_rect)
-        screen.blit(text_surface, text_rect)
-        screen.blit(title_surface, title_rect)
-
-        pygame.display.flip()
-        clock.tick(60)
-    return "QUIT"
\ No newline at end of file
+    def load(self):
+        screen = self.screen
+
+        #Buttons
+        self.start_button_rect = pygame.Rect(0, 0, self.BUTTON_WIDTH, self.BUTTON_HEIGHT)
+        self.start_button_rect.center = screen.get_rect().center
+        self.options_button_rect = self.start_button_rect.move(0, self.BUTTON_HEIGHT + 20)
+
+        # Title text
+        self.title_surface = render_text("CULT QUEST", 96)
+        title_center = (screen.get_width() // 2, self.start_button_rect.top - 60)
+        self.title_rect = self.title_surface.get_rect(center=title_center)
+
+        #Button Text
+        self.text_surface = render_text("START", 40)
+        self.text_rect = self.text_surface.get_rect(center=self.start_button_rect.center)
+        self.options_surface = render_text("OPTIONS", 40)
+        self.options_rect = self.options_surface.get_rect(center=self.options_button_rect.center)
+
+        # menu is static, so after the first frame the renderer has nothing to repaint
+        self.renderer = DirtyRenderer(screen, (50, 50, 50))
+
+    @property
+    def idle(self):
+        return not profiler.get_profiler().overlay_visible
+
+    def resume(self):
+        self.renderer.invalidate()
+        self.manager.preload("PLAYING")  # build the world while the player looks at the menu
+
+    def frame(self, events, frame_dt):
+        prof = profiler.get_profiler()
+        prof.begin_frame()
+        with profiler.scope("events"):
+            for event in events:
+                if profiler.handle_debug_key(event):
+                    continue
+                if event.type == pygame.QUIT:
+                    return QUIT
+                if event.type == pygame.MOUSEBUTTONDOWN:
+                    if self.start_button_rect.collidepoint(event.pos):
+                        return "PLAYING"
+                    if self.options_button_rect.collidepoint(event.pos):
+                        return "OPTIONS"
+
+        with profiler.scope("draw"):
+            renderer = self.renderer
+            renderer.draw_rect("start_button", (0,200,0), self.start_button_rect)
+            renderer.blit("start_text", self.text_surface, self.text_rect.topleft)
+            renderer.draw_rect("options_button", (90,90,90), self.options_button_rect)
+            renderer.blit("options_text", self.options_surface, self.options_rect.topleft)
+            renderer.blit("title", self.title_surface, self.title_rect.topleft)
+            profiler.draw_overlay(renderer)
+            renderer.present()
+        prof.end_frame()
+        return None
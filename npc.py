@@ -1,5 +1,13 @@
 #npc info goes here.
 
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pygame
+
+NPC_SIZE = 48
+
 
 class NPC:
     # Character list: 
@@ -11,4 +19,499 @@ class NPC:
     # nerd, 
     # hottie, 
     # business Chad
-    pass
\ No newline at end of file
+
+    def __init__(self, archetype: str, pos: Tuple[float, float], size: int = NPC_SIZE):
+        self.archetype = archetype
+        self.size = size
+        self.x = float(pos[0])
+        self.y = float(pos[1])
+        self.body_id: Optional[int] = None
+
+    def attach(self, collision) -> int:
+        """Registers this NPC as a dynamic body so it blocks (and is blocked by) others."""
+        self.body_id = collision.add_body((self.x, self.y, self.size, self.size), owner=self)
+        return self.body_id
+
+    def detach(self, collision) -> None:
+        if self.body_id is not None:
+            collision.remove_body(self.body_id)
+            self.body_id = None
+
+    def move(self, collision, dx: float, dy: float) -> None:
+        if self.body_id is None:
+            self.x += dx
+            self.y += dy
+            return
+        collision.move(self.body_id, dx, dy)
+        body = collision.bodies[self.body_id]
+        self.x, self.y = body.x, body.y
+
+
+# --- crowds ---
+# Thousands of customers live in numpy columns (one row per NPC, like plantsim.PlantSim)
+# and are ticked at a level of detail that depends on how close they are to the camera.
+
+ACTIVITIES = ("home", "wander", "buy", "visit")
+HOME, WANDER, BUY, VISIT = range(len(ACTIVITIES))
+
+# level of detail
+LOD_NEAR = 0      # on screen (+ margin): every tick, collides with walls and buildings
+LOD_FAR = 1       # in streamed chunks but off screen: straight-line moves every COARSE_EVERY ticks
+LOD_DORMANT = 2   # in unloaded chunks: statistical catch-up every AGGREGATE_EVERY ticks
+NEAR_MARGIN = 96           # px around the view that still counts as near
+COARSE_EVERY = 10
+AGGREGATE_EVERY = 120
+
+GAME_MINUTES_PER_SECOND = 2.0  # one game day = 12 real minutes
+WANDER_RADIUS = 400.0          # px, how far a wander leg goes
+ARRIVE_DISTANCE = 8.0
+BUY_THRESHOLD = 1.0            # craving at which a customer goes out to buy
+
+
+@dataclass(frozen=True)
+class Archetype:
+    key: str
+    display_name: str
+    speed: float               # px per second
+    craving_per_hour: float    # how fast the urge to buy builds up
+    spend: float               # cash per purchase
+    budget_per_day: float      # cash income per game day
+    color: Tuple[int, int, int]
+    # (from_hour, activity) entries, each lasting until the next one; wraps around midnight
+    schedule: Tuple[Tuple[int, str], ...]
+
+
+ARCHETYPES: Dict[str, Archetype] = {a.key: a for a in (
+    Archetype("dealer", "Drug Dealer", 110, 0.02, 400.0, 1200.0, (200, 40, 40),
+              ((0, "wander"), (6, "home"), (14, "visit"), (18, "wander"))),
+    Archetype("gertrude", "Old Lady Gertrude", 45, 0.03, 20.0, 40.0, (220, 200, 230),
+              ((0, "home"), (8, "wander"), (11, "visit"), (15, "home"))),
+    Archetype("tweaker", "Tweaker", 150, 0.35, 15.0, 30.0, (200, 200, 60),
+              ((0, "wander"), (5, "home"), (10, "wander"))),
+    Archetype("soccer_mom", "Soccer Mom", 90, 0.06, 60.0, 120.0, (240, 140, 180),
+              ((0, "home"), (7, "visit"), (9, "wander"), (15, "visit"), (18, "home"))),
+    Archetype("meathead", "Meathead", 100, 0.08, 50.0, 90.0, (230, 120, 40),
+              ((0, "home"), (6, "visit"), (9, "wander"), (20, "home"))),
+    Archetype("nerd", "Nerd", 70, 0.05, 40.0, 80.0, (90, 160, 90),
+              ((0, "home"), (17, "wander"), (22, "home"))),
+    Archetype("hottie", "Hottie", 95, 0.07, 80.0, 150.0, (255, 90, 160),
+              ((0, "wander"), (3, "home"), (12, "wander"), (16, "visit"))),
+    Archetype("business_chad", "Business Chad", 120, 0.10, 150.0, 500.0, (60, 90, 200),
+              ((0, "home"), (7, "visit"), (18, "wander"), (23, "home"))),
+)}
+ARCHETYPE_KEYS: List[str] = list(ARCHETYPES)
+
+
+def _schedule_table() -> np.ndarray:
+    """(archetype, hour) -> activity id."""
+    table = np.zeros((len(ARCHETYPE_KEYS), 24), dtype=np.int8)
+    for ai, key in enumerate(ARCHETYPE_KEYS):
+        entries = sorted(ARCHETYPES[key].schedule)
+        for hour in range(24):
+            current = entries[-1][1]  # before the first entry = the last one from yesterday
+            for start, activity in entries:
+                if start <= hour:
+                    current = activity
+            table[ai, hour] = ACTIVITIES.index(current)
+    return table
+
+
+def _archetype_params() -> Dict[str, np.ndarray]:
+    """Per-archetype numbers as arrays indexed by archetype id."""
+    specs = [ARCHETYPES[k] for k in ARCHETYPE_KEYS]
+    return {name: np.array([getattr(a, name) for a in specs], dtype=np.float32)
+            for name in ("speed", "craving_per_hour", "spend", "budget_per_day")}
+
+
+class Crowd:
+    """
+    Array-backed NPC population. Each NPC has a home, an activity picked from
+    its archetype's schedule (or "buy" once its craving is high enough), a
+    target it walks to, and some cash. tick() only does full work for the
+    handful of NPCs near the camera; everyone else is updated in staggered
+    batches at a coarser rate, so cost grows with what's on screen, not with
+    the population.
+    """
+
+    def __init__(self, bounds: pygame.Rect, capacity: int = 1024, seed: Optional[int] = None,
+                 collision=None, paths=None):
+        self.bounds = pygame.Rect(bounds)
+        self.rng = np.random.default_rng(seed)
+        self.collision = collision
+        self.paths = paths  # pathfinding.PathService: near NPCs follow its flow fields to destinations
+        self.schedule = _schedule_table()
+        self.params = _archetype_params()
+        self.capacity = 0
+        self.count = 0
+        self._alloc(capacity)
+
+        self.destinations: Dict[str, List[Tuple[float, float]]] = {"shop": [], "property": []}
+        self._fields: list = []                           # flow field per destination (with paths)
+        self._field_ids: Dict[str, List[int]] = {}        # kind -> index into _fields, per destination
+        self._near_rect = pygame.Rect(0, 0, 0, 0)
+        self.ticks = 0
+        self.minutes = 8 * 60.0  # game clock, starts at 8am
+        # called with (ids, archetype ids, amounts)
+        self.on_purchase: List[Callable[[np.ndarray, np.ndarray, np.ndarray], None]] = []
+
+        # stats
+        self.purchases = 0
+        self.revenue = 0.0
+        self.lod_counts = (0, 0, 0)
+
+    # --- storage ---
+
+    def _alloc(self, capacity: int) -> None:
+        def grow(name, dtype, fill=0):
+            old = getattr(self, name, None)
+            col = np.full(capacity, fill, dtype=dtype)
+            if old is not None:
+                col[:len(old)] = old
+            setattr(self, name, col)
+
+        grow("used", bool)
+        grow("archetype_id", np.int8)
+        grow("x", np.float32)
+        grow("y", np.float32)
+        grow("home_x", np.float32)
+        grow("home_y", np.float32)
+        grow("target_x", np.float32)
+        grow("target_y", np.float32)
+        grow("activity", np.int8)
+        grow("field_id", np.int16, -1)  # index into _fields while heading to a destination
+        grow("craving", np.float32)     # need to buy, goes out at BUY_THRESHOLD
+        grow("cash", np.float32)
+        grow("lod", np.int8, LOD_DORMANT)
+        grow("last_tick", np.int64)     # tick this NPC was last updated at
+        self.capacity = capacity
+
+    @property
+    def hour(self) -> int:
+        return int(self.minutes // 60) % 24
+
+    def add_destination(self, kind: str, pos: Tuple[float, float]) -> None:
+        places = self.destinations.setdefault(kind, [])
+        places.append((float(pos[0]), float(pos[1])))
+        if self.paths is not None:
+            self._field_ids.setdefault(kind, []).append(len(self._fields))
+            self._fields.append(self.paths.add_flow_field(f"crowd_{kind}_{len(places) - 1}", pos))
+
+    def spawn(self, archetype: str, n: int, area: Optional[pygame.Rect] = None,
+              avoid: Sequence[pygame.Rect] = ()) -> np.ndarray:
+        """
+        n NPCs of one archetype with homes scattered over `area` (default: the
+        whole map), outside any of the `avoid` rects (buildings they can't live in).
+        """
+        free = np.flatnonzero(~self.used)
+        if free.size < n:
+            self._alloc(max(self.capacity * 2, self.capacity + n))
+            free = np.flatnonzero(~self.used)
+        ids = free[:n]
+        area = pygame.Rect(area or self.bounds)
+        spec = ARCHETYPES[archetype]
+
+        self.used[ids] = True
+        self.archetype_id[ids] = ARCHETYPE_KEYS.index(archetype)
+        hx = self.rng.uniform(area.left, area.right, n)
+        hy = self.rng.uniform(area.top, area.bottom, n)
+        for _ in range(20):
+            bad = np.zeros(n, dtype=bool)
+            for r in avoid:
+                bad |= ((hx > r.left - NPC_SIZE) & (hx < r.right + NPC_SIZE)
+                        & (hy > r.top - NPC_SIZE) & (hy < r.bottom + NPC_SIZE))
+            if not bad.any():
+                break
+            hx[bad] = self.rng.uniform(area.left, area.right, int(bad.sum()))
+            hy[bad] = self.rng.uniform(area.top, area.bottom, int(bad.sum()))
+        self.home_x[ids] = hx
+        self.home_y[ids] = hy
+        self.x[ids] = self.target_x[ids] = self.home_x[ids]
+        self.y[ids] = self.target_y[ids] = self.home_y[ids]
+        self.activity[ids] = HOME
+        self.craving[ids] = self.rng.uniform(0.0, BUY_THRESHOLD, n)
+        self.cash[ids] = spec.budget_per_day * self.rng.uniform(0.5, 1.5, n)
+        self.lod[ids] = LOD_DORMANT
+        self.last_tick[ids] = self.ticks
+        self.count += n
+        return ids
+
+    def remove(self, ids) -> None:
+        ids = np.asarray(ids)
+        self.count -= int(self.used[ids].sum())
+        self.used[ids] = False
+
+    # --- level of detail ---
+
+    def update_lod(self, view: pygame.Rect) -> None:
+        """Sorts every NPC into near / far / dormant from the camera's world rect."""
+        from world import CHUNK_PX, STREAM_MARGIN
+
+        near = view.inflate(NEAR_MARGIN * 2, NEAR_MARGIN * 2)
+        # chunks the world keeps streamed in (same ring as World.stream)
+        loaded = view.inflate(STREAM_MARGIN * CHUNK_PX * 2, STREAM_MARGIN * CHUNK_PX * 2)
+        x, y = self.x, self.y
+        in_near = (x >= near.left) & (x < near.right) & (y >= near.top) & (y < near.bottom)
+        in_loaded = (x >= loaded.left) & (x < loaded.right) & (y >= loaded.top) & (y < loaded.bottom)
+        lod = np.where(in_near, LOD_NEAR, np.where(in_loaded, LOD_FAR, LOD_DORMANT)).astype(np.int8)
+
+        self.lod = lod
+        self._near_rect = near
+        counts = np.bincount(lod[self.used], minlength=3)
+        self.lod_counts = tuple(counts.tolist())
+
+    # --- simulation ---
+
+    def tick(self, dt: float, view: pygame.Rect) -> None:
+        """
+        One logic step. `view` is the camera's world-pixel rect. Near NPCs run
+        every tick; far and dormant ones run when their id comes up in the
+        stagger, with the whole time since their last update.
+        """
+        self.ticks += 1
+        self.minutes += dt * GAME_MINUTES_PER_SECOND
+        self.update_lod(view)
+
+        used, lod = self.used, self.lod
+        ids = np.arange(self.capacity)
+        due = used & (
+            (lod == LOD_NEAR)
+            | ((lod == LOD_FAR) & ((ids + self.ticks) % COARSE_EVERY == 0))
+            | ((lod == LOD_DORMANT) & ((ids + self.ticks) % AGGREGATE_EVERY == 0))
+        )
+        idx = np.flatnonzero(due)
+        if not idx.size:
+            return
+        elapsed = (self.ticks - self.last_tick[idx]) * dt
+        self.last_tick[idx] = self.ticks
+
+        self._needs(idx, elapsed)
+        self._think(idx)
+
+        tier = lod[idx]
+        near, far, dormant = idx[tier == LOD_NEAR], idx[tier == LOD_FAR], idx[tier == LOD_DORMANT]
+        if near.size:
+            self._move_near(near, elapsed[tier == LOD_NEAR])
+        if far.size:
+            self._move_straight(far, elapsed[tier == LOD_FAR])
+        if dormant.size:
+            self._aggregate(dormant, elapsed[tier == LOD_DORMANT])
+
+    def _needs(self, idx: np.ndarray, elapsed: np.ndarray) -> None:
+        hours = elapsed * GAME_MINUTES_PER_SECOND / 60.0
+        arch = self.archetype_id[idx]
+        budget = self.params["budget_per_day"]
+        self.craving[idx] += self.params["craving_per_hour"][arch] * hours
+        self.cash[idx] = np.minimum(self.cash[idx] + budget[arch] * hours / 24.0, budget[arch] * 2.0)
+
+    def _think(self, idx: np.ndarray) -> None:
+        """Picks each NPC's activity; NPCs that switch (or finished a wander leg) get a new target."""
+        arch = self.archetype_id[idx]
+        scheduled = self.schedule[arch, self.hour]
+        wants_to_buy = ((self.craving[idx] >= BUY_THRESHOLD) & (self.cash[idx] >= self.params["spend"][arch])
+                        & (scheduled != HOME) & bool(self.destinations["shop"]))
+        activity = np.where(wants_to_buy, BUY, scheduled).astype(np.int8)
+        if not self.destinations["property"]:
+            activity[activity == VISIT] = WANDER
+
+        arrived = self._distance_to_target(idx) <= ARRIVE_DISTANCE
+        changed = activity != self.activity[idx]
+        self.activity[idx] = activity
+        self._pick_targets(idx[changed | (arrived & (activity == WANDER))])
+
+    def _pick_targets(self, idx: np.ndarray) -> None:
+        if not idx.size:
+            return
+        activity = self.activity[idx]
+        tx = self.home_x[idx].copy()
+        ty = self.home_y[idx].copy()
+        field_id = np.full(idx.size, -1, dtype=np.int16)
+
+        wander = activity == WANDER
+        if wander.any():
+            n = int(wander.sum())
+            b = self.bounds
+            ox = self.rng.uniform(-WANDER_RADIUS, WANDER_RADIUS, n)
+            oy = self.rng.uniform(-WANDER_RADIUS, WANDER_RADIUS, n)
+            tx[wander] = np.clip(self.x[idx[wander]] + ox, b.left, b.right - 1)
+            ty[wander] = np.clip(self.y[idx[wander]] + oy, b.top, b.bottom - 1)
+        for act, kind in ((BUY, "shop"), (VISIT, "property")):
+            mask = activity == act
+            if mask.any():
+                places = np.asarray(self.destinations[kind], dtype=np.float32)
+                pick = self.rng.integers(0, len(places), int(mask.sum()))
+                tx[mask] = places[pick, 0]
+                ty[mask] = places[pick, 1]
+                if kind in self._field_ids:
+                    field_id[mask] = np.asarray(self._field_ids[kind], dtype=np.int16)[pick]
+
+        self.target_x[idx] = tx
+        self.target_y[idx] = ty
+        self.field_id[idx] = field_id
+
+    def _distance_to_target(self, idx: np.ndarray) -> np.ndarray:
+        return np.hypot(self.target_x[idx] - self.x[idx], self.target_y[idx] - self.y[idx])
+
+    def _step_vectors(self, idx: np.ndarray, elapsed: np.ndarray):
+        speed = self.params["speed"][self.archetype_id[idx]]
+        dx = self.target_x[idx] - self.x[idx]
+        dy = self.target_y[idx] - self.y[idx]
+        dist = np.hypot(dx, dy)
+        frac = np.minimum(1.0, np.divide(speed * elapsed, dist, out=np.ones_like(dist), where=dist > 0))
+        return dx * frac, dy * frac
+
+    def _move_straight(self, idx: np.ndarray, elapsed: np.ndarray) -> None:
+        dx, dy = self._step_vectors(idx, elapsed)
+        self.x[idx] += dx
+        self.y[idx] += dy
+        self._arrive(idx)
+
+    def _move_near(self, idx: np.ndarray, elapsed: np.ndarray) -> None:
+        """
+        Straight-line moves like the far tier, except NPCs whose step could touch
+        a wall, building or solid tile go through the collision world. Customers
+        walk through each other, only the static world blocks them. The
+        candidates are found with one vectorized overlap test against the
+        blockers around the view and resolved together with sweep_many().
+        """
+        dx, dy = self._step_vectors(idx, elapsed)
+        if self.paths is not None:
+            self._follow_fields(idx, dx, dy, elapsed)
+        if self.collision is None:
+            self.x[idx] += dx
+            self.y[idx] += dy
+            self._arrive(idx)
+            return
+
+        half = NPC_SIZE / 2
+        left = self.x[idx] - half + np.minimum(dx, 0)
+        top = self.y[idx] - half + np.minimum(dy, 0)
+        right = self.x[idx] + half + np.maximum(dx, 0)
+        bottom = self.y[idx] + half + np.maximum(dy, 0)
+        b = self.bounds
+        risky = (left < b.left) | (top < b.top) | (right > b.right) | (bottom > b.bottom)
+        for r in self.collision.blocker_regions(self._near_rect):
+            risky |= (left < r.right) & (r.left < right) & (top < r.bottom) & (r.top < bottom)
+        risky &= (dx != 0) | (dy != 0)
+
+        safe = ~risky
+        self.x[idx[safe]] += dx[safe]
+        self.y[idx[safe]] += dy[safe]
+
+        if risky.any():
+            ids, mx, my = idx[risky], dx[risky], dy[risky]
+            moved_x, moved_y = self.collision.sweep_many(self.x[ids] - half, self.y[ids] - half,
+                                                         NPC_SIZE, mx, my)
+            self.x[ids] += moved_x.astype(np.float32)
+            self.y[ids] += moved_y.astype(np.float32)
+            stuck = ids[np.abs(moved_x) + np.abs(moved_y) < 0.1 * (np.abs(mx) + np.abs(my))]
+        else:
+            stuck = idx[:0]
+        if stuck.size:
+            # walked into a wall: wander off somewhere else for a bit instead
+            self.activity[stuck] = WANDER
+            self._pick_targets(stuck)
+        self._arrive(idx)
+
+    def _follow_fields(self, idx: np.ndarray, dx: np.ndarray, dy: np.ndarray, elapsed: np.ndarray) -> None:
+        """Replaces straight-line steps with flow field steps for NPCs heading to a destination."""
+        from world import TILE_SIZE
+
+        field_id = self.field_id[idx]
+        en_route = np.flatnonzero((field_id >= 0) & (self._distance_to_target(idx) > TILE_SIZE))
+        if not en_route.size:
+            return
+        ids, fid = idx[en_route], field_id[en_route]
+        tx = (self.x[ids] // TILE_SIZE).astype(np.int64)
+        ty = (self.y[ids] // TILE_SIZE).astype(np.int64)
+        sx = np.zeros(ids.size, dtype=np.float32)
+        sy = np.zeros(ids.size, dtype=np.float32)
+        for f in np.unique(fid).tolist():
+            field = self._fields[f]
+            if not field.ready:
+                continue  # still building: walk straight for now
+            m = fid == f
+            h, w = field.distance.shape
+            cx, cy = np.clip(tx[m], 0, w - 1), np.clip(ty[m], 0, h - 1)
+            sx[m] = field.step_x[cy, cx]
+            sy[m] = field.step_y[cy, cx]
+
+        norm = np.hypot(sx, sy)
+        has = norm > 0
+        step = np.divide(self.params["speed"][self.archetype_id[ids]] * elapsed[en_route], norm,
+                         out=np.zeros_like(norm), where=has)
+        dx[en_route] = np.where(has, sx * step, dx[en_route])
+        dy[en_route] = np.where(has, sy * step, dy[en_route])
+
+    def query_radius(self, center: Tuple[float, float], radius: float) -> np.ndarray:
+        """Ids of NPCs within `radius` px of a point."""
+        near = self.used & (np.hypot(self.x - center[0], self.y - center[1]) <= radius)
+        return np.flatnonzero(near)
+
+    def _aggregate(self, idx: np.ndarray, elapsed: np.ndarray) -> None:
+        """
+        Dormant NPCs don't walk: a trip finishes with the chance that it would
+        have finished in the elapsed time, and the NPC then jumps to its target.
+        """
+        speed = self.params["speed"][self.archetype_id[idx]]
+        trip_seconds = self._distance_to_target(idx) / speed
+        done = self.rng.random(idx.size) * trip_seconds <= elapsed
+        done_idx = idx[done]
+        self.x[done_idx] = self.target_x[done_idx]
+        self.y[done_idx] = self.target_y[done_idx]
+        self._arrive(idx)
+
+    def _arrive(self, idx: np.ndarray) -> None:
+        """Buyers standing at a shop make their purchase."""
+        buying = idx[(self.activity[idx] == BUY) & (self._distance_to_target(idx) <= ARRIVE_DISTANCE)]
+        if not buying.size:
+            return
+        arch = self.archetype_id[buying]
+        spend = self.params["spend"][arch]
+        self.cash[buying] -= spend
+        self.craving[buying] = 0.0
+        self.activity[buying] = WANDER
+        self._pick_targets(buying)
+        self.purchases += int(buying.size)
+        self.revenue += float(spend.sum())
+        for callback in self.on_purchase:
+            callback(buying, arch, spend)
+
+    # --- queries ---
+
+    def visible(self) -> np.ndarray:
+        """Ids of the NPCs to draw this frame."""
+        return np.flatnonzero(self.used & (self.lod == LOD_NEAR))
+
+    def activity_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.activity[self.used], minlength=len(ACTIVITIES))
+        return dict(zip(ACTIVITIES, counts.tolist()))
+
+    # --- checkpoints ---
+
+    COLUMNS = ("used", "archetype_id", "x", "y", "home_x", "home_y", "target_x", "target_y", "activity",
+               "field_id", "craving", "cash", "lod", "last_tick")
+
+    def snapshot(self) -> Dict[str, object]:
+        """
+        Everything tick() reads and writes, columns as raw bytes (replay
+        checkpoints). The RNG isn't included: replays reseed it every tick.
+        """
+        return {
+            "capacity": self.capacity,
+            "count": self.count,
+            "ticks": self.ticks,
+            "minutes": self.minutes,
+            "purchases": self.purchases,
+            "revenue": self.revenue,
+            "columns": {name: getattr(self, name).tobytes() for name in self.COLUMNS},
+        }
+
+    def restore(self, data: Dict[str, object]) -> None:
+        self.capacity = int(data["capacity"])
+        self.count = int(data["count"])
+        self.ticks = int(data["ticks"])
+        self.minutes = float(data["minutes"])
+        self.purchases = int(data["purchases"])
+        self.revenue = float(data["revenue"])
+        for name in self.COLUMNS:
+            setattr(self, name, np.frombuffer(data["columns"][name], dtype=getattr(self, name).dtype).copy())
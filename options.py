@@ -2,5 +2,35 @@
 
 import pygame
 
-def run_options(screen, clock):
-    print("test")
+from renderer import DirtyRenderer
+from scenes import QUIT, Scene
+from ui import render_text
+
+
+class OptionsScene(Scene):
+    """Placeholder screen until there are options to set. ESC or a click goes back."""
+
+    idle = True
+
+    def load(self):
+        center = self.screen.get_rect().center
+        self.title_surface = render_text("OPTIONS", 64)
+        self.title_rect = self.title_surface.get_rect(center=(center[0], center[1] - 40))
+        self.hint_surface = render_text("Press ESC to go back", 32, (180, 180, 180))
+        self.hint_rect = self.hint_surface.get_rect(center=(center[0], center[1] + 20))
+        self.renderer = DirtyRenderer(self.screen, (40, 40, 50))
+
+    def resume(self):
+        self.renderer.invalidate()
+
+    def frame(self, events, frame_dt):
+        for event in events:
+            if event.type == pygame.QUIT:
+                return QUIT
+            if ((event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE)
+                    or event.type == pygame.MOUSEBUTTONDOWN):
+                return "MENU"
+        self.renderer.blit("title", self.title_surface, self.title_rect.topleft)
+        self.renderer.blit("hint", self.hint_surface, self.hint_rect.topleft)
+        self.renderer.present()
+        return None
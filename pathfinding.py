@@ -0,0 +1,381 @@
+# pathfinding: A* on the tile grid, shared flow fields for busy destinations, a path cache,
+# and a per-frame time budget so a burst of requests doesn't turn into a frame spike
+
+from __future__ import annotations
+
+import heapq
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pygame
+
+from world import TILE_SIZE
+
+BUDGET_MS = 1.0             # pathfinding time per frame
+MAX_CACHED_PATHS = 512
+SEARCH_SLICE = 32           # A* node expansions between clock checks
+MAX_SEARCH_NODES = 20000    # give up on a single A* search after this many expansions
+FIELD_SLICE = 16            # flow field wavefront steps between clock checks
+TICK_SLICES = 64            # search/field slices per update(slices=...) in reproducible (replayed) runs
+
+Tile = Tuple[int, int]
+CachedPath = Tuple[List[Tuple[float, float]], pygame.Rect]  # waypoints, tiles they cross
+
+# 8 neighbors; diagonals cost sqrt(2) and may not cut corners
+_NEIGHBORS = ((1, 0, 1.0), (-1, 0, 1.0), (0, 1, 1.0), (0, -1, 1.0),
+              (1, 1, math.sqrt(2)), (1, -1, math.sqrt(2)), (-1, 1, math.sqrt(2)), (-1, -1, math.sqrt(2)))
+
+
+def to_tile(pos: Tuple[float, float]) -> Tile:
+    return int(pos[0] // TILE_SIZE), int(pos[1] // TILE_SIZE)
+
+
+def tile_center(tile: Tile) -> Tuple[float, float]:
+    return tile[0] * TILE_SIZE + TILE_SIZE / 2, tile[1] * TILE_SIZE + TILE_SIZE / 2
+
+
+class PathRequest:
+    """Handle for a queued path. `path` is a list of world-px waypoints once done."""
+    __slots__ = ("start", "goal", "callback", "status", "path", "_search")
+
+    def __init__(self, start: Tile, goal: Tile, callback: Optional[Callable[["PathRequest"], None]]):
+        self.start = start
+        self.goal = goal
+        self.callback = callback
+        self.status = "pending"   # pending / done / failed
+        self.path: Optional[List[Tuple[float, float]]] = None
+        self._search: Optional[Iterator] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status != "pending"
+
+
+class FlowField:
+    """
+    Distance-to-goal for every tile plus the step to take from each tile, shared
+    by every agent heading to the same place. Built with a vectorized wavefront,
+    a few steps at a time.
+    """
+
+    def __init__(self, name: str, goal: Tile):
+        self.name = name
+        self.goal = goal
+        self.distance: Optional[np.ndarray] = None   # (h, w) steps to goal, -1 = unreachable
+        self.step_x: Optional[np.ndarray] = None     # (h, w) int8 tile step towards the goal
+        self.step_y: Optional[np.ndarray] = None
+        self.ready = False      # has a usable field (may be an older one while rebuilding)
+        self.stale = True       # needs a (re)build
+        self._build: Optional[Iterator] = None
+
+    def direction_at(self, pos: Tuple[float, float]) -> Tuple[int, int]:
+        if not self.ready:
+            return 0, 0
+        tx, ty = to_tile(pos)
+        h, w = self.distance.shape
+        if not (0 <= tx < w and 0 <= ty < h):
+            return 0, 0
+        return int(self.step_x[ty, tx]), int(self.step_y[ty, tx])
+
+    def directions(self, xs: np.ndarray, ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Vectorized direction_at for world-px positions."""
+        if not self.ready:
+            return np.zeros(len(xs), dtype=np.int8), np.zeros(len(ys), dtype=np.int8)
+        h, w = self.distance.shape
+        tx = np.clip((np.asarray(xs) // TILE_SIZE).astype(np.int64), 0, w - 1)
+        ty = np.clip((np.asarray(ys) // TILE_SIZE).astype(np.int64), 0, h - 1)
+        return self.step_x[ty, tx], self.step_y[ty, tx]
+
+
+class PathService:
+    """
+    Pathfinding over a world.World. Walkability comes from solid tiles plus the
+    static colliders of a collision.CollisionWorld, rasterized into a numpy grid
+    and patched by region whenever either changes. Requests are queued and
+    solved in update() within a time budget; A* searches and flow field builds
+    are resumable, so one long search is spread over several frames.
+    """
+
+    def __init__(self, world, collision=None, budget_ms: float = BUDGET_MS):
+        self.world = world
+        self.collision = collision
+        self.budget_ms = budget_ms
+        self.width = world.width_tiles
+        self.height = world.height_tiles
+        self.walkable = np.ones((self.height, self.width), dtype=bool)
+        # walkable as a flat list for A*, rebuilt after changes
+        self._walkable_flat: Optional[List[bool]] = None
+        self._rasterize(pygame.Rect(0, 0, self.width, self.height))
+
+        self.queue: Deque[PathRequest] = deque()
+        self.cache: "OrderedDict[Tuple[Tile, Tile], CachedPath]" = OrderedDict()
+        self.fields: Dict[str, FlowField] = {}
+
+        world.on_tiles_changed.append(self.invalidate_region)
+        if collision is not None:
+            collision.on_static_changed.append(self.invalidate_region)
+
+        # stats
+        self.cache_hits = 0
+        self.searches = 0
+        self.last_update_ms = 0.0
+
+    # --- grid ---
+
+    def _rasterize(self, tiles: pygame.Rect) -> None:
+        """Recomputes walkability for a rect of tiles."""
+        tiles = tiles.clip(pygame.Rect(0, 0, self.width, self.height))
+        if not tiles.w or not tiles.h:
+            return
+        block = np.ones((tiles.h, tiles.w), dtype=bool)
+        for ty in range(tiles.top, tiles.bottom):
+            for tx in range(tiles.left, tiles.right):
+                if self.world.is_solid(tx, ty):
+                    block[ty - tiles.top, tx - tiles.left] = False
+        if self.collision is not None:
+            px = pygame.Rect(tiles.x * TILE_SIZE, tiles.y * TILE_SIZE,
+                             tiles.w * TILE_SIZE, tiles.h * TILE_SIZE)
+            for hit in self.collision.query_rect(px, bodies=False):
+                r = hit.rect.clip(px)
+                x0, y0 = r.left // TILE_SIZE - tiles.left, r.top // TILE_SIZE - tiles.top
+                x1, y1 = (r.right - 1) // TILE_SIZE - tiles.left, (r.bottom - 1) // TILE_SIZE - tiles.top
+                block[y0:y1 + 1, x0:x1 + 1] = False
+        self.walkable[tiles.top:tiles.bottom, tiles.left:tiles.right] = block
+        self._walkable_flat = None
+
+    def is_walkable(self, tile: Tile) -> bool:
+        tx, ty = tile
+        return 0 <= tx < self.width and 0 <= ty < self.height and bool(self.walkable[ty, tx])
+
+    def invalidate_region(self, world_rect: pygame.Rect) -> None:
+        """
+        Tiles or buildings changed inside a world-px rect: re-rasterize those
+        tiles, drop cached paths that pass through them and schedule flow field
+        rebuilds (fields keep serving the old answer until the new one is ready).
+        """
+        r = pygame.Rect(world_rect)
+        tiles = pygame.Rect(r.left // TILE_SIZE, r.top // TILE_SIZE,
+                            (r.right - 1) // TILE_SIZE - r.left // TILE_SIZE + 1,
+                            (r.bottom - 1) // TILE_SIZE - r.top // TILE_SIZE + 1)
+        self._rasterize(tiles)
+        # a path is only affected if it crosses the region (a newly opened shortcut
+        # elsewhere won't be picked up until the path falls out of the cache)
+        for key in [k for k, (_, bbox) in self.cache.items() if bbox.colliderect(tiles)]:
+            del self.cache[key]
+        for field in self.fields.values():
+            field.stale = True
+            field._build = None
+
+    # --- requests ---
+
+    def request(self, start: Tuple[float, float], goal: Tuple[float, float],
+                callback: Optional[Callable[[PathRequest], None]] = None) -> PathRequest:
+        """Queues a path between two world-px points. Cached paths complete immediately."""
+        req = PathRequest(to_tile(start), to_tile(goal), callback)
+        cached = self.cache.get((req.start, req.goal))
+        if cached is not None:
+            self.cache.move_to_end((req.start, req.goal))
+            self.cache_hits += 1
+            self._finish(req, list(cached[0]))
+        else:
+            self.queue.append(req)
+        return req
+
+    def find_path(self, start: Tuple[float, float],
+                  goal: Tuple[float, float]) -> Optional[List[Tuple[float, float]]]:
+        """Solves a path right now, ignoring the budget (tools, tests, one-offs)."""
+        req = self.request(start, goal)
+        if not req.done:
+            self.queue.remove(req)
+            for _ in self._run(req):
+                pass
+        return req.path
+
+    def add_flow_field(self, name: str, goal: Tuple[float, float]) -> FlowField:
+        """Registers a shared destination (shop, the player's house, a grow room...)."""
+        field = FlowField(name, to_tile(goal))
+        self.fields[name] = field
+        return field
+
+    def remove_flow_field(self, name: str) -> None:
+        self.fields.pop(name, None)
+
+    def update(self, budget_ms: Optional[float] = None, slices: Optional[int] = None) -> None:
+        """
+        Does queued pathfinding work until the frame's budget is used up. With
+        `slices` the budget is that many search/field slices instead of wall
+        time, so how far the work gets doesn't depend on the machine (what
+        game_play.Simulation uses, to keep recorded sessions replayable).
+        """
+        start = time.perf_counter()
+        deadline = start + (self.budget_ms if budget_ms is None else budget_ms) / 1000.0
+        work = 0  # slices done
+
+        def spent() -> bool:
+            return work >= slices if slices is not None else time.perf_counter() >= deadline
+
+        # flow fields first: one field serves many agents
+        for field in self.fields.values():
+            if not field.stale:
+                continue
+            if field._build is None:
+                field._build = self._build_field(field)
+            for _ in field._build:
+                work += 1
+                if spent():
+                    break
+            else:
+                continue
+            break
+
+        while self.queue and not spent():
+            req = self.queue[0]
+            if req._search is None:
+                req._search = self._run(req)
+            for _ in req._search:
+                work += 1
+                if spent():
+                    break
+            if req.done:
+                self.queue.popleft()
+        self.last_update_ms = (time.perf_counter() - start) * 1000.0
+
+    def finish(self) -> None:
+        """Does all queued work now, ignoring the budget (at load, or where
+        results must not depend on timing)."""
+        self.update(float("inf"))
+
+    # --- A* ---
+
+    def _run(self, req: PathRequest) -> Iterator[None]:
+        """Resumable A*; yields every SEARCH_SLICE expansions so update() can check the clock."""
+        self.searches += 1
+        start, goal = req.start, req.goal
+        if not self.is_walkable(goal) or not self.is_walkable(start):
+            self._finish(req, None)
+            return
+
+        # nodes are flat tile indices (y * w + x) into plain lists: no per-node tuples
+        # or dict entries, which keeps big searches cheap and out of the GC's way
+        w, h = self.width, self.height
+        if self._walkable_flat is None:
+            self._walkable_flat = self.walkable.ravel().tolist()
+        walkable = self._walkable_flat
+        gx, gy = goal
+        start_i, goal_i = start[1] * w + start[0], gy * w + gx
+        sqrt2 = math.sqrt(2)
+
+        def heuristic(i: int) -> float:
+            # octile distance
+            dx, dy = abs(i % w - gx), abs(i // w - gy)
+            return max(dx, dy) + (sqrt2 - 1) * min(dx, dy)
+
+        cost = [math.inf] * (w * h)
+        came_from = [-1] * (w * h)
+        cost[start_i] = 0.0
+        open_heap = [(heuristic(start_i), 0.0, start_i)]
+        expanded = 0
+        while open_heap:
+            _, g, node = heapq.heappop(open_heap)
+            if node == goal_i:
+                tiles = []
+                while node != -1:
+                    tiles.append((node % w, node // w))
+                    node = came_from[node]
+                tiles.reverse()
+                self._store(req, tiles)
+                return
+            if g > cost[node]:
+                continue  # stale heap entry
+            expanded += 1
+            if expanded > MAX_SEARCH_NODES:
+                break
+            if expanded % SEARCH_SLICE == 0:
+                yield
+
+            x, y = node % w, node // w
+            for dx, dy, step in _NEIGHBORS:
+                nx, ny = x + dx, y + dy
+                if not (0 <= nx < w and 0 <= ny < h):
+                    continue
+                n = ny * w + nx
+                if not walkable[n]:
+                    continue
+                if dx and dy and not (walkable[y * w + nx] and walkable[ny * w + x]):
+                    continue  # no squeezing diagonally past a corner
+                ng = g + step
+                if ng < cost[n]:
+                    cost[n] = ng
+                    came_from[n] = node
+                    heapq.heappush(open_heap, (ng + heuristic(n), ng, n))
+        self._finish(req, None)
+
+    def _store(self, req: PathRequest, tiles: List[Tile]) -> None:
+        path = [tile_center(t) for t in tiles]
+        xs = [t[0] for t in tiles]
+        ys = [t[1] for t in tiles]
+        bbox = pygame.Rect(min(xs), min(ys), max(xs) - min(xs) + 1, max(ys) - min(ys) + 1)
+        self.cache[(req.start, req.goal)] = (path, bbox)
+        while len(self.cache) > MAX_CACHED_PATHS:
+            self.cache.popitem(last=False)
+        self._finish(req, list(path))
+
+    def _finish(self, req: PathRequest, path: Optional[List[Tuple[float, float]]]) -> None:
+        req.path = path
+        req.status = "done" if path is not None else "failed"
+        if req.callback is not None:
+            req.callback(req)
+
+    # --- flow fields ---
+
+    def _build_field(self, field: FlowField) -> Iterator[None]:
+        """
+        Breadth-first wavefront from the goal over the walkable grid, one numpy
+        dilation per step, then every tile points at its lowest-distance neighbor.
+        """
+        walkable = self.walkable.copy()
+        h, w = walkable.shape
+        distance = np.full((h, w), -1, dtype=np.int32)
+        gx, gy = field.goal
+        if 0 <= gx < w and 0 <= gy < h and walkable[gy, gx]:
+            distance[gy, gx] = 0
+            frontier = np.zeros((h, w), dtype=bool)
+            frontier[gy, gx] = True
+            step = 0
+            while frontier.any():
+                step += 1
+                grown = np.zeros_like(frontier)
+                grown[1:, :] |= frontier[:-1, :]
+                grown[:-1, :] |= frontier[1:, :]
+                grown[:, 1:] |= frontier[:, :-1]
+                grown[:, :-1] |= frontier[:, 1:]
+                frontier = grown & walkable & (distance < 0)
+                distance[frontier] = step
+                if step % FIELD_SLICE == 0:
+                    yield
+
+        # pick the best neighbor for every tile (diagonals only when both sides are open)
+        big = np.iinfo(np.int32).max
+        dist = np.where(distance < 0, big, distance).astype(np.int64)
+        padded = np.pad(dist, 1, constant_values=big)
+        open_pad = np.pad(walkable, 1, constant_values=False)
+        best = dist.copy()
+        step_x = np.zeros((h, w), dtype=np.int8)
+        step_y = np.zeros((h, w), dtype=np.int8)
+        for dx, dy, _ in _NEIGHBORS:
+            neighbor = padded[1 + dy:1 + dy + h, 1 + dx:1 + dx + w]
+            if dx and dy:
+                sides = open_pad[1:1 + h, 1 + dx:1 + dx + w] & open_pad[1 + dy:1 + dy + h, 1:1 + w]
+                neighbor = np.where(sides, neighbor, big)
+            better = neighbor < best
+            best = np.where(better, neighbor, best)
+            step_x[better] = dx
+            step_y[better] = dy
+
+        field.distance, field.step_x, field.step_y = distance, step_x, step_y
+        field.ready = True
+        field.stale = False
+        field._build = None
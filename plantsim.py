@@ -0,0 +1,357 @@
+# plant simulation core: every plant is a row in a set of numpy columns, one vectorized tick for all of them
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional
+
+import weakref
+
+import numpy as np
+
+import content
+from consumables import GENETICS, MEDIUMS, NUTRIENTS, GrowSetup, compute_outcomes
+from equipment import IRRIGATION
+
+BASE_GROW_DAYS = 60.0       # days from clone to harvest at growth_multiplier 1.0
+BASE_WATER_PER_DAY = 0.5    # fraction of a full pot a plant drinks per day at water_need_mult 1.0
+POT_LITERS = 4.0            # liters in a full pot, for reservoir accounting
+DROUGHT_DAMAGE = 0.35       # health lost per day with a dry pot
+RECOVERY = 0.10             # health regained per day when watered
+QUALITY_RATE = 0.2          # how fast quality drifts towards its target, per day
+
+# growth progress (0..1) where each stage starts
+STAGES = ("seedling", "veg", "flower", "ready")
+STAGE_STARTS = np.array([0.0, 0.15, 0.55, 1.0], dtype=np.float32)
+
+# id tables: index into these lists is what the id columns store. Nutrient id 0 = none.
+MEDIUM_KEYS: List[str] = list(MEDIUMS)
+GENETICS_KEYS: List[str] = list(GENETICS)
+NUTRIENT_KEYS: List[Optional[str]] = [None] + list(NUTRIENTS)
+
+
+def _setup_tables():
+    """Per-(medium, genetics, nutrient) rates, precomputed from compute_outcomes."""
+    shape = (len(MEDIUM_KEYS), len(GENETICS_KEYS), len(NUTRIENT_KEYS))
+    tables = {name: np.zeros(shape, dtype=np.float32) for name in
+              ("growth_per_day", "water_per_day", "quality_target", "yield_mult", "fail_chance")}
+    for mi, m in enumerate(MEDIUM_KEYS):
+        for gi, g in enumerate(GENETICS_KEYS):
+            for ni, n in enumerate(NUTRIENT_KEYS):
+                out = compute_outcomes(GrowSetup(MEDIUMS[m], GENETICS[g], NUTRIENTS[n] if n else None))
+                tables["growth_per_day"][mi, gi, ni] = out["growth_multiplier"] / BASE_GROW_DAYS
+                tables["water_per_day"][mi, gi, ni] = BASE_WATER_PER_DAY * out["water_need_mult"]
+                tables["quality_target"][mi, gi, ni] = out["quality_out_of_10"]
+                tables["yield_mult"][mi, gi, ni] = out["yield_multiplier"]
+                tables["fail_chance"][mi, gi, ni] = out["fail_chance"]
+    return tables
+
+
+_SIMS: "weakref.WeakSet[PlantSim]" = weakref.WeakSet()  # live sims, for hot reloads
+
+
+def _reload(data, changed) -> None:
+    """New definitions get appended to the id tables (stored ids stay valid),
+    then every live sim's rates are rebuilt."""
+    if not changed & {"mediums", "genetics", "nutrients"}:
+        return
+    for keys, table in ((MEDIUM_KEYS, MEDIUMS), (GENETICS_KEYS, GENETICS), (NUTRIENT_KEYS, NUTRIENTS)):
+        keys.extend(key for key in table if key not in keys)
+    for sim in list(_SIMS):
+        sim.refresh_tables()
+
+
+content.on_reload.append(_reload)  # after consumables' own hook, which it imported first
+
+
+class PlantSim:
+    """
+    Struct-of-arrays store for every plant in every grow room. Plants are rows
+    (ids are row indices, reused after harvest/removal), rooms are rows in a
+    second, much smaller set of columns. tick() advances everything at once.
+    """
+
+    def __init__(self, capacity: int = 1024, seed: Optional[int] = None):
+        self.rng = np.random.default_rng(seed)
+        self._set_tables(_setup_tables())
+        _SIMS.add(self)
+        self.capacity = 0
+        self.count = 0
+        self.end = 0  # rows at and past this have never held a plant; tick() stops there
+        self._alloc(capacity)
+        self.dirty = True  # changed since the last save
+
+        # rooms
+        self.room_irrigation: List[str] = []
+        self.room_refill_per_day = np.zeros(0, dtype=np.float32)
+        self.room_reservoir = np.zeros(0, dtype=np.float32)        # liters left, inf = no reservoir
+        self.room_reservoir_size = np.zeros(0, dtype=np.float32)
+
+    # --- storage ---
+
+    COLUMNS = ("used", "alive", "medium_id", "genetics_id", "nutrient_id", "room_id",
+               "growth", "stage", "water", "health", "quality")
+    # per-plant copies of its setup's rates, so tick() reads contiguous columns
+    # instead of gathering from the 3-d tables; rebuilt from the ids, never saved
+    DERIVED = ("setup_id", "drink_rate", "grow_rate", "quality_target", "refill_rate")
+
+    def _set_tables(self, tables) -> None:
+        self.tables = tables
+        self.flat_tables = {name: table.ravel() for name, table in tables.items()}  # indexed by setup_id
+
+    def refresh_tables(self) -> None:
+        """Recomputes the rate tables (after the consumables changed) and every plant's rate columns."""
+        self._set_tables(_setup_tables())
+        self._update_rates()
+
+    def _update_rates(self, ids=slice(None)) -> None:
+        shape = self.tables["growth_per_day"].shape
+        setup = np.ravel_multi_index(
+            (self.medium_id[ids], self.genetics_id[ids], self.nutrient_id[ids]), shape)
+        flat = self.flat_tables
+        self.setup_id[ids] = setup
+        self.drink_rate[ids] = flat["water_per_day"][setup]
+        self.grow_rate[ids] = flat["growth_per_day"][setup]
+        self.quality_target[ids] = flat["quality_target"][setup]
+        if self.room_refill_per_day.size:
+            self.refill_rate[ids] = self.room_refill_per_day[np.maximum(self.room_id[ids], 0)]
+
+    def _alloc(self, capacity: int) -> None:
+        def grow(name, dtype, fill=0):
+            old = getattr(self, name, None)
+            col = np.full(capacity, fill, dtype=dtype)
+            if old is not None:
+                col[:len(old)] = old
+            setattr(self, name, col)
+
+        grow("used", bool)
+        grow("alive", bool)
+        grow("medium_id", np.int8)
+        grow("genetics_id", np.int8)
+        grow("nutrient_id", np.int8)
+        grow("room_id", np.int32, -1)
+        grow("growth", np.float32)     # 0..1, harvestable at 1
+        grow("stage", np.int8)         # index into STAGES
+        grow("water", np.float32)      # 0..1 of a full pot
+        grow("health", np.float32)     # 0..1, plant dies at 0
+        grow("quality", np.float32)    # 0..10
+        grow("setup_id", np.int32)     # flat index into flat_tables
+        grow("drink_rate", np.float32)
+        grow("grow_rate", np.float32)
+        grow("quality_target", np.float32)  # at full health (tick() scales it by health)
+        grow("refill_rate", np.float32)   # the room's irrigation refill_per_day
+        self.capacity = capacity
+
+    # --- rooms ---
+
+    def add_room(self, irrigation: str = "pitcher") -> int:
+        spec = IRRIGATION[irrigation]
+        self.room_irrigation.append(irrigation)
+        self.room_refill_per_day = np.append(self.room_refill_per_day, np.float32(spec.refill_per_day))
+        liters = np.inf if spec.reservoir_liters is None else spec.reservoir_liters
+        self.room_reservoir = np.append(self.room_reservoir, np.float32(liters))
+        self.room_reservoir_size = np.append(self.room_reservoir_size, np.float32(liters))
+        self.dirty = True
+        return len(self.room_irrigation) - 1
+
+    def refill_reservoir(self, room: int) -> None:
+        self.room_reservoir[room] = self.room_reservoir_size[room]
+        self.dirty = True
+
+    # --- plants ---
+
+    def plant(self, room: int, medium: str, genetics: str, nutrient: Optional[str] = None,
+              n: int = 1) -> np.ndarray:
+        """Adds n identical plants to a room, returns their ids."""
+        free = np.flatnonzero(~self.used)
+        if free.size < n:
+            self._alloc(max(self.capacity * 2, self.capacity + n))
+            free = np.flatnonzero(~self.used)
+        ids = free[:n]
+
+        self.used[ids] = True
+        self.alive[ids] = True
+        self.medium_id[ids] = MEDIUM_KEYS.index(medium)
+        self.genetics_id[ids] = GENETICS_KEYS.index(genetics)
+        self.nutrient_id[ids] = NUTRIENT_KEYS.index(nutrient)
+        self.room_id[ids] = room
+        self.end = max(self.end, int(ids[-1]) + 1)
+        self._update_rates(ids)
+        self.growth[ids] = 0.0
+        self.stage[ids] = 0
+        self.water[ids] = 1.0
+        self.health[ids] = 1.0
+        self.quality[ids] = self.quality_target[ids] * 0.5
+        self.count += n
+        self.dirty = True
+        return ids
+
+    def remove(self, ids) -> None:
+        ids = np.asarray(ids)
+        self.count -= int(self.used[ids].sum())
+        self.used[ids] = False
+        self.alive[ids] = False
+        self.room_id[ids] = -1
+        self.dirty = True
+
+    def clear_dead(self) -> int:
+        dead = np.flatnonzero(self.used & ~self.alive)
+        self.remove(dead)
+        return int(dead.size)
+
+    def water_plants(self, ids=None, amount: float = 1.0) -> None:
+        """Hand watering: tops up the given plants (all of them by default)."""
+        mask = self.used if ids is None else ids
+        self.water[mask] = np.minimum(1.0, self.water[mask] + amount)
+        self.dirty = True
+
+    def in_room(self, room: int) -> np.ndarray:
+        return np.flatnonzero(self.used & (self.room_id == room))
+
+    # --- simulation ---
+
+    def tick(self, dt_days: float, growth_bonus: float = 1.0, automation_bonus: float = 0.0) -> None:
+        """
+        Advances all plants by dt_days. `growth_bonus` multiplies growth speed
+        (e.g. the watering skill's growth_multiplier), `automation_bonus` speeds
+        up automated irrigation (the watering skill's automation_bonus).
+        """
+        n = self.end
+        active = self.alive[:n] & (self.growth[:n] < 1.0)
+        if not active.any():
+            return
+        # everything below runs over the contiguous [:n] columns and only writes
+        # back where `active`; empty slots have room -1 and are never active
+        water_col, health_col = self.water[:n], self.health[:n]
+        growth_col, quality_col = self.growth[:n], self.quality[:n]
+
+        # drink
+        water = water_col - self.drink_rate[:n] * dt_days
+
+        # automated irrigation tops pots back up from the room's reservoir
+        if self.room_refill_per_day.any():
+            refill = self.refill_rate[:n] * ((1.0 + automation_bonus) * dt_days)
+            want = np.minimum(1.0 - np.maximum(water, 0.0), refill)
+            want *= active
+            if want.any():
+                rooms = np.maximum(self.room_id[:n], 0)
+                room_want = np.bincount(rooms, weights=want, minlength=len(self.room_reservoir)) * POT_LITERS
+                supplied = np.minimum(room_want, self.room_reservoir)
+                share = np.divide(supplied, room_want, out=np.zeros_like(supplied), where=room_want > 0)
+                water = np.maximum(water, 0.0)
+                if (share < 1.0).any():  # some reservoir ran dry: its plants get a share of what was left
+                    want *= share[rooms]
+                water += want
+                finite = np.isfinite(self.room_reservoir)
+                self.room_reservoir[finite] -= supplied[finite].astype(np.float32)
+        dry = water <= 0.0
+        np.copyto(water_col, np.clip(water, 0.0, 1.0), where=active)
+
+        # health: drought hurts, watered plants recover
+        health = health_col + (RECOVERY * dt_days - dry * np.float32((DROUGHT_DAMAGE + RECOVERY) * dt_days))
+        health = np.clip(health, 0.0, 1.0)
+        np.copyto(health_col, health, where=active)
+        dead = active & (health <= 0.0)
+        if dead.any():
+            self.alive[:n][dead] = False
+
+        # grow (dry plants stall) and drift quality towards target scaled by health
+        rate = self.grow_rate[:n] * growth_bonus * ~dry
+        growth = np.minimum(1.0, growth_col + rate * dt_days)
+        np.copyto(growth_col, growth, where=active)
+        stage = np.zeros(n, dtype=np.int8)
+        # same as searchsorted(side="right") - 1, but much cheaper for 4 stages
+        for start in STAGE_STARTS[1:]:
+            stage += growth >= start
+        np.copyto(self.stage[:n], stage, where=active)
+
+        target = self.quality_target[:n] * health
+        blend = min(1.0, QUALITY_RATE * dt_days)
+        np.copyto(quality_col, quality_col + (target - quality_col) * blend, where=active)
+        self.dirty = True
+
+    def ready(self, room: Optional[int] = None) -> np.ndarray:
+        mask = self.alive & (self.growth >= 1.0)
+        if room is not None:
+            mask &= self.room_id == room
+        return np.flatnonzero(mask)
+
+    def harvest(self, room: Optional[int] = None, base_yield: float = 100.0) -> Dict[str, float]:
+        """
+        Harvests every ready plant (optionally only one room) and frees their
+        slots. Each plant rolls its setup's fail_chance; yields scale with health.
+        """
+        ids = self.ready(room)
+        if not ids.size:
+            return {"plants": 0, "failed": 0, "yield": 0.0, "avg_quality": 0.0}
+        setup = self.setup_id[ids]
+        failed = self.rng.random(ids.size) < self.flat_tables["fail_chance"][setup]
+        grams = base_yield * self.flat_tables["yield_mult"][setup] * self.health[ids] * ~failed
+        ok = ~failed
+        result = {
+            "plants": int(ids.size),
+            "failed": int(failed.sum()),
+            "yield": float(grams.sum()),
+            "avg_quality": float(self.quality[ids][ok].mean()) if ok.any() else 0.0,
+        }
+        self.remove(ids)
+        return result
+
+    # --- saving ---
+
+    def save_state(self) -> Dict[str, object]:
+        """Columns as raw bytes: big farms save and load in a few milliseconds."""
+        columns = {name: getattr(self, name).tobytes() for name in self.COLUMNS}
+        return {
+            "capacity": self.capacity,
+            "count": self.count,
+            "columns": columns,
+            "dtypes": {name: getattr(self, name).dtype.str for name in self.COLUMNS},
+            "room_irrigation": list(self.room_irrigation),
+            "room_reservoir": self.room_reservoir.tobytes(),
+            "room_reservoir_size": self.room_reservoir_size.tobytes(),
+            # PCG64 state has 128-bit ints, which the save format can't hold as numbers
+            "rng": _stringify_ints(self.rng.bit_generator.state),
+        }
+
+    def load_state(self, data: Dict[str, object]) -> None:
+        self.capacity = int(data["capacity"])
+        self.count = int(data["count"])
+        for name in self.COLUMNS:
+            raw = data["columns"].get(name)
+            dtype = np.dtype(data["dtypes"].get(name, getattr(self, name).dtype.str))
+            if raw is None:  # column added after this save was written
+                setattr(self, name, np.zeros(self.capacity, dtype=getattr(self, name).dtype))
+            else:
+                setattr(self, name, np.frombuffer(raw, dtype=dtype).copy())
+        used = np.flatnonzero(self.used)
+        self.end = int(used[-1]) + 1 if used.size else 0
+        self.room_irrigation = list(data["room_irrigation"])
+        self.room_reservoir = np.frombuffer(data["room_reservoir"], dtype=np.float32).copy()
+        self.room_reservoir_size = np.frombuffer(data["room_reservoir_size"], dtype=np.float32).copy()
+        self.room_refill_per_day = np.array([IRRIGATION[k].refill_per_day for k in self.room_irrigation],
+                                            dtype=np.float32)
+        for name in self.DERIVED:
+            setattr(self, name, np.zeros(self.capacity, dtype=getattr(self, name).dtype))
+        self._update_rates()
+        self.rng.bit_generator.state = _parse_ints(data["rng"])
+        self.dirty = False
+
+    def stage_counts(self) -> Dict[str, int]:
+        counts = np.bincount(self.stage[self.alive], minlength=len(STAGES))
+        return dict(zip(STAGES, counts.tolist()))
+
+
+def _stringify_ints(value):
+    if isinstance(value, dict):
+        return {k: _stringify_ints(v) for k, v in value.items()}
+    if isinstance(value, int) and not isinstance(value, bool):
+        return str(value)
+    return value
+
+
+def _parse_ints(value):
+    if isinstance(value, dict):
+        return {k: _parse_ints(v) for k, v in value.items()}
+    if isinstance(value, str) and value.lstrip("-").isdigit():
+        return int(value)
+    return value
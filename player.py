@@ -1 +1,124 @@
-# any player info regarding character build and how it moves through the world goes here
\ No newline at end of file
+# any player info regarding character build and how it moves through the world goes here
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, List, Tuple
+
+from consumables import GENETICS, MEDIUMS, NUTRIENTS
+from skills import SKILL_DEFS, LevelUp, Skill, apply_xp_batch
+
+# Everything below has save_state() / load_state() and a `dirty` flag, so the
+# save system (savegame.py) only rewrites the parts that changed since the last save.
+
+START_MONEY = 500.0
+
+
+class SkillSet:
+    """The player's level + xp in every skill from SKILL_DEFS."""
+
+    def __init__(self):
+        self.skills: Dict[str, Skill] = {key: Skill(defn) for key, defn in SKILL_DEFS.items()}
+        self.dirty = True
+
+    def __getitem__(self, key: str) -> Skill:
+        return self.skills[key]
+
+    def add_xp(self, key: str, amount: int) -> bool:
+        self.dirty = True
+        return self.skills[key].add_xp(amount)
+
+    def add_xp_batch(self, grants: Iterable[Tuple[str, int]], owner: Any = None) -> List[LevelUp]:
+        self.dirty = True
+        return apply_xp_batch((owner, self.skills[key], amount) for key, amount in grants)
+
+    def save_state(self) -> List[Dict]:
+        return [skill.to_dict() for skill in self.skills.values()]
+
+    def load_state(self, data: List[Dict]) -> None:
+        for entry in data:
+            defn = SKILL_DEFS.get(entry.get("key"))
+            if defn is not None:  # skills removed since the save was written are dropped
+                self.skills[defn.key] = Skill.from_dict(defn, entry)
+        self.dirty = False
+
+
+class Inventory:
+    """Counts of consumables on hand, by category and key."""
+
+    CATEGORIES = {"medium": MEDIUMS, "nutrient": NUTRIENTS, "genetics": GENETICS}
+
+    def __init__(self):
+        self.counts: Dict[str, Dict[str, int]] = {category: {} for category in self.CATEGORIES}
+        self.dirty = True
+
+    def count(self, category: str, key: str) -> int:
+        return self.counts[category].get(key, 0)
+
+    def add(self, category: str, key: str, qty: int = 1) -> None:
+        if key not in self.CATEGORIES[category]:
+            raise KeyError(f"unknown {category} {key!r}")
+        items = self.counts[category]
+        items[key] = items.get(key, 0) + qty
+        self.dirty = True
+
+    def remove(self, category: str, key: str, qty: int = 1) -> bool:
+        """Takes qty items out; False (and nothing removed) if there aren't enough."""
+        items = self.counts[category]
+        have = items.get(key, 0)
+        if have < qty:
+            return False
+        if have == qty:
+            del items[key]
+        else:
+            items[key] = have - qty
+        self.dirty = True
+        return True
+
+    def save_state(self) -> Dict[str, Dict[str, int]]:
+        return {category: dict(items) for category, items in self.counts.items()}
+
+    def load_state(self, data: Dict[str, Dict[str, int]]) -> None:
+        for category, items in data.items():
+            known = self.CATEGORIES.get(category)
+            if known is not None:
+                self.counts[category] = {k: int(q) for k, q in items.items() if k in known}
+        self.dirty = False
+
+
+class Player:
+    def __init__(self, name: str = "Player", money: float = START_MONEY):
+        self.name = name
+        self.money = money
+        self.x = 0.0
+        self.y = 0.0
+        self.home = "home"  # Property key the player lives at
+        self.skills = SkillSet()
+        self.inventory = Inventory()
+        self.dirty = True
+
+    def add_money(self, amount: float) -> None:
+        self.money += amount
+        self.dirty = True
+
+    def spend(self, amount: float) -> bool:
+        if amount > self.money:
+            return False
+        self.money -= amount
+        self.dirty = True
+        return True
+
+    def move_to(self, x: float, y: float) -> None:
+        if (x, y) != (self.x, self.y):
+            self.x, self.y = x, y
+            self.dirty = True
+
+    def save_state(self) -> Dict[str, Any]:
+        # skills and inventory are saved as their own sections
+        return {"name": self.name, "money": self.money, "pos": [self.x, self.y], "home": self.home}
+
+    def load_state(self, data: Dict[str, Any]) -> None:
+        self.name = data.get("name", self.name)
+        self.money = float(data.get("money", self.money))
+        self.x, self.y = (float(v) for v in data.get("pos", (self.x, self.y)))
+        self.home = data.get("home", self.home)
+        self.dirty = False
@@ -0,0 +1,273 @@
+# frame profiler: named timing scopes, rolling percentiles, overlay graph and export
+#
+#   import profiler
+#   with profiler.scope("update"):
+#       ...
+#
+# When profiling is off, scope() hands back a shared do-nothing context manager,
+# so leaving the scopes in hot code costs one function call and a flag check.
+
+import csv
+import functools
+import json
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+import pygame
+
+__all__ = ["scope", "profiled", "get_profiler", "handle_debug_key", "draw_overlay", "Profiler"]
+
+DEFAULT_WINDOW = 600   # frames kept for the rolling stats (~10 s at 60 FPS)
+GRAPH_FRAMES = 240     # bars in the overlay graph
+OVERLAY_REFRESH = 15   # re-render the overlay every N frames
+OVERLAY_SIZE = (360, 200)
+OVERLAY_POS = (8, 8)
+
+TOGGLE_KEY = pygame.K_F3   # show/hide overlay (and start/stop collecting)
+EXPORT_KEY = pygame.K_F4   # dump the rolling window to profile_<time>.json
+
+
+class _NullScope:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class _Scope:
+    """
+    One per scope name. Timing state lives in the profiler's stack entries
+    ([scope, start, child_time]), so the same name can be nested or recursive.
+    """
+
+    __slots__ = ("profiler", "name")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.profiler._stack.append([self, time.perf_counter(), 0.0])
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end = time.perf_counter()
+        stack = self.profiler._stack
+        if not stack or stack[-1][0] is not self:
+            return False  # profiling was switched off inside this scope (F3), which dropped the stack
+        _, start, child_time = stack.pop()
+        elapsed = end - start
+        if stack:
+            stack[-1][2] += elapsed
+        # self time, so nested scopes don't get counted twice
+        totals = self.profiler._frame_totals
+        totals[self.name] = totals.get(self.name, 0.0) + elapsed - child_time
+        return False
+
+
+class Profiler:
+    """
+    Collects per-frame time spent in each named scope. Call begin_frame() /
+    end_frame() around each frame of the main loop; anything in between can
+    use scope(name). Keeps the last `window` frames for p50/p95/p99.
+    """
+
+    def __init__(self, window: int = DEFAULT_WINDOW):
+        self.window = window
+        self.enabled = False
+        self.overlay_visible = False
+        self.frames: deque = deque(maxlen=window)   # (frame_ms, {scope: ms})
+        self._scopes: Dict[str, _Scope] = {}
+        self._stack: List[list] = []                # [scope, start, child_time] per open scope
+        self._frame_totals: Dict[str, float] = {}
+        self._frame_start: Optional[float] = None
+        self._frame_count = 0
+
+        self._overlay: Optional[pygame.Surface] = None
+        self._overlay_frame = 0
+        self._font: Optional[pygame.font.Font] = None
+
+    # --- collection ---
+
+    def scope(self, name: str):
+        if not self.enabled:
+            return _NULL_SCOPE
+        s = self._scopes.get(name)
+        if s is None:
+            s = self._scopes[name] = _Scope(self, name)
+        return s
+
+    def begin_frame(self) -> None:
+        if not self.enabled:
+            return
+        self._frame_totals = {}
+        self._frame_start = time.perf_counter()
+
+    def end_frame(self) -> None:
+        if not self.enabled or self._frame_start is None:
+            return
+        frame_ms = (time.perf_counter() - self._frame_start) * 1000.0
+        self.frames.append((frame_ms, {k: v * 1000.0 for k, v in self._frame_totals.items()}))
+        self._frame_start = None
+        self._frame_count += 1
+
+    def set_enabled(self, enabled: bool) -> None:
+        self.enabled = enabled
+        if not enabled:
+            self._stack.clear()
+            self._frame_start = None
+
+    def toggle_overlay(self) -> None:
+        """Overlay on = profiling on; hiding it also stops collecting."""
+        self.overlay_visible = not self.overlay_visible
+        self.set_enabled(self.overlay_visible)
+        self._overlay = None
+
+    # --- stats ---
+
+    def scope_names(self) -> List[str]:
+        names = []
+        for _, scopes in self.frames:
+            for name in scopes:
+                if name not in names:
+                    names.append(name)
+        return names
+
+    def samples(self, name: str = "frame") -> List[float]:
+        if name == "frame":
+            return [frame_ms for frame_ms, _ in self.frames]
+        return [scopes.get(name, 0.0) for _, scopes in self.frames]
+
+    def percentiles(self, name: str = "frame") -> Dict[str, float]:
+        values = sorted(self.samples(name))
+        if not values:
+            return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+        last = len(values) - 1
+        return {
+            "p50": values[int(last * 0.50)],
+            "p95": values[int(last * 0.95)],
+            "p99": values[int(last * 0.99)],
+            "max": values[-1],
+        }
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        return {name: self.percentiles(name) for name in ["frame"] + self.scope_names()}
+
+    # --- export ---
+
+    def export(self, path: str) -> None:
+        """Writes the rolling window to `path`: CSV (one row per frame) if it ends in .csv, else JSON."""
+        names = self.scope_names()
+        if path.endswith(".csv"):
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["frame_ms"] + names)
+                for frame_ms, scopes in self.frames:
+                    writer.writerow([round(frame_ms, 4)] + [round(scopes.get(n, 0.0), 4) for n in names])
+        else:
+            with open(path, "w") as f:
+                json.dump({
+                    "summary": self.summary(),
+                    "frames": [{"frame_ms": frame_ms, **scopes} for frame_ms, scopes in self.frames],
+                }, f)
+
+    # --- overlay ---
+
+    def overlay_surface(self) -> Optional[pygame.Surface]:
+        """
+        Graph of recent frame times + scope percentiles. The surface is only
+        re-rendered every OVERLAY_REFRESH frames, and otherwise the same object is
+        returned (so the dirty renderer doesn't repaint it every frame).
+        """
+        if not self.overlay_visible:
+            return None
+        if self._overlay is None or self._frame_count - self._overlay_frame >= OVERLAY_REFRESH:
+            self._overlay = self._render_overlay()
+            self._overlay_frame = self._frame_count
+        return self._overlay
+
+    def _render_overlay(self) -> pygame.Surface:
+        if self._font is None:
+            self._font = pygame.font.Font(None, 18)
+        width, height = OVERLAY_SIZE
+        surface = pygame.Surface(OVERLAY_SIZE)
+        surface.fill((15, 15, 20))
+
+        # frame time graph, 16.7 ms and 33.3 ms guide lines
+        graph_h = 80
+        scale = graph_h / 40.0  # 40 ms fills the graph
+        for ms, color in ((1000 / 60, (60, 120, 60)), (1000 / 30, (120, 60, 60))):
+            y = graph_h - int(ms * scale)
+            pygame.draw.line(surface, color, (0, y), (width, y))
+        recent = self.samples()[-GRAPH_FRAMES:]
+        bar_w = width / GRAPH_FRAMES
+        for i, ms in enumerate(recent):
+            h = min(graph_h, int(ms * scale))
+            color = (90, 200, 90) if ms <= 1000 / 60 else (230, 180, 60) if ms <= 1000 / 30 else (230, 70, 70)
+            pygame.draw.rect(surface, color, (int(i * bar_w), graph_h - h, max(1, int(bar_w)), h))
+
+        y = graph_h + 6
+        for name, stats in self.summary().items():
+            line = f"{name:<10} p50 {stats['p50']:6.2f}  p95 {stats['p95']:6.2f}  p99 {stats['p99']:6.2f} ms"
+            surface.blit(self._font.render(line, True, (220, 220, 220)), (6, y))
+            y += 16
+            if y > height - 14:
+                break
+        return surface
+
+
+_profiler = Profiler()
+
+
+def get_profiler() -> Profiler:
+    return _profiler
+
+
+def scope(name: str):
+    if not _profiler.enabled:
+        return _NULL_SCOPE
+    return _profiler.scope(name)
+
+
+def profiled(name: Optional[str] = None):
+    """Decorator version of scope(), named after the function by default."""
+    def wrap(fn):
+        scope_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _profiler.enabled:
+                return fn(*args, **kwargs)
+            with _profiler.scope(scope_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return wrap
+
+
+def handle_debug_key(event) -> bool:
+    """Profiler hotkeys for any loop's event handling. Returns True if the event was used."""
+    if event.type != pygame.KEYDOWN:
+        return False
+    if event.key == TOGGLE_KEY:
+        _profiler.toggle_overlay()
+        return True
+    if event.key == EXPORT_KEY and _profiler.frames:
+        path = time.strftime("profile_%Y%m%d_%H%M%S.json")
+        _profiler.export(path)
+        print(f"profile written to {path}")
+        return True
+    return False
+
+
+def draw_overlay(renderer) -> None:
+    """Adds the overlay to a DirtyRenderer frame (no-op while hidden)."""
+    surface = _profiler.overlay_surface()
+    if surface is not None:
+        renderer.blit("profiler_overlay", surface, OVERLAY_POS)
@@ -1 +1,80 @@
-#Living arrangements, dispos, cult sites, 
\ No newline at end of file
+#Living arrangements, dispos, cult sites,
+# properties the player can own or rent, and the grow rooms inside them
+
+from __future__ import annotations
+
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional
+
+from equipment import IRRIGATION
+
+
+@dataclass
+class GrowRoom:
+    key: str
+    irrigation: str = "pitcher"     # key into equipment.IRRIGATION
+    max_plants: int = 4
+    sim_room: Optional[int] = None  # room id in the plantsim.PlantSim holding this room's plants
+
+
+@dataclass
+class Property:
+    key: str
+    name: str
+    kind: str                        # "home", "apartment", "dispo", "cult_site", ...
+    building: Optional[str] = None   # buildings.Building key it occupies on the map
+    rent_per_day: float = 0.0
+    owned: bool = False
+    rooms: List[GrowRoom] = field(default_factory=list)
+
+
+class Properties:
+    """Every property the player has, keyed by Property.key."""
+
+    def __init__(self):
+        self.items: Dict[str, Property] = {}
+        self.dirty = True
+
+    def __getitem__(self, key: str) -> Property:
+        return self.items[key]
+
+    def __iter__(self):
+        return iter(self.items.values())
+
+    def add(self, prop: Property) -> Property:
+        self.items[prop.key] = prop
+        self.dirty = True
+        return prop
+
+    def remove(self, key: str) -> None:
+        if self.items.pop(key, None) is not None:
+            self.dirty = True
+
+    def add_room(self, key: str, room: GrowRoom, plants=None) -> GrowRoom:
+        """Adds a grow room to a property; with a PlantSim, also gives it a room there."""
+        if room.irrigation not in IRRIGATION:
+            raise KeyError(f"unknown irrigation {room.irrigation!r}")
+        if plants is not None and room.sim_room is None:
+            room.sim_room = plants.add_room(room.irrigation)
+        self.items[key].rooms.append(room)
+        self.dirty = True
+        return room
+
+    def save_state(self) -> List[Dict[str, Any]]:
+        return [asdict(prop) for prop in self.items.values()]
+
+    def load_state(self, data: List[Dict[str, Any]]) -> None:
+        self.items = {}
+        for entry in data:
+            entry = dict(entry)
+            rooms = [GrowRoom(**room) for room in entry.pop("rooms", [])]
+            prop = Property(**entry, rooms=rooms)
+            self.items[prop.key] = prop
+        self.dirty = False
+
+
+def starter_properties() -> Properties:
+    props = Properties()
+    props.add(Property("home", "Home", "home", building="home", owned=True,
+                       rooms=[GrowRoom("starter_tent", "pitcher", max_plants=4)]))
+    return props
@@ -0,0 +1,183 @@
+# dirty-rectangle rendering: only repaint the parts of the screen that changed
+
+from typing import Dict, Hashable, List, Optional
+
+import pygame
+
+import profiler
+
+FULL_REDRAW_RATIO = 0.5  # if more than this fraction of the screen is dirty, just flip everything
+MAX_DIRTY_RECTS = 256    # past this many dirty rects merging them costs more than a full redraw
+
+
+class _Drawn:
+    __slots__ = ("rect", "color", "surface", "width")
+
+    def __init__(self, rect: pygame.Rect, color=None, surface: Optional[pygame.Surface] = None,
+                 width: int = 0):
+        self.rect = rect
+        self.color = color
+        self.surface = surface
+        self.width = width
+
+    def same_as(self, other: "_Drawn") -> bool:
+        return (self.rect == other.rect and self.color == other.color and self.surface is other.surface
+                and self.width == other.width)
+
+    def paint(self, screen: pygame.Surface) -> None:
+        if self.surface is not None:
+            screen.blit(self.surface, self.rect)
+        else:
+            pygame.draw.rect(screen, self.color, self.rect, self.width)
+
+
+class DirtyRenderer:
+    """
+    Retained-mode layer over the screen. Each frame, call draw_rect()/blit() for
+    everything on screen (in back-to-front order) with a stable key per object,
+    then present(). Only regions where an object appeared, moved, changed or
+    disappeared get the background restored and the objects repainted, and only
+    those regions are pushed with pygame.display.update(rects). When most of the
+    screen is dirty it falls back to a full redraw + flip.
+
+    `background` is a screen-sized Surface, a plain fill color, or a callable
+    painter(screen, region) for backgrounds that aren't a single image (the
+    scrolling world map).
+
+    Sprite layers (sprites.SpriteGroup / SpriteBatch) added with add_layer()
+    track their own changes and are painted between the background and the
+    keyed objects, lowest `layer` first, so the HUD and UI stay on top.
+    """
+
+    def __init__(self, screen: pygame.Surface, background=(0, 0, 0),
+                 full_redraw_ratio: float = FULL_REDRAW_RATIO):
+        self.screen = screen
+        self.background = background
+        self.full_redraw_ratio = full_redraw_ratio
+        self._previous: Dict[Hashable, _Drawn] = {}
+        self._current: Dict[Hashable, _Drawn] = {}
+        self._dirty: List[pygame.Rect] = []
+        self._full = True  # nothing is on screen yet
+        self.layers: List = []
+
+        # stats for the last present(), handy for profiling
+        self.last_dirty_rects = 0
+        self.last_full_redraw = False
+
+    def set_background(self, background) -> None:
+        self.background = background
+        self.invalidate()
+
+    def invalidate(self, rect: Optional[pygame.Rect] = None) -> None:
+        """Force a region (or the whole screen) to be repainted on the next present()."""
+        if rect is None:
+            self._full = True
+        else:
+            self._dirty.append(pygame.Rect(rect))
+
+    def add_layer(self, layer) -> None:
+        self.layers.append(layer)
+        self.layers.sort(key=lambda l: l.layer)
+        self._full = True
+
+    def remove_layer(self, layer) -> None:
+        self.layers.remove(layer)
+        self._full = True
+
+    def draw_rect(self, key: Hashable, color, rect: pygame.Rect, width: int = 0) -> None:
+        """width > 0 draws just the outline, like pygame.draw.rect."""
+        self._current[key] = _Drawn(pygame.Rect(rect), color=tuple(color), width=width)
+
+    def blit(self, key: Hashable, surface: pygame.Surface, pos) -> None:
+        """Surfaces are compared by identity, so re-rendered content should be a new Surface."""
+        self._current[key] = _Drawn(surface.get_rect(topleft=pos), surface=surface)
+
+    def present(self) -> None:
+        current, previous = self._current, self._previous
+
+        if not self._full:
+            for key, drawn in current.items():
+                old = previous.get(key)
+                if old is None:
+                    self._dirty.append(drawn.rect)
+                elif not drawn.same_as(old):
+                    self._dirty.append(old.rect)
+                    self._dirty.append(drawn.rect)
+            for key, old in previous.items():
+                if key not in current:
+                    self._dirty.append(old.rect)
+
+        screen_rect = self.screen.get_rect()
+        for layer in self.layers:
+            self._dirty.extend(layer.collect(screen_rect, self._full))
+        if len(self._dirty) > MAX_DIRTY_RECTS:
+            self._full = True
+        dirty = [] if self._full else _merge_rects([r.clip(screen_rect) for r in self._dirty
+                                                    if r.colliderect(screen_rect)])
+        dirty_area = sum(r.w * r.h for r in dirty)
+        if self._full or dirty_area > self.full_redraw_ratio * screen_rect.w * screen_rect.h:
+            self._redraw_full()
+        elif dirty:
+            self._redraw_regions(dirty)
+            with profiler.scope("flip"):
+                pygame.display.update(dirty)
+        else:
+            self.last_full_redraw = False
+            self.last_dirty_rects = 0
+
+        self._previous = current
+        self._current = {}
+        self._dirty = []
+        self._full = False
+
+    def _restore(self, region: pygame.Rect) -> None:
+        if callable(self.background):
+            self.background(self.screen, region)
+        elif isinstance(self.background, pygame.Surface):
+            self.screen.blit(self.background, region, region)
+        else:
+            self.screen.fill(self.background, region)
+
+    def _redraw_full(self) -> None:
+        self._restore(self.screen.get_rect())
+        for layer in self.layers:
+            layer.paint(self.screen)
+        for drawn in self._current.values():
+            drawn.paint(self.screen)
+        with profiler.scope("flip"):
+            pygame.display.flip()
+        self.last_full_redraw = True
+        self.last_dirty_rects = 1
+
+    def _redraw_regions(self, dirty: List[pygame.Rect]) -> None:
+        for region in dirty:
+            self._restore(region)
+            self.screen.set_clip(region)
+            for layer in self.layers:
+                layer.paint(self.screen, region)
+            for drawn in self._current.values():
+                if drawn.rect.colliderect(region):
+                    drawn.paint(self.screen)
+            self.screen.set_clip(None)
+        self.last_full_redraw = False
+        self.last_dirty_rects = len(dirty)
+
+
+def _merge_rects(rects: List[pygame.Rect]) -> List[pygame.Rect]:
+    """Union overlapping/touching rects so we don't repaint the same pixels twice."""
+    merged: List[pygame.Rect] = []
+    for rect in rects:
+        if rect.w <= 0 or rect.h <= 0:
+            continue
+        rect = pygame.Rect(rect)
+        changed = True
+        while changed:
+            changed = False
+            for i, other in enumerate(merged):
+                if rect.inflate(2, 2).colliderect(other):
+                    rect.union_ip(merged.pop(i))
+                    changed = True
+                    break
+        merged.append(rect)
+    return merged
+
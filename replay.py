@@ -0,0 +1,301 @@
+# input recordings: a compact log of what the player pressed on which tick, and a replayer for it
+#
+# A recording is a stream of binfmt records:
+#   header      seed, view size, what the session had (npcs, economy), checkpoint interval
+#   inputs      input changes since the previous inputs record, as (varint ticks since the
+#               last change, input bitmask) pairs; held input costs nothing
+#   checkpoint  every `checkpoint_every` ticks: a zlib'd Simulation.snapshot() + its hash
+#   end         last tick + final state hash
+#
+# The crowd/market RNGs are reseeded from (session seed, tick) every crowd tick
+# (see game_play.Simulation), so the session seed in the header is all the RNG
+# state a replay needs. Replays run headless with no frame pacing, can start
+# from any checkpoint, and compare their state hash with the recorded one at
+# every checkpoint they pass to find where a run diverged.
+
+import bisect
+import hashlib
+import os
+import tempfile
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import binfmt
+
+FORMAT_VERSION = 1
+CHECKPOINT_EVERY = 120 * 30   # ticks (30 s of game time)
+INPUT_BITS = ("left", "right", "up", "down")
+
+
+def input_mask(inp) -> int:
+    """FrameInput -> bitmask of the held movement keys (quit/back end a session, they aren't replayed)."""
+    return sum(1 << i for i, name in enumerate(INPUT_BITS) if getattr(inp, name))
+
+
+def mask_input(mask: int):
+    from game_play import FrameInput
+
+    return FrameInput(**{name: bool(mask >> i & 1) for i, name in enumerate(INPUT_BITS)})
+
+
+def _put_varint(out: bytearray, n: int) -> None:
+    while n >= 0x80:
+        out.append(n & 0x7F | 0x80)
+        n >>= 7
+    out.append(n)
+
+
+def _read_changes(data: bytes, tick: int, ticks: List[int], masks: List[int]) -> int:
+    pos = 0
+    while pos < len(data):
+        n = shift = 0
+        while True:
+            byte = data[pos]
+            pos += 1
+            n |= (byte & 0x7F) << shift
+            shift += 7
+            if byte < 0x80:
+                break
+        tick += n
+        ticks.append(tick)
+        masks.append(data[pos])
+        pos += 1
+    return tick
+
+
+def _digest(packed: bytes) -> str:
+    return hashlib.blake2b(packed, digest_size=8).hexdigest()
+
+
+class Recorder:
+    """
+    Records a game_play.Simulation: call step(inp) instead of sim.step(inp).
+    `info` goes into the header and tells the replayer how to rebuild the
+    session (npcs per archetype, economy on/off, ...).
+    """
+
+    def __init__(self, path: str, sim, info: Optional[Dict[str, Any]] = None,
+                 checkpoint_every: int = CHECKPOINT_EVERY):
+        self.path = path
+        self.sim = sim
+        self.checkpoint_every = checkpoint_every
+        self._file = open(path, "wb")
+        self._changes = bytearray()
+        self._last_change = sim.tick
+        self._mask = 0
+        self.checkpoints = 0
+        self._write({"kind": "header", "version": FORMAT_VERSION, "seed": sim.seed, "start_tick": sim.tick,
+                     "dt": sim.dt, "view_size": list(sim.view_size), "checkpoint_every": checkpoint_every,
+                     "created": time.time(), **(info or {})})
+        self._checkpoint()
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self._file.write(binfmt.packb(record))
+
+    def step(self, inp) -> None:
+        sim = self.sim
+        mask = input_mask(inp)
+        if mask != self._mask:
+            _put_varint(self._changes, sim.tick - self._last_change)
+            self._changes.append(mask)
+            self._last_change, self._mask = sim.tick, mask
+        sim.step(inp)
+        if sim.tick % self.checkpoint_every == 0:
+            self._checkpoint()
+
+    def _flush_inputs(self) -> None:
+        if self._changes:
+            self._write({"kind": "inputs", "changes": bytes(self._changes)})
+            self._changes = bytearray()
+
+    def _checkpoint(self) -> None:
+        self._flush_inputs()
+        packed = binfmt.packb(self.sim.snapshot())
+        self._write({"kind": "checkpoint", "tick": self.sim.tick, "hash": _digest(packed),
+                     "state": zlib.compress(packed, 6)})
+        self._file.flush()
+        self.checkpoints += 1
+
+    def flush(self) -> None:
+        self._flush_inputs()
+        self._file.flush()
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._flush_inputs()
+        self._write({"kind": "end", "tick": self.sim.tick, "hash": self.sim.state_hash()})
+        self._file.close()
+
+
+@dataclass
+class Desync:
+    tick: int
+    expected: str
+    actual: str
+
+
+@dataclass
+class ReplayResult:
+    start_tick: int
+    end_tick: int
+    wall_seconds: float
+    checked: int                                  # checkpoints compared
+    desyncs: List[Desync] = field(default_factory=list)
+
+    @property
+    def ticks(self) -> int:
+        return self.end_tick - self.start_tick
+
+    @property
+    def ticks_per_second(self) -> float:
+        return self.ticks / self.wall_seconds if self.wall_seconds > 0 else float("inf")
+
+    @property
+    def ok(self) -> bool:
+        return not self.desyncs
+
+
+class Replay:
+    """
+    A loaded recording. poll(tick) makes it an input source like
+    game_play.ScriptedInput; run() drives a rebuilt Simulation through it.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.header: Dict[str, Any] = {}
+        self.change_ticks: List[int] = []
+        self.change_masks: List[int] = []
+        self.checkpoints: Dict[int, Tuple[str, bytes]] = {}  # tick -> (hash, compressed state)
+        self.end_tick: Optional[int] = None
+        self.end_hash: Optional[str] = None
+
+        last = 0
+        with open(path, "rb") as f:
+            for record in binfmt.iter_unpack(f):
+                kind = record.get("kind")
+                if kind == "header":
+                    if record["version"] > FORMAT_VERSION:
+                        raise binfmt.FormatError(
+                            f"replay format {record['version']} is newer than this build")
+                    self.header = record
+                    last = record["start_tick"]
+                elif kind == "inputs":
+                    last = _read_changes(record["changes"], last, self.change_ticks, self.change_masks)
+                elif kind == "checkpoint":
+                    self.checkpoints[record["tick"]] = (record["hash"], record["state"])
+                elif kind == "end":
+                    self.end_tick, self.end_hash = record["tick"], record["hash"]
+        if not self.header:
+            raise binfmt.FormatError(f"{path} has no replay header")
+        self._checkpoint_ticks = sorted(self.checkpoints)
+        if self.end_tick is None:  # recording was cut short (crash): replay up to the last checkpoint
+            self.end_tick = self._checkpoint_ticks[-1]
+        self._inputs: Dict[int, Any] = {}
+
+    @property
+    def start_tick(self) -> int:
+        return self.header["start_tick"]
+
+    def poll(self, tick: int):
+        i = bisect.bisect_right(self.change_ticks, tick) - 1
+        mask = self.change_masks[i] if i >= 0 else 0
+        inp = self._inputs.get(mask)
+        if inp is None:
+            inp = self._inputs[mask] = mask_input(mask)
+        return inp
+
+    def state_at(self, tick: int) -> Dict[str, Any]:
+        """The recorded Simulation.snapshot() of a checkpoint tick."""
+        return binfmt.unpackb(zlib.decompress(self.checkpoints[tick][1]))
+
+    # --- running ---
+
+    def build(self):
+        """A fresh Simulation set up like the recorded session, at the first checkpoint."""
+        sim = build_simulation(self.header)
+        sim.restore(self.state_at(self._checkpoint_ticks[0]))
+        return sim
+
+    def seek(self, sim, tick: int) -> None:
+        """Restores the last checkpoint at or before `tick` and fast-forwards from there."""
+        tick = max(self.start_tick, min(tick, self.end_tick))
+        i = bisect.bisect_right(self._checkpoint_ticks, tick) - 1
+        sim.restore(self.state_at(self._checkpoint_ticks[i]))
+        while sim.tick < tick:
+            sim.step(self.poll(sim.tick))
+
+    def run(self, sim=None, until: Optional[int] = None, verify: bool = True,
+            on_tick: Optional[Callable[[Any], None]] = None) -> ReplayResult:
+        """
+        Replays from wherever `sim` is (a fresh build() if None) up to `until`
+        (default: the end), as fast as it goes. With verify, the state hash is
+        compared at every checkpoint; after a mismatch the recorded state is
+        restored so later checkpoints are still checked on their own.
+        """
+        if sim is None:
+            sim = self.build()
+        until = self.end_tick if until is None else min(until, self.end_tick)
+        result = ReplayResult(sim.tick, sim.tick, 0.0, 0)
+        checkpoints = self.checkpoints
+        start = time.perf_counter()
+        while sim.tick < until:
+            sim.step(self.poll(sim.tick))
+            if on_tick is not None:
+                on_tick(sim)
+            if verify and sim.tick in checkpoints:
+                expected = checkpoints[sim.tick][0]
+                actual = sim.state_hash()
+                result.checked += 1
+                if actual != expected:
+                    result.desyncs.append(Desync(sim.tick, expected, actual))
+                    sim.restore(self.state_at(sim.tick))
+        if verify and sim.tick == self.end_tick and self.end_hash is not None and sim.tick not in checkpoints:
+            actual = sim.state_hash()
+            result.checked += 1
+            if actual != self.end_hash:
+                result.desyncs.append(Desync(sim.tick, self.end_hash, actual))
+        result.end_tick = sim.tick
+        result.wall_seconds = time.perf_counter() - start
+        return result
+
+
+def build_simulation(header: Dict[str, Any]):
+    """Rebuilds the world a recording was made in (no window: SDL's dummy driver)."""
+    import pygame
+
+    from game_play import (PlayerMotion, Simulation, build_home_collision, build_home_crowd, build_home_world,
+                           home_center)
+    from pathfinding import PathService
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    view_size = tuple(header["view_size"])
+    if pygame.display.get_surface() is None:
+        pygame.display.set_mode(view_size)
+
+    world = build_home_world()
+    collision = build_home_collision(world)
+    npcs = header.get("npcs", 0)
+    paths = PathService(world, collision) if npcs else None
+    crowd = build_home_crowd(world, collision, header["seed"], npcs, paths) if npcs else None
+    if paths is not None:
+        paths.finish()
+    player = PlayerMotion(home_center(), collision=collision)
+
+    market = progression = None
+    sections: Dict[str, Any] = {}
+    if header.get("economy"):
+        from savegame import GameState
+
+        state = GameState(tempfile.mkdtemp(prefix="replay_"))
+        progression = state.progression  # also sets up the plants section
+        market = state.market
+        if crowd is not None:
+            market.attach(crowd)
+        sections = state.saves.sections
+    return Simulation(player, crowd, paths, view_size, header["seed"], market, progression,
+                      sections, header["dt"])
@@ -0,0 +1,331 @@
+# save games: versioned binary sections, incremental background saves, lazy loading
+#
+# A save is a directory:
+#   save.idx                 manifest: schema version + which generation of each section is current
+#   <section>.<gen>.sav      one file per section (player, skills, inventory, properties, plants, ...)
+#
+# Every file is HEADER (magic, schema version, flags, crc32, payload length) + a
+# binfmt payload, zlib-compressed when it's big. Saving only rewrites sections
+# whose object is dirty, into a new generation file, and then swaps the
+# manifest, so a crash mid-save leaves the previous save intact.
+
+import atexit
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional
+
+import binfmt
+
+__all__ = ["SaveError", "SaveManager", "GameState", "SCHEMA_VERSION", "read_section_file"]
+
+SCHEMA_VERSION = 1
+MAGIC = b"CQSV"
+HEADER = struct.Struct("<4sHBII")   # magic, schema version, flags, crc32 of payload, payload length
+FLAG_ZLIB = 1
+COMPRESS_OVER = 4096                # bytes; smaller payloads aren't worth compressing
+MANIFEST = "save.idx"
+
+# MIGRATIONS[v] upgrades one section's data from schema v to v + 1: fn(section_name, data) -> data
+MIGRATIONS: Dict[int, Callable[[str, Any], Any]] = {}
+
+
+class SaveError(Exception):
+    pass
+
+
+def _encode(data: Any) -> bytes:
+    payload = binfmt.packb(data)
+    flags = 0
+    if len(payload) > COMPRESS_OVER:
+        payload = zlib.compress(payload, 1)  # fast level: saves are about hitch-free, not size
+        flags |= FLAG_ZLIB
+    return HEADER.pack(MAGIC, SCHEMA_VERSION, flags, zlib.crc32(payload), len(payload)) + payload
+
+
+def _decode(raw: bytes, path: str):
+    if len(raw) < HEADER.size:
+        raise SaveError(f"{path}: truncated header")
+    magic, version, flags, crc, length = HEADER.unpack_from(raw)
+    if magic != MAGIC:
+        raise SaveError(f"{path}: not a save file")
+    if version > SCHEMA_VERSION:
+        raise SaveError(f"{path}: written by a newer version of the game "
+                        f"(schema {version} > {SCHEMA_VERSION})")
+    payload = raw[HEADER.size:HEADER.size + length]
+    if len(payload) != length or zlib.crc32(payload) != crc:
+        raise SaveError(f"{path}: corrupted (bad length or checksum)")
+    if flags & FLAG_ZLIB:
+        payload = zlib.decompress(payload)
+    return version, binfmt.unpackb(payload)
+
+
+def read_section_file(path: str):
+    """(schema version, data) of a single section or manifest file."""
+    with open(path, "rb") as f:
+        return _decode(f.read(), path)
+
+
+def _write_atomic(path: str, raw: bytes) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(raw)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+class SaveManager:
+    """
+    Saves registered objects into a save directory. Each section is an object
+    with save_state() -> plain data, load_state(data) and a `dirty` flag (see
+    player.Player, property.Properties, plantsim.PlantSim).
+
+    save() snapshots the dirty sections on the calling thread (save_state()
+    should be a cheap copy) and hands encoding + disk writes to a background
+    thread, so autosaves don't stall a frame. If a save is still being written
+    when the next one is requested, the two are merged.
+
+    Loading is lazy: open() only reads the manifest, and a section is read and
+    decoded the first time it's asked for (load() / restore()).
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.sections: Dict[str, Any] = {}
+        self.manifest: Dict[str, Any] = {"version": SCHEMA_VERSION, "saved_at": 0.0, "sections": {}}
+        self._loaded: Dict[str, Any] = {}
+
+        # guards _pending, and manifest/_loaded, which the writer thread replaces while load() reads them
+        self._lock = threading.Lock()
+        self._pending: Dict[str, Any] = {}   # section -> snapshot waiting for the writer
+        self._wake = threading.Event()
+        self._idle = threading.Event()
+        self._idle.set()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self.last_error: Optional[BaseException] = None
+
+        # stats
+        self.saves = 0
+        self.last_snapshot_ms = 0.0
+        self.last_write_ms = 0.0
+        self.last_written: List[str] = []
+
+        path = os.path.join(directory, MANIFEST)
+        if os.path.exists(path):
+            version, manifest = read_section_file(path)
+            manifest["version"] = version
+            self.manifest = manifest
+
+    # --- registration ---
+
+    def register(self, name: str, obj: Any) -> None:
+        self.sections[name] = obj
+
+    def has_section(self, name: str) -> bool:
+        return name in self.manifest["sections"]
+
+    # --- loading ---
+
+    def load(self, name: str) -> Any:
+        """Data of one section from disk (decoded once, then cached), or None if it was never saved."""
+        # under the lock: a background save can't swap the manifest (and delete the
+        # file this entry points at) or drop the cache entry halfway through
+        with self._lock:
+            if name in self._loaded:
+                return self._loaded[name]
+            entry = self.manifest["sections"].get(name)
+            if entry is None:
+                return None
+            version, data = read_section_file(self._section_path(name, entry["gen"]))
+            while version < SCHEMA_VERSION:
+                migrate = MIGRATIONS.get(version)
+                if migrate is None:
+                    raise SaveError(f"no migration for section {name!r} from schema {version}")
+                data = migrate(name, data)
+                version += 1
+            self._loaded[name] = data
+        return data
+
+    def restore(self, name: str) -> bool:
+        """load_state() the registered object from its saved section. False if there's nothing saved."""
+        data = self.load(name)
+        if data is None:
+            return False
+        self.sections[name].load_state(data)
+        with self._lock:
+            self._loaded.pop(name, None)  # the object owns the data now
+        return True
+
+    # --- saving ---
+
+    def save(self, full: bool = False, background: bool = True) -> List[str]:
+        """
+        Saves every dirty section (all of them with full=True) and returns their
+        names. With background=False the files are written before returning.
+        """
+        start = time.perf_counter()
+        snapshot = {}
+        for name, obj in self.sections.items():
+            if full or getattr(obj, "dirty", True) or not self.has_section(name):
+                snapshot[name] = obj.save_state()
+                obj.dirty = False
+        self.last_snapshot_ms = (time.perf_counter() - start) * 1000.0
+        if not snapshot:
+            return []
+
+        if not background:
+            self.wait()
+            self._write(snapshot)
+            return list(snapshot)
+
+        with self._lock:
+            self._pending.update(snapshot)
+            self._idle.clear()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="savegame", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+        self._wake.set()
+        return list(snapshot)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Blocks until background writes are done. False on timeout."""
+        return self._idle.wait(timeout)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10.0)
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            with self._lock:
+                snapshot, self._pending = self._pending, {}
+            if snapshot:
+                try:
+                    self._write(snapshot)
+                except Exception as e:  # keep the game running; the caller can check last_error
+                    self.last_error = e
+                    with self._lock:
+                        for name, data in snapshot.items():
+                            self._pending.setdefault(name, data)  # retry with the next save
+            with self._lock:
+                if not self._pending:
+                    self._idle.set()
+            if self._closed and self._idle.is_set():
+                return
+
+    def _write(self, snapshot: Dict[str, Any]) -> None:
+        start = time.perf_counter()
+        os.makedirs(self.directory, exist_ok=True)
+        sections = dict(self.manifest["sections"])
+        old_files = []
+        for name, data in snapshot.items():
+            old = sections.get(name)
+            gen = old["gen"] + 1 if old else 1
+            raw = _encode(data)
+            _write_atomic(self._section_path(name, gen), raw)
+            sections[name] = {"gen": gen, "bytes": len(raw)}
+            if old:
+                old_files.append(self._section_path(name, old["gen"]))
+
+        manifest = {"version": SCHEMA_VERSION, "saved_at": time.time(), "sections": sections}
+        _write_atomic(os.path.join(self.directory, MANIFEST), _encode(manifest))
+        with self._lock:
+            self.manifest = manifest
+            for name in snapshot:
+                self._loaded.pop(name, None)
+        for path in old_files:  # only once the new manifest no longer points at them
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+        self.saves += 1
+        self.last_written = list(snapshot)
+        self.last_write_ms = (time.perf_counter() - start) * 1000.0
+
+    def _section_path(self, name: str, gen: int) -> str:
+        return os.path.join(self.directory, f"{name}.{gen}.sav")
+
+
+# --- the game's sections ---
+
+class GameState:
+    """
+    Everything that goes in a save slot. The small sections are restored right
+    away; the plant sim (the big one late in the game) only when first used.
+    """
+
+    def __init__(self, directory: str):
+        from market import Market
+        from player import Player
+        from property import starter_properties
+
+        self.saves = SaveManager(directory)
+        self.player = Player()
+        self.properties = starter_properties()
+        self.market = Market(self.player)
+        self._plants = None
+        self._progression = None
+
+        saves = self.saves
+        saves.register("player", self.player)
+        saves.register("skills", self.player.skills)
+        saves.register("inventory", self.player.inventory)
+        saves.register("properties", self.properties)
+        saves.register("market", self.market)
+        for name in ("player", "skills", "inventory", "properties", "market"):
+            saves.restore(name)
+
+    @property
+    def is_new(self) -> bool:
+        return not self.saves.manifest["sections"]
+
+    @property
+    def plants(self):
+        if self._plants is None:
+            from plantsim import PlantSim
+
+            self._plants = PlantSim()
+            self.saves.register("plants", self._plants)
+            if not self.saves.restore("plants"):
+                # new game: give every grow room its room in the sim
+                for prop in self.properties:
+                    for room in prop.rooms:
+                        room.sim_room = self._plants.add_room(room.irrigation)
+                self.properties.dirty = True
+        return self._plants
+
+    @property
+    def progression(self):
+        if self._progression is None:
+            from catchup import Progression
+
+            self._progression = Progression(self.plants, self.player.skills)
+        return self._progression
+
+    def catch_up(self, now: Optional[float] = None):
+        """Plays out the time since the last save (see catchup.py). None for a new game."""
+        if self.is_new:
+            return None
+        from catchup import game_days
+
+        now = time.time() if now is None else now
+        away = max(0.0, now - self.saves.manifest.get("saved_at", now))
+        return self.progression.catch_up(game_days(away))
+
+    def save(self, full: bool = False, background: bool = True) -> List[str]:
+        return self.saves.save(full=full, background=background)
+
+    def close(self) -> None:
+        self.saves.close()
@@ -0,0 +1,175 @@
+# scene manager: menu / game / options are objects that are built once and then suspended and resumed
+#
+# A scene returns the name of the next scene from frame() (or None to stay).
+# Switching suspends the current scene and resumes the next one; nothing gets
+# rebuilt. Scenes can be preloaded on a background thread, so the game is
+# usually ready by the time START is clicked. Scenes with nothing to animate
+# set `idle`, and the manager sleeps in pygame.event.wait() instead of spinning.
+
+import importlib
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+import pygame
+
+QUIT = "QUIT"
+IDLE_WAIT_MS = 1000  # idle scenes still get a frame this often
+
+
+class Scene:
+    """
+    Base class. load() does the heavy one-time setup and may run on a
+    background thread (build data and off-screen surfaces there, no display
+    calls). resume()/suspend() run on the main thread every time the scene
+    becomes active / inactive. close() runs once when the game exits.
+    """
+
+    fps = 60
+
+    def __init__(self, manager: "SceneManager"):
+        self.manager = manager
+        self.screen = manager.screen
+
+    @property
+    def idle(self) -> bool:
+        """True when the scene looks the same until the next event."""
+        return False
+
+    def load(self) -> None:
+        pass
+
+    def resume(self) -> None:
+        pass
+
+    def suspend(self) -> None:
+        pass
+
+    def frame(self, events: List[pygame.event.Event], frame_dt: float) -> Optional[str]:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+def lazy_scene(module: str, name: str) -> Callable[["SceneManager"], Scene]:
+    """Factory that imports `module` on first use, so scenes nobody opens cost nothing at startup."""
+    def factory(manager: "SceneManager") -> Scene:
+        return getattr(importlib.import_module(module), name)(manager)
+    return factory
+
+
+class SceneManager:
+    def __init__(self, screen: pygame.Surface, clock: pygame.time.Clock):
+        self.screen = screen
+        self.clock = clock
+        self.current: Optional[Scene] = None
+        self.current_name: Optional[str] = None
+        self._factories: Dict[str, Callable[["SceneManager"], Scene]] = {}
+        self._scenes: Dict[str, Scene] = {}
+        self._loading: Dict[str, threading.Thread] = {}
+        self._errors: Dict[str, BaseException] = {}
+        self._lock = threading.Lock()
+
+        # stats
+        self.load_ms: Dict[str, float] = {}
+        self.last_switch_ms = 0.0
+
+    def register(self, name: str, factory: Callable[["SceneManager"], Scene]) -> None:
+        """factory(manager) -> Scene; usually just the Scene subclass."""
+        self._factories[name] = factory
+
+    def is_ready(self, name: str) -> bool:
+        return name in self._scenes
+
+    # --- loading ---
+
+    def preload(self, name: str) -> None:
+        """Builds and loads a scene on a background thread (no-op if it's loaded or loading)."""
+        with self._lock:
+            if name in self._scenes or name in self._loading:
+                return
+            thread = threading.Thread(target=self._load, args=(name,), name=f"preload-{name}", daemon=True)
+            self._loading[name] = thread
+        thread.start()
+
+    def get(self, name: str) -> Scene:
+        """The scene, built and loaded on first use. Waits for a preload in progress."""
+        scene = self._scenes.get(name)
+        if scene is not None:
+            return scene
+        self.preload(name)
+        thread = self._loading.get(name)
+        while thread is not None and thread.is_alive():
+            thread.join(0.05)
+            pygame.event.pump()  # keep the window responsive while we wait
+        error = self._errors.pop(name, None)
+        if error is not None:
+            raise error
+        return self._scenes[name]
+
+    def _load(self, name: str) -> None:
+        start = time.perf_counter()
+        try:
+            scene = self._factories[name](self)
+            scene.load()
+            self._scenes[name] = scene
+        except BaseException as e:  # handed to the main thread by get()
+            self._errors[name] = e
+        finally:
+            self.load_ms[name] = (time.perf_counter() - start) * 1000.0
+            with self._lock:
+                self._loading.pop(name, None)
+
+    # --- running ---
+
+    def switch(self, name: str) -> Scene:
+        start = time.perf_counter()
+        scene = self.get(name)
+        if scene is not self.current:
+            if self.current is not None:
+                self.current.suspend()
+            self.current, self.current_name = scene, name
+            scene.resume()
+        self.clock.tick()  # time spent elsewhere isn't this scene's frame time
+        self.last_switch_ms = (time.perf_counter() - start) * 1000.0
+        return scene
+
+    def run(self, start: str, on_first_frame: Optional[Callable[[], None]] = None) -> None:
+        """Runs scenes until one of them returns QUIT. on_first_frame() runs once the first frame is up."""
+        scene = self.switch(start)
+        fresh = True  # always draw the first frame after a switch, even when idle
+        try:
+            while True:
+                if scene.idle and not fresh:
+                    event = pygame.event.wait(IDLE_WAIT_MS)
+                    events = pygame.event.get()
+                    if event.type != pygame.NOEVENT:
+                        events.insert(0, event)
+                    frame_dt = self.clock.tick() / 1000.0
+                else:
+                    frame_dt = self.clock.tick(scene.fps) / 1000.0
+                    events = pygame.event.get()
+                fresh = False
+
+                next_name = scene.frame(events, frame_dt)
+                if on_first_frame is not None:
+                    on_first_frame()
+                    on_first_frame = None
+                if next_name == QUIT:
+                    return
+                if next_name is not None and next_name != self.current_name:
+                    scene = self.switch(next_name)
+                    fresh = True
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        if self.current is not None:
+            self.current.suspend()
+            self.current = self.current_name = None
+        for thread in list(self._loading.values()):
+            thread.join()
+        for scene in self._scenes.values():
+            scene.close()
+        self._scenes.clear()
@@ -3,8 +3,17 @@
 
 # skills.py
 from __future__ import annotations
-from dataclasses import dataclass, asdict
-from typing import Dict, Callable, Optional
+from array import array
+from bisect import bisect_right
+from dataclasses import dataclass, asdict, field
+from typing import Any, Dict, Callable, Iterable, List, Optional, Sequence, Tuple
+
+import content
+
+try:
+    import numpy as np
+except ImportError:  # effect tables fall back to array('d') columns
+    np = None
 
 
 def xp_to_level_osrs(level: int) -> int:
@@ -16,6 +25,108 @@ def xp_to_level_osrs(level: int) -> int:
     return int(50 * (level ** 1.35) + 50)
 
 
+# ---------- Cumulative XP table ----------
+# _CUMULATIVE_XP[i] = total XP needed to reach level i + 1 starting from level 1 with 0 xp,
+# so level 1 -> 0, level 2 -> xp_to_level_osrs(1), ... Built once for the first
+# XP_TABLE_LEVELS levels and extended on demand (there's no level cap).
+
+XP_TABLE_LEVELS = 200
+
+_CUMULATIVE_XP: List[int] = [0]
+
+
+def _extend_xp_table(levels: int) -> None:
+    table = _CUMULATIVE_XP
+    while len(table) < levels:
+        table.append(table[-1] + xp_to_level_osrs(len(table)))
+
+
+_extend_xp_table(XP_TABLE_LEVELS)
+
+
+def cumulative_xp(level: int) -> int:
+    """Total XP it takes to get from level 1 to `level`."""
+    if level <= 1:
+        return 0
+    if level > len(_CUMULATIVE_XP):
+        _extend_xp_table(level)
+    return _CUMULATIVE_XP[level - 1]
+
+
+def level_for_total_xp(total_xp: int) -> int:
+    """Level reached with `total_xp` accumulated since level 1 (binary search)."""
+    while _CUMULATIVE_XP[-1] <= total_xp:
+        _extend_xp_table(len(_CUMULATIVE_XP) * 2)
+    return bisect_right(_CUMULATIVE_XP, total_xp)
+
+
+# ---------- Precomputed effect tables ----------
+# Effect functions are pure functions of the level, so each SkillDef evaluates its
+# effect_fn once per level and keeps the results. Every effect below is capped
+# well before level 100; levels past the table are added on demand.
+
+EFFECT_TABLE_LEVELS = 120
+
+
+class EffectTable:
+    """
+    Effect values for levels 1..max_level. `rows[level - 1]` is the dict effect_fn
+    returned for that level, and `columns[name]` holds one effect for every level
+    (a NumPy array when numpy is installed, otherwise array('d')).
+    """
+
+    def __init__(self, effect_fn: Callable[[int], Dict[str, float]], max_level: int = EFFECT_TABLE_LEVELS):
+        self.effect_fn = effect_fn
+        self.rows: List[Dict[str, float]] = []
+        self.names: Tuple[str, ...] = ()
+        self.columns: Dict[str, Sequence[float]] = {}
+        self._grow(max_level)
+
+    @property
+    def max_level(self) -> int:
+        return len(self.rows)
+
+    def _grow(self, max_level: int) -> None:
+        for level in range(len(self.rows) + 1, max_level + 1):
+            self.rows.append(self.effect_fn(level))
+        if not self.names and self.rows:
+            self.names = tuple(self.rows[0])
+        for name in self.names:
+            column = [float(row[name]) for row in self.rows]
+            self.columns[name] = np.array(column, dtype=np.float64) if np is not None else array("d", column)
+
+    def at(self, level: int) -> Dict[str, float]:
+        """Cached effect dict for one level. Shared between callers - don't mutate it."""
+        level = max(1, level)
+        if level > self.max_level:
+            self._grow(max(level, self.max_level * 2))
+        return self.rows[level - 1]
+
+    def value(self, name: str, level: int) -> float:
+        return self.at(level)[name]
+
+    def values(self, name: str, levels):
+        """
+        One effect for many levels at once (e.g. every worker in a room). With numpy
+        `levels` can be any int array and a float64 array comes back; without it a
+        list of floats is returned.
+        """
+        if np is not None:
+            idx = np.maximum(np.asarray(levels, dtype=np.int64), 1)
+            if idx.size and idx.max() > self.max_level:
+                self._grow(max(int(idx.max()), self.max_level * 2))
+            return self.columns[name][idx - 1]
+
+        levels = [max(1, int(level)) for level in levels]
+        if levels and max(levels) > self.max_level:
+            self._grow(max(max(levels), self.max_level * 2))
+        column = self.columns[name]
+        return [column[level - 1] for level in levels]
+
+    def all_values(self, levels) -> Dict[str, Any]:
+        return {name: self.values(name, levels) for name in self.names}
+
+
 @dataclass
 class SkillDef:
     key: str
@@ -23,6 +134,19 @@ class SkillDef:
     category: str  # "cultivation" | "business" | "combat"
     # Optional function that returns a dict of derived effects for the current level.
     effect_fn: Optional[Callable[[int], Dict[str, float]]] = None
+    _effect_table: Optional[EffectTable] = field(default=None, init=False, repr=False, compare=False)
+
+    def effect_table(self) -> Optional[EffectTable]:
+        """Built on first use; None if the skill has no effects."""
+        if self.effect_fn is None:
+            return None
+        if self._effect_table is None or self._effect_table.effect_fn is not self.effect_fn:
+            self._effect_table = EffectTable(self.effect_fn)
+        return self._effect_table
+
+    def invalidate_effects(self) -> None:
+        """Call after changing the numbers behind effect_fn so the table gets rebuilt."""
+        self._effect_table = None
 
 
 class Skill:
@@ -35,24 +159,34 @@ class Skill:
     def xp_to_next(self) -> int:
         return xp_to_level_osrs(self.level)
 
+    @property
+    def total_xp(self) -> int:
+        """XP earned since level 1 (self.xp only counts progress within the current level)."""
+        return cumulative_xp(self.level) + self.xp
+
     def add_xp(self, amount: int) -> bool:
         """Returns True if at least one level-up happened."""
         if amount <= 0:
             return False
 
-        leveled = False
-        self.xp += amount
-        while self.xp >= self.xp_to_next:
-            self.xp -= self.xp_to_next
-            self.level += 1
-            leveled = True
+        # table lookup instead of levelling up one step at a time, so huge grants are O(log n)
+        total = self.total_xp + amount
+        new_level = level_for_total_xp(total)
+        leveled = new_level > self.level
+        self.level = new_level
+        self.xp = total - cumulative_xp(new_level)
         return leveled
 
     def effects(self) -> Dict[str, float]:
         """Derived stats based on level (success rate, speed multipliers, etc.)."""
-        if self.defn.effect_fn is None:
+        table = self.defn.effect_table()
+        if table is None:
             return {}
-        return self.defn.effect_fn(self.level)
+        return dict(table.at(self.level))
+
+    def effect(self, name: str) -> float:
+        """Single effect lookup without building a dict."""
+        return self.defn.effect_table().value(name, self.level)
 
     def to_dict(self) -> Dict:
         return {"key": self.defn.key, "level": self.level, "xp": self.xp}
@@ -62,159 +196,106 @@ class Skill:
         return Skill(skill_def, level=int(data.get("level", 1)), xp=int(data.get("xp", 0)))
 
 
-# ---------- Effects (your diagram translated into formulas) ----------
+@dataclass(frozen=True)
+class LevelUp:
+    owner: Any        # whoever the skill belongs to (player, worker, ...), passed through untouched
+    skill: str
+    old_level: int
+    new_level: int
 
-def pct(cap: float, start: float, per_level: float, level: int) -> float:
-    """Helper: grows linearly and caps."""
-    return min(cap, start + per_level * (level - 1))
-
-
-def breeding_effect(level: int) -> Dict[str, float]:
-    return {
-        # success rate for breeding
-        "success_rate": pct(0.95, 0.55, 0.01, level),
-        # stability could reduce chance of negative outcomes
-        "stability": pct(0.90, 0.20, 0.012, level),
-    }
-
-
-def cloning_effect(level: int) -> Dict[str, float]:
-    return {
-        "success_rate": pct(0.98, 0.50, 0.012, level),
-        # bonus viable clones at higher levels (e.g., 0,1,2...)
-        "extra_clones_chance": pct(0.35, 0.00, 0.005, level),
-    }
-
-
-def watering_effect(level: int) -> Dict[str, float]:
-    return {
-        # higher level = faster growth (multiplier)
-        "growth_multiplier": 1.0 + min(0.50, 0.01 * (level - 1)),
-        # automation efficiency boost
-        "automation_bonus": min(0.40, 0.008 * (level - 1)),
-    }
-
-
-def transplanting_effect(level: int) -> Dict[str, float]:
-    return {
-        "success_rate": pct(0.99, 0.60, 0.01, level),
-        # lower is faster (seconds per transplant), cap at some min
-        "seconds_per_transplant": max(1.0, 6.0 - 0.06 * (level - 1)),
-    }
-
-
-def pruning_effect(level: int) -> Dict[str, float]:
-    return {
-        "speed_multiplier": 1.0 + min(0.60, 0.012 * (level - 1)),
-        # small chance of harming plant early, drops with level
-        "damage_chance": max(0.0, 0.08 - 0.0015 * (level - 1)),
-    }
-
-
-def harvesting_effect(level: int) -> Dict[str, float]:
-    return {
-        "speed_multiplier": 1.0 + min(0.75, 0.015 * (level - 1)),
-        # unlock harvesting multiple plants at once
-        "multi_harvest": 1 + (1 if level >= 15 else 0) + (1 if level >= 30 else 0),
-    }
 
+def apply_xp_batch(grants: Iterable[Tuple[Any, Skill, int]]) -> List[LevelUp]:
+    """
+    Applies many (owner, skill, amount) grants in one go and returns the level-ups.
+    Grants hitting the same Skill object are summed first, so a skill gets one
+    table lookup per batch no matter how many grants it received.
+    """
+    totals: Dict[int, List] = {}  # id(skill) -> [owner, skill, amount]
+    for owner, skill, amount in grants:
+        if amount <= 0:
+            continue
+        entry = totals.get(id(skill))
+        if entry is None:
+            totals[id(skill)] = [owner, skill, amount]
+        else:
+            entry[2] += amount
 
-def trimming_effect(level: int) -> Dict[str, float]:
-    return {
-        "speed_multiplier": 1.0 + min(0.70, 0.014 * (level - 1)),
-        "quality_bonus": min(0.35, 0.008 * (level - 1)),
-    }
-
-
-def extraction_effect(level: int) -> Dict[str, float]:
-    # unlock tiers of extract types
-    types_unlocked = 1
-    if level >= 10:
-        types_unlocked = 2
-    if level >= 20:
-        types_unlocked = 3
-    if level >= 35:
-        types_unlocked = 4
-
-    return {
-        "types_unlocked": float(types_unlocked),
-        "yield_bonus": min(0.40, 0.01 * (level - 1)),
-        "quality_bonus": min(0.45, 0.012 * (level - 1)),
-    }
+    events = []
+    for owner, skill, amount in totals.values():
+        old_level = skill.level
+        if skill.add_xp(amount):
+            events.append(LevelUp(owner, skill.defn.key, old_level, skill.level))
+    return events
 
 
-def construction_effect(level: int) -> Dict[str, float]:
-    return {
-        # chance of breaking pieces while building, drops with level
-        "break_chance": max(0.01, 0.18 - 0.004 * (level - 1)),
-        "build_speed_multiplier": 1.0 + min(0.60, 0.012 * (level - 1)),
-    }
+# ---------- Effects (your diagram translated into formulas) ----------
+# Skills and their effect numbers live in data/skills.json (see content.py).
+# Each effect is value = base + per_level * (level - 1), plus the step bonuses
+# reached so far (e.g. multi_harvest +1 at 15 and 30), clamped to [min, max].
 
+def pct(cap: float, start: float, per_level: float, level: int) -> float:
+    """Helper: grows linearly and caps."""
+    return min(cap, start + per_level * (level - 1))
 
-def sales_effect(level: int) -> Dict[str, float]:
-    return {
-        "sale_chance_bonus": min(0.50, 0.01 * (level - 1)),
-        "price_bonus": min(0.25, 0.006 * (level - 1)),
-    }
 
+def effect_fn_from_spec(effects: Dict[str, Dict[str, Any]]) -> Optional[Callable[[int], Dict[str, float]]]:
+    """Turns a skill's compiled "effects" entry into an effect_fn (None if it has none)."""
+    if not effects:
+        return None
+    specs = [(name, s["base"], s["per_level"], s["min"], s["max"], tuple(map(tuple, s["steps"])))
+             for name, s in effects.items()]
 
-def marketing_effect(level: int) -> Dict[str, float]:
-    return {
-        "demand_multiplier": 1.0 + min(0.80, 0.02 * (level - 1)),
-        "ad_efficiency": min(0.60, 0.015 * (level - 1)),
-    }
+    def effect_fn(level: int) -> Dict[str, float]:
+        out = {}
+        for name, base, per_level, low, high, steps in specs:
+            value = base + per_level * (level - 1)
+            for at, amount in steps:
+                if level >= at:
+                    value += amount
+            if high is not None:
+                value = min(high, value)
+            if low is not None:
+                value = max(low, value)
+            out[name] = value
+        return out
+    return effect_fn
 
 
-def networking_effect(level: int) -> Dict[str, float]:
-    return {
-        "vendor_unlock_chance": min(0.35, 0.007 * (level - 1)),
-        "wholesale_discount": min(0.20, 0.004 * (level - 1)),
-    }
+def _skill_def(key: str, fields: Dict[str, Any]) -> SkillDef:
+    effect_fn = effect_fn_from_spec(fields.get("effects"))
+    return SkillDef(key, fields["display_name"], fields["category"], effect_fn)
 
 
-def managing_effect(level: int) -> Dict[str, float]:
-    return {
-        "team_efficiency": 1.0 + min(0.60, 0.015 * (level - 1)),
-        "passive_xp_bonus": min(0.30, 0.01 * (level - 1)),
-    }
+SKILL_DEFS: Dict[str, SkillDef] = {
+    key: _skill_def(key, fields) for key, fields in content.get()["skills"].items()}
 
 
-def attack_effect(level: int) -> Dict[str, float]:
-    return {
-        "hit_chance_bonus": min(0.35, 0.008 * (level - 1)),
-        "damage_bonus": min(0.40, 0.01 * (level - 1)),
-    }
+def _reload(data, changed) -> None:
+    """Edits existing SkillDefs in place (Skill objects keep pointing at them) and adds new ones."""
+    if "skills" not in changed:
+        return
+    for key, fields in data["skills"].items():
+        defn = SKILL_DEFS.get(key)
+        if defn is None:
+            SKILL_DEFS[key] = _skill_def(key, fields)
+            continue
+        fresh = _skill_def(key, fields)
+        defn.display_name, defn.category, defn.effect_fn = fresh.display_name, fresh.category, fresh.effect_fn
+        defn.invalidate_effects()
 
 
-def defense_effect(level: int) -> Dict[str, float]:
-    return {
-        "damage_reduction": min(0.40, 0.01 * (level - 1)),
-        "dodge_chance": min(0.20, 0.005 * (level - 1)),
-    }
+content.on_reload.append(_reload)
 
 
-SKILL_DEFS: Dict[str, SkillDef] = {
-    # Cultivation
-    "breeding": SkillDef("breeding", "Breeding", "cultivation", breeding_effect),
-    "cloning": SkillDef("cloning", "Cloning", "cultivation", cloning_effect),
-    "watering": SkillDef("watering", "Watering", "cultivation", watering_effect),
-    "transplanting": SkillDef("transplanting", "Transplanting", "cultivation", transplanting_effect),
-    "pruning": SkillDef("pruning", "Pruning", "cultivation", pruning_effect),
-    "harvesting": SkillDef("harvesting", "Harvesting", "cultivation", harvesting_effect),
-    "trimming": SkillDef("trimming", "Trimming", "cultivation", trimming_effect),
-    "extraction": SkillDef("extraction", "Extraction", "cultivation", extraction_effect),
-    "construction": SkillDef("construction", "Construction", "cultivation", construction_effect),
-
-    # Business
-    "sales": SkillDef("sales", "Sales", "business", sales_effect),
-    "marketing": SkillDef("marketing", "Marketing", "business", marketing_effect),
-    "networking": SkillDef("networking", "Networking", "business", networking_effect),
-    "managing": SkillDef("managing", "Managing", "business", managing_effect),
-
-    # Combat
-    "attack": SkillDef("attack", "Attack", "combat", attack_effect),
-    "defense": SkillDef("defense", "Defense", "combat", defense_effect),
-}
+def effects_for_levels(skill_key: str, levels) -> Dict[str, Any]:
+    """
+    Vectorized effect query: every effect of SKILL_DEFS[skill_key] for an array of
+    levels, e.g. effects_for_levels("trimming", worker_levels)["quality_bonus"].
+    """
+    table = SKILL_DEFS[skill_key].effect_table()
+    if table is None:
+        return {}
+    return table.all_values(levels)
 
     #breeding
         # % success rate stability
@@ -0,0 +1,367 @@
+# sprites: art packed into texture atlases, layered sprite groups, batched dirty-only drawing
+#
+# A layer (SpriteGroup for a handful of Sprite objects, SpriteBatch for
+# thousands of array-backed instances like the crowd or a grow room) is added
+# to a DirtyRenderer with add_layer(). Every present() the layer reports the
+# screen rects of sprites that appeared, moved, changed frame or vanished, and
+# then paints only what overlaps the repainted regions, with one
+# Surface.blits() call per layer per region, straight from the atlas sheet.
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pygame
+
+from renderer import MAX_DIRTY_RECTS
+
+ATLAS_MAX_WIDTH = 2048
+ATLAS_PADDING = 1           # px between frames so scaled/rotated frames don't bleed
+ROTATION_STEP = 5.0         # degrees; rotated frames are cached at this granularity
+COLORKEY = (255, 0, 255)    # sheets whose alpha is all-or-nothing are stored colorkeyed (cheaper to blit)
+
+
+class TextureAtlas:
+    """
+    Frames packed into one sheet (shelf packing, tallest first). Frame ids are
+    handed out in add() order and stay valid when frames are added later (the
+    sheet is just rebuilt on next use).
+    """
+
+    def __init__(self, max_width: int = ATLAS_MAX_WIDTH, padding: int = ATLAS_PADDING):
+        self.max_width = max_width
+        self.padding = padding
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        self._sources: List[pygame.Surface] = []
+        self.rects: List[pygame.Rect] = []
+        self.widths = np.zeros(0, dtype=np.int32)
+        self.heights = np.zeros(0, dtype=np.int32)
+        self._sheet: Optional[pygame.Surface] = None
+        self._rotated: Dict[Tuple[int, int], pygame.Surface] = {}
+
+    def add(self, name: str, surface: pygame.Surface) -> int:
+        if name in self.ids:
+            frame = self.ids[name]
+            self._sources[frame] = surface
+        else:
+            frame = self.ids[name] = len(self.names)
+            self.names.append(name)
+            self._sources.append(surface)
+        self._sheet = None
+        return frame
+
+    def add_image(self, name: str, path: str, size: Optional[Tuple[int, int]] = None) -> int:
+        """Adds an image from the assets folder (through the shared AssetManager)."""
+        from assets import get_assets
+
+        return self.add(name, get_assets().image(path, size, alpha=True))
+
+    def frame_id(self, name: str) -> int:
+        return self.ids[name]
+
+    @property
+    def sheet(self) -> pygame.Surface:
+        if self._sheet is None:
+            self.build()
+        return self._sheet
+
+    def build(self) -> pygame.Surface:
+        pad = self.padding
+        sizes = [s.get_size() for s in self._sources]
+        widest = max((w for w, _ in sizes), default=1) + pad
+        area = sum((w + pad) * (h + pad) for w, h in sizes)
+        width = min(self.max_width, max(widest, 1 << max(0, int(area ** 0.5) - 1).bit_length()))
+
+        rects = [pygame.Rect(0, 0, 0, 0)] * len(sizes)
+        x = y = shelf = 0
+        for i in sorted(range(len(sizes)), key=lambda i: -sizes[i][1]):
+            w, h = sizes[i]
+            if x + w > width:
+                x, y, shelf = 0, y + shelf + pad, 0
+            rects[i] = pygame.Rect(x, y, w, h)
+            x += w + pad
+            shelf = max(shelf, h)
+
+        sheet = pygame.Surface((width, max(1, y + shelf)), pygame.SRCALPHA)
+        for source, rect in zip(self._sources, rects):
+            sheet.blit(source, rect)
+        alpha = pygame.surfarray.pixels_alpha(sheet)
+        binary = not ((alpha != 0) & (alpha != 255)).any()
+        del alpha  # unlocks the sheet
+        if binary:
+            # hard-edged art: a colorkey blit is a masked copy instead of a per-pixel blend
+            keyed = pygame.Surface(sheet.get_size())
+            keyed.fill(COLORKEY)
+            keyed.blit(sheet, (0, 0))
+            keyed.set_colorkey(COLORKEY)
+            sheet = keyed
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            sheet = sheet.convert() if binary else sheet.convert_alpha()
+        self._sheet = sheet
+        self.rects = rects
+        self.widths = np.array([r.w for r in rects], dtype=np.int32)
+        self.heights = np.array([r.h for r in rects], dtype=np.int32)
+        self._rotated.clear()
+        return sheet
+
+    def source(self, frame: int, rotation: float = 0.0) -> Tuple[pygame.Surface, pygame.Rect]:
+        """(surface, area) to blit for a frame; rotated frames are separate cached surfaces."""
+        sheet = self.sheet
+        step = int(round(rotation / ROTATION_STEP)) % int(360 / ROTATION_STEP)
+        if step == 0:
+            return sheet, self.rects[frame]
+        key = (frame, step)
+        image = self._rotated.get(key)
+        if image is None:
+            image = self._rotated[key] = pygame.transform.rotate(sheet.subsurface(self.rects[frame]),
+                                                                 -step * ROTATION_STEP)
+        return image, image.get_rect()
+
+    def image(self, frame: int, rotation: float = 0.0) -> pygame.Surface:
+        surface, area = self.source(frame, rotation)
+        return surface.subsurface(area) if surface is self.sheet else surface
+
+
+# --- sprite objects ---
+
+class Sprite(pygame.sprite.Sprite):
+    """
+    A world-space sprite: `position` is the center in world pixels,
+    `velocity` is in pixels per second, `rotation` in degrees (clockwise).
+    update(dt) integrates the velocity.
+    """
+
+    def __init__(self, atlas: TextureAtlas, frame: str, position, velocity=(0.0, 0.0), rotation: float = 0.0,
+                 *groups):
+        super().__init__(*groups)
+        self.atlas = atlas
+        self.frame = atlas.frame_id(frame)
+        self.position = pygame.Vector2(position)
+        self.velocity = pygame.Vector2(velocity)
+        self.rotation = rotation
+
+    def set_frame(self, name: str) -> None:
+        self.frame = self.atlas.frame_id(name)
+
+    def update(self, dt: float = 0.0) -> None:
+        if self.velocity:
+            self.position += self.velocity * dt
+
+    @property
+    def image(self) -> pygame.Surface:
+        return self.atlas.image(self.frame, self.rotation)
+
+    @property
+    def rect(self) -> pygame.Rect:
+        """World rect (centered on position)."""
+        _, area = self.atlas.source(self.frame, self.rotation)
+        return pygame.Rect(round(self.position.x - area.w / 2), round(self.position.y - area.h / 2),
+                           area.w, area.h)
+
+
+class SpriteGroup(pygame.sprite.Group):
+    """
+    One layer of Sprite objects. Meant for tens to hundreds of sprites; for
+    crowds and grow rooms use SpriteBatch.
+    """
+
+    def __init__(self, atlas: TextureAtlas, camera=None, layer: int = 0, *sprites):
+        super().__init__(*sprites)
+        self.atlas = atlas
+        self.camera = camera
+        self.layer = layer
+        self._drawn: Dict[Sprite, tuple] = {}  # sprite -> blit args from the last present
+        self._rects: List[pygame.Rect] = []
+        self._blits: List[tuple] = []
+
+    def collect(self, screen_rect: pygame.Rect, full: bool) -> List[pygame.Rect]:
+        ox, oy = self.camera.offset if self.camera is not None else (0, 0)
+        source = self.atlas.source
+        drawn: Dict[Sprite, tuple] = {}
+        dirty: List[pygame.Rect] = []
+        rects, blits = [], []
+        old = self._drawn
+        for sprite in self.sprites():
+            surface, area = source(sprite.frame, sprite.rotation)
+            pos = (round(sprite.position.x - area.w / 2) - ox, round(sprite.position.y - area.h / 2) - oy)
+            entry = (surface, pos, area)
+            drawn[sprite] = entry
+            rect = pygame.Rect(pos, area.size)
+            if rect.colliderect(screen_rect):
+                rects.append(rect)
+                blits.append(entry)
+            if not full:
+                prev = old.pop(sprite, None)
+                if prev != entry:
+                    dirty.append(rect)
+                    if prev is not None:
+                        dirty.append(pygame.Rect(prev[1], prev[2].size))
+        if not full:
+            dirty.extend(pygame.Rect(prev[1], prev[2].size) for prev in old.values())  # removed sprites
+        self._drawn, self._rects, self._blits = drawn, rects, blits
+        return dirty
+
+    def paint(self, screen: pygame.Surface, region: Optional[pygame.Rect] = None) -> None:
+        if region is None:
+            screen.blits(self._blits, doreturn=False)
+        else:
+            blits = self._blits
+            screen.blits([blits[i] for i in region.collidelistall(self._rects)], doreturn=False)
+
+
+# --- array-backed sprites ---
+
+class SpriteBatch:
+    """
+    Thousands of unrotated instances kept as arrays: world centers, atlas
+    frame ids and stable integer keys (e.g. Crowd row ids) used to tell which
+    instance moved. Call set() every frame with the current arrays.
+    """
+
+    def __init__(self, atlas: TextureAtlas, camera=None, layer: int = 0):
+        self.atlas = atlas
+        self.camera = camera
+        self.layer = layer
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.x = np.zeros(0, dtype=np.float32)
+        self.y = np.zeros(0, dtype=np.float32)
+        self.frames = np.zeros(0, dtype=np.int32)
+        # what was drawn last present(): screen top-left + frame per key
+        self._prev_keys = np.zeros(0, dtype=np.int64)
+        self._prev_sx = np.zeros(0, dtype=np.int32)
+        self._prev_sy = np.zeros(0, dtype=np.int32)
+        self._prev_frames = np.zeros(0, dtype=np.int32)
+        self._right = self._bottom = np.zeros(0, dtype=np.int32)
+
+    def __len__(self) -> int:
+        return int(self.keys.size)
+
+    def set(self, x: Sequence[float], y: Sequence[float], frames,
+            keys: Optional[Sequence[int]] = None) -> None:
+        self.x = np.asarray(x, dtype=np.float32)
+        self.y = np.asarray(y, dtype=np.float32)
+        self.frames = np.broadcast_to(np.asarray(frames, dtype=np.int32), self.x.shape)
+        if keys is None:
+            keys = np.arange(self.x.size)
+        self.keys = np.asarray(keys, dtype=np.int64)
+
+    def collect(self, screen_rect: pygame.Rect, full: bool) -> List[pygame.Rect]:
+        atlas = self.atlas
+        atlas.sheet  # make sure frame sizes are known
+        ox, oy = self.camera.offset if self.camera is not None else (0, 0)
+        w, h = atlas.widths[self.frames], atlas.heights[self.frames]
+        sx = np.rint(self.x - w / 2).astype(np.int32) - ox
+        sy = np.rint(self.y - h / 2).astype(np.int32) - oy
+        on = ((sx < screen_rect.right) & (sx + w > screen_rect.left)
+              & (sy < screen_rect.bottom) & (sy + h > screen_rect.top))
+        keys, sx, sy, frames = self.keys[on], sx[on], sy[on], self.frames[on]
+        self._right, self._bottom = sx + w[on], sy + h[on]
+
+        dirty: List[pygame.Rect] = []
+        if not full:
+            # match this frame's on-screen instances to last frame's by key
+            if self._prev_keys.size:
+                order = np.argsort(self._prev_keys)
+                prev_keys = self._prev_keys[order]
+                pos = np.minimum(np.searchsorted(prev_keys, keys), prev_keys.size - 1)
+                match = order[pos]
+                found = prev_keys[pos] == keys
+                same = found & (self._prev_sx[match] == sx) & (self._prev_sy[match] == sy) \
+                    & (self._prev_frames[match] == frames)
+                changed = ~same
+                gone = np.ones(self._prev_keys.size, dtype=bool)
+                gone[match[same]] = False  # moved ones stay in: their old rect needs repainting too
+            else:  # nothing was on screen last frame: everything is new, nothing to erase
+                changed = np.ones(keys.size, dtype=bool)
+                gone = np.zeros(0, dtype=bool)
+
+            if np.count_nonzero(changed) + np.count_nonzero(gone) > MAX_DIRTY_RECTS:
+                dirty.append(pygame.Rect(screen_rect))  # most of it moved, the renderer redraws everything
+                changed = gone = np.zeros(0, dtype=bool)
+            fw, fh = atlas.widths, atlas.heights
+            for i in np.flatnonzero(changed).tolist():
+                dirty.append(pygame.Rect(int(sx[i]), int(sy[i]), int(fw[frames[i]]), int(fh[frames[i]])))
+            psx, psy, pf = self._prev_sx, self._prev_sy, self._prev_frames
+            for i in np.flatnonzero(gone).tolist():
+                dirty.append(pygame.Rect(int(psx[i]), int(psy[i]), int(fw[pf[i]]), int(fh[pf[i]])))
+
+        self._prev_keys, self._prev_sx, self._prev_sy, self._prev_frames = keys, sx, sy, frames
+        return dirty
+
+    def paint(self, screen: pygame.Surface, region: Optional[pygame.Rect] = None) -> None:
+        sx, sy, frames = self._prev_sx, self._prev_sy, self._prev_frames
+        if region is not None and sx.size:
+            hit = ((sx < region.right) & (self._right > region.left)
+                   & (sy < region.bottom) & (self._bottom > region.top))
+            sx, sy, frames = sx[hit], sy[hit], frames[hit]
+        if not sx.size:
+            return
+        sheet, rects = self.atlas.sheet, self.atlas.rects
+        blits = [(sheet, (x, y), rects[f]) for x, y, f in zip(sx.tolist(), sy.tolist(), frames.tolist())]
+        screen.blits(blits, doreturn=False)
+
+
+# --- placeholder art ---
+
+def build_default_atlas(player_color=(50, 180, 255), player_size: int = 64) -> TextureAtlas:
+    """
+    Character, NPC, plant and item frames drawn with pygame.draw until there
+    is real art (swap a frame with atlas.add_image(name, path) - ids stay the same).
+    """
+    from consumables import GENETICS, MEDIUMS, NUTRIENTS
+    from npc import ARCHETYPES, NPC_SIZE
+    from plantsim import STAGES
+
+    atlas = TextureAtlas()
+
+    def canvas(size):
+        return pygame.Surface(size, pygame.SRCALPHA)
+
+    def darker(color, f=0.55):
+        return tuple(int(c * f) for c in color)
+
+    # player: rounded body with a notch showing which way it faces
+    s = player_size
+    img = canvas((s, s))
+    pygame.draw.rect(img, player_color, (2, 2, s - 4, s - 4), border_radius=s // 5)
+    pygame.draw.rect(img, darker(player_color), (2, 2, s - 4, s - 4), 3, border_radius=s // 5)
+    pygame.draw.polygon(img, (255, 255, 255), [(s // 2 - 8, 8), (s // 2 + 8, 8), (s // 2, 0)])
+    atlas.add("player", img)
+
+    # npcs: one per archetype, colored like the old debug rects
+    s = NPC_SIZE
+    for key, spec in ARCHETYPES.items():
+        img = canvas((s, s))
+        pygame.draw.circle(img, spec.color, (s // 2, s // 2), s // 2 - 2)
+        pygame.draw.circle(img, darker(spec.color), (s // 2, s // 2), s // 2 - 2, 3)
+        atlas.add(f"npc_{key}", img)
+
+    # plants: pot + foliage that grows with the stage, gold buds when ready
+    pot, leaf = (150, 90, 50), (60, 170, 70)
+    for i, stage in enumerate(STAGES):
+        img = canvas((32, 40))
+        pygame.draw.rect(img, pot, (8, 28, 16, 12))
+        radius = 4 + i * 4
+        pygame.draw.circle(img, leaf, (16, 28 - radius), radius)
+        if stage in ("flower", "ready"):
+            buds = (240, 200, 60) if stage == "ready" else (230, 230, 230)
+            for dx, dy in ((-5, -radius - 2), (5, -radius), (0, -radius * 2 + 4)):
+                pygame.draw.circle(img, buds, (16 + dx, 28 + dy), 3)
+        atlas.add(f"plant_{stage}", img)
+    img = canvas((32, 40))
+    pygame.draw.rect(img, pot, (8, 28, 16, 12))
+    pygame.draw.line(img, (110, 80, 40), (16, 28), (10, 14), 3)
+    atlas.add("plant_dead", img)
+
+    # items: one icon per consumable category and key
+    icons = {"medium": ((120, 85, 55), MEDIUMS), "nutrient": ((80, 140, 220), NUTRIENTS),
+             "genetics": ((150, 220, 120), GENETICS)}
+    for category, (color, items) in icons.items():
+        for key in items:
+            img = canvas((24, 24))
+            pygame.draw.rect(img, color, (3, 5, 18, 16), border_radius=3)
+            pygame.draw.rect(img, darker(color), (3, 5, 18, 16), 2, border_radius=3)
+            atlas.add(f"item_{category}_{key}", img)
+
+    atlas.build()
+    return atlas
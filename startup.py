@@ -0,0 +1,74 @@
+# startup: bring up only the pygame subsystems the game uses, and time each step of getting to the menu
+#
+# pygame.init() starts everything SDL has (audio, joystick, haptics, ...)
+# before the first frame, none of which the game uses yet. Everything that
+# isn't needed to draw the menu (assets, content modules, the world) is
+# loaded behind it by the scene manager.
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+import pygame
+
+MENU_BUDGET_MS = 300.0  # process start -> menu on screen
+
+
+def init_pygame() -> None:
+    """Just video (display + events) and fonts; add subsystems here when something needs them."""
+    pygame.display.init()
+    pygame.font.init()
+
+
+class StartupTimer:
+    """
+    Wall time of each startup phase. Phases can be recorded from loader
+    threads too; they show up tagged with the thread name.
+    """
+
+    def __init__(self, start: Optional[float] = None):
+        self.start = time.perf_counter() if start is None else start
+        self.phases: List[Tuple[str, float, str]] = []  # (name, ms, thread)
+        self.marks: Dict[str, float] = {}              # name -> ms since start
+        self._lock = threading.Lock()
+
+    def record(self, name: str, ms: float, thread: Optional[str] = None) -> None:
+        if thread is None:
+            current = threading.current_thread()
+            thread = "" if current is threading.main_thread() else current.name
+        where = thread
+        with self._lock:
+            self.phases.append((name, ms, where))
+
+    @contextmanager
+    def phase(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000.0)
+
+    def mark(self, name: str) -> float:
+        """Remembers how long after process start `name` happened (e.g. first menu frame)."""
+        ms = (time.perf_counter() - self.start) * 1000.0
+        self.marks[name] = ms
+        return ms
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            phases = [{"phase": n, "ms": round(ms, 2), "thread": t or "main"} for n, ms, t in self.phases]
+        return {"phases": phases, "marks": {k: round(v, 2) for k, v in self.marks.items()}}
+
+    def report(self) -> str:
+        with self._lock:
+            phases = list(self.phases)
+        width = max([len(n) + len(t) + 3 for n, _, t in phases] + [10])
+        lines = ["startup:"]
+        for name, ms, where in phases:
+            label = f"{name} [{where}]" if where else name
+            lines.append(f"  {label:<{width}} {ms:8.1f} ms")
+        for name, ms in self.marks.items():
+            over = "  (over budget)" if name == "menu on screen" and ms > MENU_BUDGET_MS else ""
+            lines.append(f"  {name + ' at':<{width}} {ms:8.1f} ms{over}")
+        return "\n".join(lines)
@@ -0,0 +1,194 @@
+# low-overhead telemetry: explicit sampled values + events, written in batches off the game thread
+
+import atexit
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import binfmt
+
+__all__ = ["TelemetryWriter", "Telemetry", "read_records"]
+
+DEFAULT_BUFFER_SIZE = 8192        # records held in memory before the oldest get dropped
+DEFAULT_FLUSH_INTERVAL = 0.5      # seconds between background flushes
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+DEFAULT_BACKUPS = 2               # rotated files kept next to the live one (file.1, file.2, ...)
+
+FORMATS = ("jsonl", "msgpack")
+
+
+class TelemetryWriter:
+    """
+    Bounded ring buffer of records + a background thread that writes them out in
+    batches. write() never touches the disk, it just appends to the buffer; if the
+    writer thread falls behind, the oldest records are dropped (and counted)
+    instead of stalling the game. Output is either JSON lines or concatenated
+    msgpack records (fmt="msgpack", read back with read_records). When the file
+    reaches `max_bytes` it's rotated, keeping `backups` old files, so long runs
+    don't grow without bound. max_bytes=None disables rotation.
+    """
+
+    def __init__(self, path: str, fmt: str = "jsonl", buffer_size: int = DEFAULT_BUFFER_SIZE,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL, max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+                 backups: int = DEFAULT_BACKUPS, append: bool = False):
+        if fmt not in FORMATS:
+            raise ValueError(f"unknown telemetry format {fmt!r}, expected one of {FORMATS}")
+        self.path = path
+        self.fmt = fmt
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.dropped = 0
+        self.written = 0
+
+        self._buffer: deque = deque(maxlen=buffer_size)
+        self._wake_at = max(1, buffer_size // 4)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self._file = open(path, "ab" if append else "wb")
+        self._size = self._file.tell()
+
+        self._thread = threading.Thread(target=self._run, name=f"telemetry:{os.path.basename(path)}",
+                                        daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        if self._closed:
+            return
+        buf = self._buffer
+        if len(buf) == buf.maxlen:
+            self.dropped += 1
+        buf.append(record)  # deque.append is atomic, no lock needed on the hot path
+        if len(buf) >= self._wake_at:
+            self._wake.set()  # getting full, don't wait for the next interval
+
+    def flush(self) -> None:
+        """Writes everything buffered so far (synchronously, on the calling thread)."""
+        with self._lock:
+            self._drain()
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self._thread.join(timeout=2.0)
+        with self._lock:
+            self._drain()
+            self._file.close()
+
+    # --- writer thread ---
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            with self._lock:
+                if not self._file.closed:
+                    self._drain()
+
+    def _drain(self) -> None:
+        buf = self._buffer
+        if not buf:
+            return
+        batch = []
+        while buf:
+            try:
+                batch.append(buf.popleft())
+            except IndexError:
+                break
+
+        if self.fmt == "jsonl":
+            data = "".join(json.dumps(record) + "\n" for record in batch).encode("utf-8")
+        else:
+            data = b"".join(binfmt.packb(record) for record in batch)
+
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+        self.written += len(batch)
+        if self.max_bytes is not None and self._size >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self) -> None:
+        self._file.close()
+        if self.backups > 0:
+            for i in range(self.backups - 1, 0, -1):
+                src = f"{self.path}.{i}"
+                if os.path.exists(src):
+                    os.replace(src, f"{self.path}.{i + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        self._file = open(self.path, "wb")
+        self._size = 0
+
+
+class Telemetry:
+    """
+    Samples explicitly registered values instead of poking at stack frames:
+
+        telemetry = Telemetry("game_state.jsonl")
+        telemetry.register("player_pos", lambda: (player.x, player.y))
+        ...
+        telemetry.sample()   # once per frame, records every `sample_every` frames
+
+    `max_seconds` stops sampling after that many seconds of frames (like the old
+    logger cutoff); pass None to keep going forever - file rotation in the writer
+    keeps the disk usage bounded.
+    """
+
+    def __init__(self, path: str = "game_state.jsonl", fmt: str = "jsonl", fps: int = 60,
+                 sample_every: int = 60, max_seconds: Optional[float] = None, **writer_kwargs):
+        self.writer = TelemetryWriter(path, fmt=fmt, **writer_kwargs)
+        self.fps = fps
+        self.sample_every = max(1, sample_every)
+        self.max_frames = None if max_seconds is None else int(fps * max_seconds)
+        self.frame = 0
+        self._probes: Dict[str, Callable[[], Any]] = {}
+        self._start = time.perf_counter()
+
+    def register(self, name: str, getter: Callable[[], Any]) -> None:
+        """`getter` is called at sample time and must return something JSON/msgpack friendly."""
+        self._probes[name] = getter
+
+    def unregister(self, name: str) -> None:
+        self._probes.pop(name, None)
+
+    def sample(self) -> None:
+        self.frame += 1
+        if self.frame % self.sample_every != 0:
+            return
+        if self.max_frames is not None and self.frame > self.max_frames:
+            return
+
+        record = {"frame": self.frame, "elapsed_s": round(time.perf_counter() - self._start, 3)}
+        for name, getter in self._probes.items():
+            record[name] = getter()
+        self.writer.write(record)
+
+    def event(self, event_type: str, **details) -> None:
+        self.writer.write({
+            "timestamp": datetime.now().strftime("%H:%M:%S.%f")[:-3],
+            "elapsed_s": round(time.perf_counter() - self._start, 3),
+            "frame": self.frame,
+            "type": event_type,
+            **details,
+        })
+
+    def close(self) -> None:
+        self.writer.close()
+
+
+def read_records(path: str) -> List[Dict[str, Any]]:
+    """Reads a telemetry file back, whichever format it was written in."""
+    with open(path, "rb") as f:
+        head = f.read(1)
+        f.seek(0)
+        if head in (b"{", b""):
+            return [json.loads(line) for line in f if line.strip()]
+        return list(binfmt.iter_unpack(f))
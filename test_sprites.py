@@ -0,0 +1,43 @@
+# regression checks for SpriteBatch dirty tracking (run with pytest)
+
+import os
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import pygame
+
+from sprites import SpriteBatch, build_default_atlas
+
+SCREEN = pygame.Rect(0, 0, 320, 240)
+
+
+def _batch() -> SpriteBatch:
+    atlas = build_default_atlas()
+    return SpriteBatch(atlas)
+
+
+def test_empty_to_nonempty_marks_new_instances():
+    batch = _batch()
+    batch.set([], [], [])
+    assert batch.collect(SCREEN, True) == []
+    batch.set([10, 100], [10, 100], [1, 1], [7, 8])
+    dirty = batch.collect(SCREEN, False)
+    assert len(dirty) == 2
+
+
+def test_nonempty_to_empty_erases_old_instances():
+    batch = _batch()
+    batch.set([10, 100], [10, 100], [1, 1], [7, 8])
+    batch.collect(SCREEN, True)
+    batch.set([], [], [])
+    dirty = batch.collect(SCREEN, False)
+    assert len(dirty) == 2
+
+
+def test_unchanged_and_moved_instances():
+    batch = _batch()
+    batch.set([10, 100], [10, 100], [1, 1], [7, 8])
+    batch.collect(SCREEN, True)
+    batch.set([100, 20], [100, 10], [1, 1], [8, 7])  # 8 stays put, 7 moves
+    dirty = batch.collect(SCREEN, False)
+    assert len(dirty) == 2  # 7's new and old rect
@@ -1 +1,248 @@
-#player hud and interface goes here
\ No newline at end of file
+# text rendering for menus and the HUD: cached fonts, an LRU of rendered strings, digit glyph atlases
+
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import pygame
+
+DEFAULT_FONT = None           # pygame's built-in font
+TEXT_CACHE_ENTRIES = 512
+ATLAS_CHARS = "0123456789+-.,:/%$ kKMBxX"  # what live numbers are made of
+MERGE_OVER = 4                # more changed HUD values than this -> repaint the whole panel
+
+Color = Tuple[int, int, int]
+_FontKey = Tuple[Optional[str], int]
+
+_fonts: Dict[_FontKey, pygame.font.Font] = {}
+
+
+def get_font(size: int, name: Optional[str] = DEFAULT_FONT) -> pygame.font.Font:
+    """Fonts are loaded once per (file, size); creating one hits the disk and FreeType."""
+    key = (name, size)
+    font = _fonts.get(key)
+    if font is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = _fonts[key] = pygame.font.Font(name, size)
+    return font
+
+
+class TextCache:
+    """
+    Rendered strings keyed by (font, text, color, antialias, background), least recently
+    used ones evicted past `max_entries`. The same Surface comes back for the
+    same string, so DirtyRenderer sees nothing changed and doesn't repaint it.
+    """
+
+    def __init__(self, max_entries: int = TEXT_CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[tuple, pygame.Surface]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, text: str, size: int, color: Color = (255, 255, 255), antialias: bool = True,
+               font: Optional[str] = DEFAULT_FONT, background: Optional[Color] = None) -> pygame.Surface:
+        key = (font, size, text, tuple(color), antialias, background)
+        surface = self._cache.get(key)
+        if surface is not None:
+            self.hits += 1
+            self._cache.move_to_end(key)
+            return surface
+        self.misses += 1
+        surface = get_font(size, font).render(text, antialias, color, background)
+        self._cache[key] = surface
+        if len(self._cache) > self.max_entries:
+            self._cache.popitem(last=False)
+        return surface
+
+    def __len__(self) -> int:
+        return len(self._cache)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+_text_cache = TextCache()
+
+
+def render_text(text: str, size: int, color: Color = (255, 255, 255), antialias: bool = True,
+                font: Optional[str] = DEFAULT_FONT) -> pygame.Surface:
+    """Cached font.render(); the returned Surface is shared, don't draw on it."""
+    return _text_cache.render(text, size, color, antialias, font)
+
+
+def get_text_cache() -> TextCache:
+    return _text_cache
+
+
+class GlyphAtlas:
+    """
+    Every character of `chars` rendered once into a single surface. draw()
+    composes a string out of those glyphs with one Surface.blits() call, so a
+    number that changes every frame never goes through FreeType. Characters
+    outside the atlas fall back to the text cache. With a `background` color
+    the glyphs are opaque, so blitting them is a plain copy (no blending) and
+    they paint over whatever was there before.
+    """
+
+    def __init__(self, size: int, color: Color = (255, 255, 255), chars: str = ATLAS_CHARS,
+                 font: Optional[str] = DEFAULT_FONT, background: Optional[Color] = None):
+        self.size = size
+        self.color = tuple(color)
+        self.background = tuple(background) if background is not None else None
+        self.font = font
+        pg_font = get_font(size, font)
+        glyphs = [pg_font.render(ch, True, color, background) for ch in chars]
+        self.height = max(g.get_height() for g in glyphs)
+        width = sum(g.get_width() for g in glyphs)
+        if background is None:
+            self.surface = pygame.Surface((max(1, width), self.height), pygame.SRCALPHA)
+        else:
+            self.surface = pygame.Surface((max(1, width), self.height))
+            self.surface.fill(background)
+        self.rects: Dict[str, pygame.Rect] = {}
+        x = 0
+        for ch, glyph in zip(chars, glyphs):
+            self.surface.blit(glyph, (x, 0))
+            self.rects[ch] = pygame.Rect(x, 0, glyph.get_width(), self.height)
+            x += glyph.get_width()
+
+    def width(self, text: str) -> int:
+        rects = self.rects
+        return sum(rects[ch].w if ch in rects else get_font(self.size, self.font).size(ch)[0] for ch in text)
+
+    def draw(self, target: pygame.Surface, text: str, pos: Tuple[int, int]) -> pygame.Rect:
+        """Draws `text` with its top-left at `pos`; returns the rect it covered."""
+        x, y = pos
+        rects, atlas = self.rects, self.surface
+        batch = []
+        for ch in text:
+            area = rects.get(ch)
+            if area is None:
+                glyph = _text_cache.render(ch, self.size, self.color, font=self.font,
+                                           background=self.background)
+                batch.append((glyph, (x, y)))
+                x += glyph.get_width()
+            else:
+                batch.append((atlas, (x, y), area))
+                x += area.w
+        target.blits(batch, doreturn=False)
+        return pygame.Rect(pos[0], y, x - pos[0], self.height)
+
+
+_atlases: Dict[tuple, GlyphAtlas] = {}
+
+
+def get_atlas(size: int, color: Color = (255, 255, 255), font: Optional[str] = DEFAULT_FONT,
+              background: Optional[Color] = None) -> GlyphAtlas:
+    key = (font, size, tuple(color), background and tuple(background))
+    atlas = _atlases.get(key)
+    if atlas is None:
+        atlas = _atlases[key] = GlyphAtlas(size, color, font=font, background=background)
+    return atlas
+
+
+# --- HUD ---
+
+class Counter:
+    """
+    One live HUD field: a static label and a value drawn from a glyph atlas.
+    Both live on the Hud's panel surface; the value area (a subsurface) is
+    only touched when the formatted value changes.
+    """
+
+    def __init__(self, label: str, value: Callable[[], object], fmt: str = "{:,}", size: int = 24,
+                 color: Color = (240, 240, 240), label_color: Color = (170, 170, 170),
+                 value_width: int = 120):
+        self.label = label
+        self.value = value
+        self.fmt = fmt
+        self.size = size
+        self.color = color
+        self.label_color = label_color
+        self.value_width = value_width
+        self.label_surface = render_text(label, size, label_color)
+        self.text: Optional[str] = None
+        self.atlas: Optional[GlyphAtlas] = None
+        self.area: Optional[pygame.Surface] = None   # value subsurface of the panel
+        self.background: Optional[Color] = None       # panel fill, set by place()
+        self.rect = pygame.Rect(0, 0, 0, 0)           # value rect on the panel
+        self._width = 0                               # pixels covered by the current text
+
+    def place(self, panel: pygame.Surface, pos: Tuple[int, int], background: Color) -> None:
+        """Draws the label onto `panel` at `pos` and reserves the value area next to it."""
+        self.atlas = get_atlas(self.size, self.color, background=background)
+        self.background = background
+        panel.blit(self.label_surface, pos)
+        self.rect = pygame.Rect(pos[0] + self.label_surface.get_width() + 6, pos[1],
+                                self.value_width, self.atlas.height)
+        self.area = panel.subsurface(self.rect)
+        self.text = None
+        self._width = 0
+
+    def update(self) -> bool:
+        """Re-composes the value if it changed; True if it did (never before place())."""
+        if self.area is None:
+            return False
+        text = self.fmt.format(self.value())
+        if text == self.text:
+            return False
+        self.text = text
+        # opaque glyphs overwrite the old digits; only a shorter value leaves a tail to clear
+        width = self.atlas.draw(self.area, text, (0, 0)).w
+        if width < self._width:
+            self.area.fill(self.background, (width, 0, self._width - width, self.atlas.height))
+        self._width = width
+        return True
+
+
+class Hud:
+    """
+    A panel of Counters, one under the other. The whole panel is a single
+    surface handed to the DirtyRenderer, and only the values that changed
+    since the last frame get invalidated, so a frame where nothing changed
+    costs one formatted string per counter.
+    """
+
+    def __init__(self, origin: Tuple[int, int] = (12, 10), line_height: int = 26,
+                 background: Color = (20, 20, 24), padding: int = 6):
+        self.origin = origin
+        self.line_height = line_height
+        self.background = background
+        self.padding = padding
+        self.counters: List[Counter] = []
+        self.panel: Optional[pygame.Surface] = None
+
+    def add(self, label: str, value: Callable[[], object], fmt: str = "{:,}", **kwargs) -> Counter:
+        counter = Counter(label, value, fmt, **kwargs)
+        self.counters.append(counter)
+        self.panel = None  # laid out again on the next draw
+        return counter
+
+    def extend(self, fields: Iterable[Tuple[str, Callable[[], object], str]]) -> None:
+        for label, value, fmt in fields:
+            self.add(label, value, fmt)
+
+    def _layout(self) -> None:
+        pad = self.padding
+        width = max(c.label_surface.get_width() + 6 + c.value_width for c in self.counters) + pad * 2
+        height = len(self.counters) * self.line_height + pad * 2
+        self.panel = pygame.Surface((width, height))
+        self.panel.fill(self.background)
+        for i, counter in enumerate(self.counters):
+            counter.place(self.panel, (pad, pad + i * self.line_height), self.background)
+
+    def draw(self, renderer) -> None:
+        if not self.counters:
+            return
+        if self.panel is None:
+            self._layout()
+            renderer.invalidate(self.panel.get_rect(topleft=self.origin))
+        changed = [counter.rect for counter in self.counters if counter.update()]
+        if len(changed) > MERGE_OVER:
+            # one rect for the panel beats a screen update per counter
+            renderer.invalidate(self.panel.get_rect(topleft=self.origin))
+        else:
+            for rect in changed:
+                renderer.invalidate(rect.move(self.origin))
+        renderer.blit("hud", self.panel, self.origin)
@@ -1 +1,306 @@
-#world info goes here
\ No newline at end of file
+# world map: chunked tilemap, pre-rendered chunk surfaces and a scrolling camera
+
+from __future__ import annotations
+
+import math
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import pygame
+
+from assets import get_assets
+
+TILE_SIZE = 32        # matches the cells in assets/grid.png
+CHUNK_TILES = 16      # chunk = 16x16 tiles = 512x512 px
+CHUNK_PX = TILE_SIZE * CHUNK_TILES
+
+STREAM_MARGIN = 1           # chunks kept warm around the view in every direction
+MAX_CACHED_CHUNKS = 48      # rendered chunk surfaces kept before evicting the oldest
+MAX_BUILDS_PER_FRAME = 2    # off-screen prefetch work per frame (visible chunks are always built)
+
+DEBUG_DRAW_GRID = False     # overlay assets/grid.png cells on every tile
+
+
+@dataclass(frozen=True)
+class TileType:
+    key: str
+    color: Tuple[int, int, int]
+    solid: bool = False
+
+
+TILE_TYPES: List[TileType] = [
+    TileType("grass", (70, 120, 60)),
+    TileType("dirt", (120, 95, 60)),
+    TileType("road", (60, 60, 65)),
+    TileType("sidewalk", (150, 150, 145)),
+    TileType("floor", (170, 120, 70)),
+    TileType("wall", (90, 60, 40), solid=True),
+    TileType("water", (50, 90, 160), solid=True),
+]
+TILE_IDS: Dict[str, int] = {t.key: i for i, t in enumerate(TILE_TYPES)}
+
+
+@dataclass
+class Decal:
+    """A static image baked into the chunks it overlaps (e.g. the house interior art)."""
+    surface: pygame.Surface
+    rect: pygame.Rect  # world pixels
+
+
+class Camera:
+    """Top-left of the view in world pixels, clamped to the world bounds."""
+
+    def __init__(self, view_size: Tuple[int, int], bounds: Optional[pygame.Rect] = None):
+        self.width, self.height = view_size
+        self.bounds = bounds
+        self.x = 0.0
+        self.y = 0.0
+        self.moved = True  # True when the view changed since the last frame
+
+    @property
+    def offset(self) -> Tuple[int, int]:
+        return round(self.x), round(self.y)
+
+    def view_rect(self) -> pygame.Rect:
+        x, y = self.offset
+        return pygame.Rect(x, y, self.width, self.height)
+
+    def center_on(self, pos: Tuple[float, float]) -> None:
+        old = self.offset
+        x = pos[0] - self.width / 2
+        y = pos[1] - self.height / 2
+        if self.bounds is not None:
+            x = max(self.bounds.left, min(x, self.bounds.right - self.width))
+            y = max(self.bounds.top, min(y, self.bounds.bottom - self.height))
+        self.x, self.y = x, y
+        self.moved = self.offset != old
+
+    def world_to_screen(self, rect: pygame.Rect) -> pygame.Rect:
+        ox, oy = self.offset
+        return rect.move(-ox, -oy)
+
+    def screen_to_world(self, pos: Tuple[int, int]) -> Tuple[int, int]:
+        ox, oy = self.offset
+        return pos[0] + ox, pos[1] + oy
+
+
+class World:
+    """
+    Tile map stored as one bytearray of tile ids per chunk. Chunks are rendered
+    to surfaces on demand and cached, and draw() only touches the chunks that
+    overlap the camera, so drawing costs the same on a tiny or a huge map.
+    """
+
+    def __init__(self, width_tiles: int, height_tiles: int, fill: str = "grass"):
+        self.width_tiles = width_tiles
+        self.height_tiles = height_tiles
+        self.chunks_x = math.ceil(width_tiles / CHUNK_TILES)
+        self.chunks_y = math.ceil(height_tiles / CHUNK_TILES)
+        fill_id = TILE_IDS[fill]
+        self._tiles: Dict[Tuple[int, int], bytearray] = {
+            (cx, cy): bytearray([fill_id]) * (CHUNK_TILES * CHUNK_TILES)
+            for cy in range(self.chunks_y) for cx in range(self.chunks_x)
+        }
+        self.decals: List[Decal] = []
+        self._surfaces: "OrderedDict[Tuple[int, int], pygame.Surface]" = OrderedDict()
+        self._grid_tile: Optional[pygame.Surface] = None
+        self.on_tiles_changed: List[Callable[[pygame.Rect], None]] = []  # gets the changed world-pixel rect
+        self._solid_chunks: Dict[Tuple[int, int], bool] = {}  # chunk -> has any solid tile, filled lazily
+
+        self.chunks_built = 0  # stats
+
+    @property
+    def pixel_rect(self) -> pygame.Rect:
+        return pygame.Rect(0, 0, self.width_tiles * TILE_SIZE, self.height_tiles * TILE_SIZE)
+
+    # --- tiles ---
+
+    def in_bounds(self, tx: int, ty: int) -> bool:
+        return 0 <= tx < self.width_tiles and 0 <= ty < self.height_tiles
+
+    def get_tile(self, tx: int, ty: int) -> int:
+        if not self.in_bounds(tx, ty):
+            return TILE_IDS["wall"]
+        chunk = self._tiles[(tx // CHUNK_TILES, ty // CHUNK_TILES)]
+        return chunk[(ty % CHUNK_TILES) * CHUNK_TILES + tx % CHUNK_TILES]
+
+    def is_solid(self, tx: int, ty: int) -> bool:
+        return TILE_TYPES[self.get_tile(tx, ty)].solid
+
+    def set_tile(self, tx: int, ty: int, tile: str) -> None:
+        self.fill_rect(pygame.Rect(tx, ty, 1, 1), tile)
+
+    def fill_rect(self, tiles: pygame.Rect, tile: str) -> None:
+        """Sets every tile in a rect (in tile coords) and re-renders only the touched chunks."""
+        tiles = tiles.clip(pygame.Rect(0, 0, self.width_tiles, self.height_tiles))
+        if not tiles.w or not tiles.h:
+            return
+        tile_id = TILE_IDS[tile]
+        for ty in range(tiles.top, tiles.bottom):
+            cy, ly = divmod(ty, CHUNK_TILES)
+            for tx in range(tiles.left, tiles.right):
+                cx, lx = divmod(tx, CHUNK_TILES)
+                self._tiles[(cx, cy)][ly * CHUNK_TILES + lx] = tile_id
+                self._solid_chunks.pop((cx, cy), None)
+        changed = pygame.Rect(tiles.x * TILE_SIZE, tiles.y * TILE_SIZE,
+                              tiles.w * TILE_SIZE, tiles.h * TILE_SIZE)
+        self.invalidate(changed)
+        for callback in self.on_tiles_changed:
+            callback(changed)
+
+    def solid_chunk_rects(self, world_rect) -> List[pygame.Rect]:
+        """World-pixel rects of the chunks under `world_rect` that contain any solid tile."""
+        x, y, w, h = world_rect
+        rects = []
+        for key in self.chunks_in(pygame.Rect(int(x), int(y), math.ceil(w) + 1, math.ceil(h) + 1)):
+            has_solid = self._solid_chunks.get(key)
+            if has_solid is None:
+                tiles = self._tiles[key]
+                has_solid = any(t.solid and i in tiles for i, t in enumerate(TILE_TYPES))
+                self._solid_chunks[key] = has_solid
+            if has_solid:
+                rects.append(pygame.Rect(key[0] * CHUNK_PX, key[1] * CHUNK_PX, CHUNK_PX, CHUNK_PX))
+        return rects
+
+    def may_be_solid(self, world_rect) -> bool:
+        """False when nothing under a world-pixel rect can block movement (cheap per-chunk check)."""
+        x, y, w, h = world_rect
+        if x < 0 or y < 0 or x + w > self.width_tiles * TILE_SIZE or y + h > self.height_tiles * TILE_SIZE:
+            return True  # off the map counts as wall
+        return bool(self.solid_chunk_rects(world_rect))
+
+    def add_decal(self, surface: pygame.Surface, world_pos: Tuple[int, int]) -> None:
+        decal = Decal(surface, surface.get_rect(topleft=world_pos))
+        self.decals.append(decal)
+        self.invalidate(decal.rect)
+
+    # --- chunk cache ---
+
+    def chunks_in(self, rect: pygame.Rect) -> Iterator[Tuple[int, int]]:
+        x0 = max(0, rect.left // CHUNK_PX)
+        y0 = max(0, rect.top // CHUNK_PX)
+        x1 = min(self.chunks_x - 1, (rect.right - 1) // CHUNK_PX)
+        y1 = min(self.chunks_y - 1, (rect.bottom - 1) // CHUNK_PX)
+        for cy in range(y0, y1 + 1):
+            for cx in range(x0, x1 + 1):
+                yield cx, cy
+
+    def invalidate(self, world_rect: pygame.Rect) -> None:
+        """Drop cached surfaces for chunks overlapping a world-pixel rect."""
+        for key in list(self.chunks_in(world_rect)):
+            self._surfaces.pop(key, None)
+
+    def chunk_surface(self, key: Tuple[int, int]) -> pygame.Surface:
+        surface = self._surfaces.get(key)
+        if surface is None:
+            surface = self._render_chunk(key)
+            self._surfaces[key] = surface
+            while len(self._surfaces) > MAX_CACHED_CHUNKS:
+                self._surfaces.popitem(last=False)
+        else:
+            self._surfaces.move_to_end(key)
+        return surface
+
+    def stream(self, camera: Camera, max_builds: int = MAX_BUILDS_PER_FRAME) -> None:
+        """
+        Pre-renders chunks in a ring around the view, a couple per frame, so
+        walking into a new chunk rarely has to build it on the spot.
+        """
+        margin = STREAM_MARGIN * CHUNK_PX
+        warm = camera.view_rect().inflate(margin * 2, margin * 2)
+        built = 0
+        for key in self.chunks_in(warm):
+            if key in self._surfaces:
+                continue
+            if built >= max_builds:
+                break
+            self.chunk_surface(key)
+            built += 1
+
+    def _render_chunk(self, key: Tuple[int, int]) -> pygame.Surface:
+        cx, cy = key
+        surface = pygame.Surface((CHUNK_PX, CHUNK_PX))
+        if pygame.display.get_init() and pygame.display.get_surface() is not None:
+            surface = surface.convert()
+
+        tiles = self._tiles[key]
+        for ly in range(CHUNK_TILES):
+            row = ly * CHUNK_TILES
+            for lx in range(CHUNK_TILES):
+                color = TILE_TYPES[tiles[row + lx]].color
+                surface.fill(color, (lx * TILE_SIZE, ly * TILE_SIZE, TILE_SIZE, TILE_SIZE))
+
+        chunk_rect = pygame.Rect(cx * CHUNK_PX, cy * CHUNK_PX, CHUNK_PX, CHUNK_PX)
+        for decal in self.decals:
+            if decal.rect.colliderect(chunk_rect):
+                surface.blit(decal.surface, (decal.rect.x - chunk_rect.x, decal.rect.y - chunk_rect.y))
+
+        if DEBUG_DRAW_GRID:
+            grid = self._grid_cell()
+            surface.blits([(grid, (lx * TILE_SIZE, ly * TILE_SIZE))
+                           for ly in range(CHUNK_TILES) for lx in range(CHUNK_TILES)], doreturn=False)
+
+        self.chunks_built += 1
+        return surface
+
+    def _grid_cell(self) -> pygame.Surface:
+        # one plain cell out of the debug grid image (away from the coordinate labels)
+        if self._grid_tile is None:
+            grid = get_assets().image("grid.png", alpha=True)
+            self._grid_tile = grid.subsurface((TILE_SIZE, TILE_SIZE * 2, TILE_SIZE, TILE_SIZE)).copy()
+        return self._grid_tile
+
+    # --- drawing ---
+
+    def draw(self, screen: pygame.Surface, camera: Camera, region: Optional[pygame.Rect] = None) -> None:
+        """Blits the visible chunks. `region` (screen coords) limits drawing to part of the screen."""
+        ox, oy = camera.offset
+        screen_region = screen.get_rect() if region is None else pygame.Rect(region)
+        world_region = screen_region.move(ox, oy)
+        blits = []
+        for key in self.chunks_in(world_region):
+            chunk_rect = pygame.Rect(key[0] * CHUNK_PX, key[1] * CHUNK_PX, CHUNK_PX, CHUNK_PX)
+            part = chunk_rect.clip(world_region)
+            area = part.move(-chunk_rect.x, -chunk_rect.y)
+            blits.append((self.chunk_surface(key), (part.x - ox, part.y - oy), area))
+        if not self.pixel_rect.contains(world_region):
+            screen.fill((0, 0, 0), screen_region)  # anything off the map
+        screen.blits(blits, doreturn=False)
+
+    def background_painter(self, camera: Camera) -> Callable[[pygame.Surface, pygame.Rect], None]:
+        """Restore callback for DirtyRenderer: repaints part of the screen from the map."""
+        return lambda screen, region: self.draw(screen, camera, region)
+
+
+# --- maps ---
+
+HOME_TILES = (40, 23)          # the house art covers ~1280x720 px
+HOME_ORIGIN = (48, 48)         # where the house sits on the neighborhood map, in tiles
+NEIGHBORHOOD_TILES = (160, 128)
+
+
+def build_home_world() -> World:
+    """The player's house in the middle of a small neighborhood."""
+    world = World(*NEIGHBORHOOD_TILES, fill="grass")
+    hx, hy = HOME_ORIGIN
+    hw, hh = HOME_TILES
+
+    # streets around the block
+    for y in (hy - 6, hy + hh + 4):
+        world.fill_rect(pygame.Rect(0, y, world.width_tiles, 3), "road")
+        world.fill_rect(pygame.Rect(0, y - 1, world.width_tiles, 1), "sidewalk")
+        world.fill_rect(pygame.Rect(0, y + 3, world.width_tiles, 1), "sidewalk")
+    for x in (hx - 8, hx + hw + 8):
+        world.fill_rect(pygame.Rect(x, 0, 3, world.height_tiles), "road")
+
+    world.fill_rect(pygame.Rect(hx, hy, hw, hh), "floor")
+    home_px = (hw * TILE_SIZE, hh * TILE_SIZE)
+    world.add_decal(get_assets().image("home_bg.png", home_px), (hx * TILE_SIZE, hy * TILE_SIZE))
+    return world
+
+
+def home_center() -> Tuple[int, int]:
+    hx, hy = HOME_ORIGIN
+    hw, hh = HOME_TILES
+    return (hx * TILE_SIZE + hw * TILE_SIZE // 2, hy * TILE_SIZE + hh * TILE_SIZE // 2)